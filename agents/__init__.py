@@ -1 +1,5 @@
-from . import agent
\ No newline at end of file
+from .config import load_config
+
+load_config()
+
+from . import agent
@@ -1,20 +1,34 @@
-import os
-from dotenv import load_dotenv
-from google.adk.agents import LlmAgent, ParallelAgent, SequentialAgent
-from datetime import date
-
-load_dotenv()
-
-MODEL = os.getenv("MODEL", "gemini-2.5-pro")
-
-# ---------------------------------------------------------------------
-# 1. PROMPT ORCHESTRATOR AGENT
-# ---------------------------------------------------------------------
+"""
+Root agent graph.
+
+root_agent is a StageGraphAgent (agents/scheduler.py): each stage starts as
+soon as the stages writing the state keys it reads (`stage_reads()`) have
+finished. The research agents run in parallel after the orchestrator;
+risk_analysis_agent starts once the financial and demographic reports are in,
+and the credit memo waits for every report. PolicyGateAgent sits between the
+orchestrator and the research: a loan that breaches a hard policy limit skips
+the research (see agents/policy_gate.py) and gets a short decline memo.
+
+Nothing is built at import: the sub-agent packages (and the tools, indexes
+and clients they pull in) are imported and the graph is constructed the
+first time `root_agent` (or one of the stage agents below) is accessed, so
+importing `agents` stays cheap for workers that may never run the pipeline.
+"""
 
-prompt_orchestrator_agent = LlmAgent(
-    name="PromptOrchestratorAgent",
-    model=MODEL,
-    instruction="""
+import threading
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+GRAPH_AGENTS = ["prompt_orchestrator_agent", "final_memo_agent", "root_agent"]
+RESEARCH_AGENTS = [
+    "property_agent",
+    "MarketAnalysisAgent",
+    "property_regulatory_analyst_agent",
+    "financial_metrics_agent",
+    "demographic_details_agent",
+]
+
+PROMPT_ORCHESTRATOR_INSTRUCTION = """
 You are an underwriting workflow orchestrator.
 
 Given a loan request and property context, extract key information and generate analysis prompts.
@@ -27,6 +41,8 @@ Given a loan request and property context, extract key information and generate
     *   `purchase_price` (float)
     *   `loan_amount` (float)
     *   `annual_debt_service` (float)
+    *   `interest_rate` (float, annual percentage, e.g. 6.5)
+    *   `amortization_years` (integer, 0 for interest-only)
 
 2.  **Generate Prompts**: Create clear, focused prompts for the following analysis areas.
     *   `property_analysis_prompt`
@@ -35,44 +51,10 @@ Given a loan request and property context, extract key information and generate
     *   `regulatory_analysis_prompt`
 
 Return a single JSON object containing all extracted data and generated prompts. Do not perform the analysis yourself.
-""",
-    output_key="analysis_prompts"
-)
-
-
-# ---------------------------------------------------------------------
-# 2. PARALLEL ANALYSIS AGENTS
-# ---------------------------------------------------------------------
-
-from agents.subagents.property_agent.agent import property_agent
-from agents.subagents.financial_metrics_agent import financial_metrics_agent
-from agents.subagents.demographic_details_agent import demographic_details_agent
-from agents.subagents.regulatory_agent import property_regulatory_analyst_agent 
-from agents.subagents.risk_analysis_agent import risk_analysis_agent
-from agents.subagents.market_agent.agent import market_analysis_agent
-from agents.subagents.visulization_agent import visualization_agent
- 
-parallel_analysis_agent = ParallelAgent(
-    name="ParallelAnalysisAgent",
-    sub_agents=[
-        property_agent,
-        market_analysis_agent,
-        property_regulatory_analyst_agent,
-        financial_metrics_agent,
-        demographic_details_agent,
-    ],
-    description="Runs property, market, risk, regulatory, and financial analysis in parallel."
-)
-
-# ---------------------------------------------------------------------
-# 3. FINAL CREDIT MEMO AGENT
-# ---------------------------------------------------------------------
-from google.adk.tools.agent_tool import AgentTool
-today = date.today().strftime("%B %d, %Y")
-final_memo_agent = LlmAgent(
-    name="FinalCreditMemoAgent",
-    model=MODEL,
-    instruction=f"""
+"""
+
+# Formatted with the document date when the graph is built.
+FINAL_MEMO_INSTRUCTION = """
 You are a senior credit committee agent responsible for synthesizing analysis into a final, professional credit memo.
 Date of document is {today}.
 Using the combined analysis outputs:
@@ -90,10 +72,7 @@ Produce a professional credit memo including:
 - Key Financial Metrics (NOI, DSCR, LTV, Cap Rate)
 - Overall risk rating (Low / Medium / High)
 - Lending recommendation (Approve / Conditional / Reject)
-""",
-    # tools=[AgentTool(agent=visualization_agent)],
-    output_key="credit_memo"
-)
+"""
 
 """
 Add a section to show all the visualization content google storage links using the tool.
@@ -102,23 +81,149 @@ Give key information like claims used for memo as well as any trends or past dat
 
 """
 
-# ---------------------------------------------------------------------
-# 4. ROOT SEQUENTIAL AGENT
-# ---------------------------------------------------------------------
-
-root_agent = SequentialAgent(
-    name="CommercialRealEstateLoanAnalyzerRootAgent",
-    sub_agents=[
-        prompt_orchestrator_agent,
-        parallel_analysis_agent,
-        risk_analysis_agent,
-        final_memo_agent,
-    ],
-    description="""
-Root sequential agent that:
+DECLINE_MEMO_INSTRUCTION = """
+You are a credit officer writing a short decline memo for a commercial real estate loan request.
+Date of document is {today}.
+The request failed the lender's hard policy limits before full underwriting (see `policy_decision`:
+the computed metrics and the rules they breached). Using that decision, the extracted loan inputs
+and any research outputs provided, write a concise memo (under 300 words) with:
+- Property and loan summary
+- Key Financial Metrics (NOI, DSCR, LTV, Cap Rate) as computed
+- Policy rules breached, with the actual and required values
+- Lending recommendation: Reject
+- What would have to change (e.g., loan amount, equity, income) for the request to be reconsidered
+"""
+
+
+def stage_reads() -> Dict[str, List[str]]:
+    """Stage name -> session-state keys the stage reads."""
+    from agents.compaction import CONSUMED_REPORTS
+
+    from agents.policy_gate import DECISION_STATE_KEY
+
+    reads = {name: ["analysis_prompts", DECISION_STATE_KEY] for name in RESEARCH_AGENTS}
+    reads["PolicyGateAgent"] = ["analysis_prompts"]
+    reads.update(CONSUMED_REPORTS)
+    return reads
+
+
+def build_agent_graph() -> Dict[str, Any]:
+    """Constructs the full pipeline; returns the stage agents and root_agent by name."""
+    from google.adk.agents import LlmAgent
+
+    from agents.compaction import compact_context
+    from agents.intake import deterministic_orchestration, record_llm_orchestration
+    from agents.model_routing import model_for
+    from agents.policy_gate import DECISION_STATE_KEY, PolicyGateAgent
+    from agents.scheduler import SKIP_STATE_KEY, StageGraphAgent
+
+    # ---------------------------------------------------------------------
+    # 1. PROMPT ORCHESTRATOR AGENT
+    # ---------------------------------------------------------------------
+
+    prompt_orchestrator_agent = LlmAgent(
+        name="PromptOrchestratorAgent",
+        model=model_for("PromptOrchestratorAgent"),
+        instruction=PROMPT_ORCHESTRATOR_INSTRUCTION,
+        output_key="analysis_prompts",
+        # Structured JSON / intake-form requests are parsed without the model.
+        before_agent_callback=deterministic_orchestration,
+        after_agent_callback=record_llm_orchestration,
+    )
+
+    # Hard policy fails skip the research and go to the decline memo.
+    policy_gate_agent = PolicyGateAgent(
+        name="PolicyGateAgent",
+        research_stages=RESEARCH_AGENTS,
+        description="Declines loans that breach hard policy limits before any research runs.",
+    )
+
+    # ---------------------------------------------------------------------
+    # 2. RESEARCH AND RISK AGENTS
+    # ---------------------------------------------------------------------
+
+    from agents.subagents.property_agent.agent import property_agent
+    from agents.subagents.financial_metrics_agent import financial_metrics_agent
+    from agents.subagents.demographic_details_agent import demographic_details_agent
+    from agents.subagents.regulatory_agent import property_regulatory_analyst_agent
+    from agents.subagents.risk_analysis_agent import risk_analysis_agent
+    from agents.subagents.market_agent.agent import market_analysis_agent
+
+    # ---------------------------------------------------------------------
+    # 3. FINAL CREDIT MEMO AGENT
+    # ---------------------------------------------------------------------
+    today = date.today().strftime("%B %d, %Y")
+    final_memo_agent = LlmAgent(
+        name="FinalCreditMemoAgent",
+        model=model_for("FinalCreditMemoAgent"),
+        instruction=FINAL_MEMO_INSTRUCTION.format(today=today),
+        # tools=[AgentTool(agent=visualization_agent)],  # agents.subagents.visulization_agent
+        output_key="credit_memo",
+        before_model_callback=compact_context,
+    )
+    decline_memo_agent = LlmAgent(
+        name="DeclineMemoAgent",
+        model=model_for("DeclineMemoAgent"),
+        instruction=DECLINE_MEMO_INSTRUCTION.format(today=today),
+        output_key="credit_memo",
+        before_model_callback=compact_context,
+    )
+
+    # ---------------------------------------------------------------------
+    # 4. ROOT STAGE GRAPH
+    # ---------------------------------------------------------------------
+
+    root_agent = StageGraphAgent(
+        name="CommercialRealEstateLoanAnalyzerRootAgent",
+        sub_agents=[
+            prompt_orchestrator_agent,
+            policy_gate_agent,
+            property_agent,
+            market_analysis_agent,
+            property_regulatory_analyst_agent,
+            financial_metrics_agent,
+            demographic_details_agent,
+            risk_analysis_agent,
+            final_memo_agent,
+            decline_memo_agent,
+        ],
+        reads=stage_reads(),
+        writes={
+            prompt_orchestrator_agent.name: ["analysis_prompts", "orchestration_path"],
+            policy_gate_agent.name: [DECISION_STATE_KEY, SKIP_STATE_KEY],
+        },
+        description="""
+Root stage graph that:
 1. Orchestrates prompt generation
-2. Executes parallel analysis agents
-3. Risk Analysis Agent
+   (loans breaching hard policy limits go straight to a short decline memo)
+2. Runs property, market, regulatory, financial and demographic analysis in parallel
+3. Runs risk analysis as soon as the financial and demographic reports are ready
 4. Produces final underwriting credit memo
 """
-)
+    )
+    return {
+        "prompt_orchestrator_agent": prompt_orchestrator_agent,
+        "final_memo_agent": final_memo_agent,
+        "root_agent": root_agent,
+    }
+
+
+_graph: Optional[Dict[str, Any]] = None
+_graph_lock = threading.Lock()
+
+
+def get_agent_graph() -> Dict[str, Any]:
+    """Returns the process-wide agent graph, building it on first use."""
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = build_agent_graph()
+    return _graph
+
+
+def __getattr__(name: str) -> Any:
+    # `from agents.agent import root_agent` and ADK's agent loader land here.
+    if name in GRAPH_AGENTS:
+        return get_agent_graph()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,367 @@
+"""
+Batch underwriting runner.
+
+Streams loan requests from a JSONL file and runs one root_agent pipeline per
+loan on asyncio, at most `concurrency` at a time:
+
+    python -m agents.batch_runner loans.jsonl memos.jsonl --concurrency 8
+
+Each input line is a JSON object. The loan id is taken from `loan_id`,
+`request_id` or `id` (line number otherwise) and the message sent to the
+agent from `request`, `prompt`, `body` or `text`; any other object is sent as
+its JSON text.
+
+The output JSONL is appended to as the pipeline runs:
+
+- {"loan_id", "event": "stage", "stage", "value", "elapsed_s"} whenever a
+  stage writes one of STAGE_KEYS to session state;
+- {"loan_id", "event": "completed" | "failed", "latency_s", "attempts",
+  "credit_memo", "policy_decision", "orchestration_path", "restored_stages", "model_tiers",
+  "compaction", "sources", "schedule", "state", "error"} once the loan finishes.
+
+Loans that already have a "completed" record in the output are skipped, so
+rerunning the same command after a crash resumes where it stopped. Within a
+loan, finished stages are checkpointed (see agents/checkpoints.py): a failed
+loan is retried up to --retries times and a rerun starts at the first stage
+that did not finish. A run
+summary with throughput (loans/min), p50/p95/p99 end-to-end latency and the
+event-loop lag observed during the run is printed at the end. With
+`--trace traces.jsonl`, per-agent/model/tool spans of every loan are exported
+(see agents/tracing.py) and per-name totals are added to the summary.
+Every agent's model tier is recorded per loan (see agents/model_routing.py);
+`--latency-budget SECONDS` lets stages downgrade to smaller tiers once a loan
+has used most of its budget. Token counts of the compacted risk/memo context
+(see agents/compaction.py) are recorded per loan and summed in the summary,
+as is each loan's stage schedule and critical path (see agents/scheduler.py).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+from google.adk.apps import App
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from agents.checkpoints import CheckpointPlugin, CheckpointStore, get_checkpoint_store
+from agents.compaction import SOURCES_STATE_KEY, compaction_stats, compaction_summary
+from agents.model_routing import ModelRoutingPlugin, model_tiers, tier_summary
+from agents.scheduler import SCHEDULE_STATE_KEY, schedule_summary
+from agents.tools.async_tools import EventLoopLagMonitor
+from agents.tools.state_json import parse_json_output
+from agents.tracing import TracingPlugin
+
+APP_NAME = "commercial_real_estate_batch"
+USER_ID = "batch"
+DEFAULT_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+DEFAULT_RETRIES = int(os.getenv("BATCH_RETRIES", "1"))
+STAGE_KEYS = [
+    "analysis_prompts",
+    "policy_decision",
+    "property_analysis",
+    "market_analysis",
+    "property_regulatory_report",
+    "financial_report",
+    "demographic_report",
+    "risk_analysis",
+    "credit_memo",
+]
+ID_FIELDS = ("loan_id", "request_id", "id")
+TEXT_FIELDS = ("request", "prompt", "body", "text")
+LATENCY_PERCENTILES = [50, 95, 99]
+
+
+def read_requests(path: str) -> Iterator[Tuple[str, str]]:
+    """Yields (loan_id, message) pairs from a JSONL file without loading it whole."""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"❌ [Batch Runner] Skipping line {line_number}: {e}")
+                continue
+            if not isinstance(record, dict):
+                yield f"line-{line_number}", json.dumps(record)
+                continue
+            loan_id = next((str(record[k]) for k in ID_FIELDS if record.get(k) is not None), f"line-{line_number}")
+            text = next((record[k] for k in TEXT_FIELDS if isinstance(record.get(k), str)), None)
+            if text is None:
+                text = json.dumps({k: v for k, v in record.items() if k not in ID_FIELDS}, default=str)
+            elif isinstance(record.get("title"), str):
+                text = f"{record['title']}\n\n{text}"
+            yield loan_id, text
+
+
+def completed_loan_ids(path: str) -> Set[str]:
+    """Loan ids with a "completed" record in an existing output file."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A partial last line left by a crash.
+                continue
+            if record.get("event") == "completed":
+                done.add(record["loan_id"])
+    return done
+
+
+class JsonlWriter:
+    """Appends records to the output file, one flushed line at a time."""
+
+    def __init__(self, path: str, fsync: bool = False):
+        needs_newline = os.path.exists(path) and os.path.getsize(path) > 0 and not _ends_with_newline(path)
+        self._file = open(path, "a", encoding="utf-8")
+        if needs_newline:
+            self._file.write("\n")
+        self._fsync = fsync
+        self._lock = asyncio.Lock()
+
+    async def write(self, record: Dict[str, Any]):
+        line = json.dumps(record, default=str) + "\n"
+        async with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self._fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+async def _run_attempt(runner: Runner, loan_id: str, content: types.Content, writer: JsonlWriter,
+                       start: float, timeout: Optional[float],
+                       enqueued_at: Optional[float] = None,
+                       latency_budget: Optional[float] = None) -> Tuple[Optional[Exception], Dict[str, Any]]:
+    """One pipeline run in a fresh session; returns (error or None, final session state)."""
+    state: Dict[str, Any] = {"checkpoint_id": loan_id}
+    if enqueued_at is not None:
+        state["enqueued_at"] = enqueued_at
+    if latency_budget:
+        # Budget left for this attempt, counted from the start of the loan.
+        state["latency_budget_s"] = max(0.001, latency_budget - (time.perf_counter() - start))
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name,
+        user_id=USER_ID,
+        session_id=f"{loan_id}-{uuid.uuid4().hex[:8]}",
+        state=state,
+    )
+
+    async def consume():
+        async for event in runner.run_async(user_id=USER_ID, session_id=session.id, new_message=content):
+            delta = event.actions.state_delta if event.actions else None
+            for key in STAGE_KEYS:
+                if delta and key in delta:
+                    await writer.write({
+                        "loan_id": loan_id,
+                        "event": "stage",
+                        "stage": key,
+                        "value": delta[key],
+                        "elapsed_s": round(time.perf_counter() - start, 3),
+                    })
+
+    error = None
+    try:
+        await asyncio.wait_for(consume(), timeout)
+    except Exception as e:
+        error = e
+    finally:
+        final = await runner.session_service.get_session(
+            app_name=runner.app_name, user_id=USER_ID, session_id=session.id
+        )
+        await runner.session_service.delete_session(
+            app_name=runner.app_name, user_id=USER_ID, session_id=session.id
+        )
+    return error, dict(final.state) if final else {}
+
+
+async def run_loan(runner: Runner, loan_id: str, message: str, writer: JsonlWriter,
+                   timeout: Optional[float] = None, retries: int = 0,
+                   checkpoints: Optional[CheckpointStore] = None,
+                   enqueued_at: Optional[float] = None,
+                   latency_budget: Optional[float] = None) -> Dict[str, Any]:
+    """Runs one pipeline, streaming stage records, and writes the final record.
+
+    A failed run is retried up to `retries` times; with checkpointing on, each
+    retry resumes at the first stage that did not finish.
+    """
+    start = time.perf_counter()
+    content = types.Content(role="user", parts=[types.Part(text=message)])
+    record: Dict[str, Any] = {"loan_id": loan_id}
+    for attempt in range(retries + 1):
+        error, final_state = await _run_attempt(runner, loan_id, content, writer, start, timeout,
+                                                enqueued_at if attempt == 0 else None, latency_budget)
+        if error is None:
+            break
+        print(f"❌ [Batch Runner] Loan {loan_id} failed (attempt {attempt + 1}/{retries + 1}): {error!r}")
+    record["event"] = "completed" if error is None else "failed"
+    if error is not None:
+        record["error"] = repr(error)
+    record["latency_s"] = round(time.perf_counter() - start, 3)
+    record["attempts"] = attempt + 1
+    state = {k: final_state[k] for k in STAGE_KEYS if k in final_state}
+    record["credit_memo"] = state.get("credit_memo")
+    record["policy_decision"] = (parse_json_output(state.get("policy_decision")) or {}).get("decision")
+    record["orchestration_path"] = final_state.get("orchestration_path")
+    record["restored_stages"] = final_state.get("restored_stages", [])
+    record["model_tiers"] = model_tiers(final_state)
+    record["compaction"] = compaction_stats(final_state)
+    record["sources"] = final_state.get(SOURCES_STATE_KEY, {})
+    record["schedule"] = final_state.get(SCHEDULE_STATE_KEY)
+    record["state"] = state
+    if error is None and checkpoints is not None:
+        checkpoints.clear(loan_id)
+    await writer.write(record)
+    return record
+
+
+def summarize(latencies: List[float], completed: int, failed: int, skipped: int, wall_seconds: float) -> Dict[str, Any]:
+    """Throughput and end-to-end latency percentiles of a run."""
+    summary = {
+        "completed": completed,
+        "failed": failed,
+        "skipped": skipped,
+        "wall_seconds": round(wall_seconds, 3),
+        "loans_per_minute": round(completed / wall_seconds * 60, 2) if wall_seconds > 0 else None,
+    }
+    if latencies:
+        for p, value in zip(LATENCY_PERCENTILES, np.percentile(latencies, LATENCY_PERCENTILES)):
+            summary[f"latency_p{p}_s"] = round(float(value), 3)
+    return summary
+
+
+async def _queue_requests(requests: Iterator[Tuple[str, str]], queue: asyncio.Queue, skip: Set[str],
+                          workers: int) -> int:
+    skipped = 0
+    for loan_id, message in requests:
+        if loan_id in skip:
+            skipped += 1
+            continue
+        await queue.put((loan_id, message, time.time()))
+    for _ in range(workers):
+        await queue.put(None)
+    return skipped
+
+
+async def run_batch(
+    input_path: str,
+    output_path: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    agent=None,
+    timeout: Optional[float] = None,
+    resume: bool = True,
+    fsync: bool = False,
+    retries: int = DEFAULT_RETRIES,
+    checkpoint: bool = True,
+    trace_path: Optional[str] = None,
+    latency_budget: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Runs every request in `input_path` through `agent` (root_agent by default)."""
+    if agent is None:
+        from .agent import root_agent as agent
+    concurrency = max(1, concurrency)
+    # Routing runs before the tracer so model spans show the model that served the call; the
+    # tracer goes before checkpointing so restored (skipped) stages still get a span.
+    tracer = TracingPlugin(trace_path, print_summary=False) if trace_path else None
+    plugins = [ModelRoutingPlugin(latency_budget)] + ([tracer] if tracer else []) \
+        + ([CheckpointPlugin()] if checkpoint else [])
+    checkpoints = get_checkpoint_store() if checkpoint else None
+    app = App(name=APP_NAME, root_agent=agent, plugins=plugins)
+    runner = Runner(app=app, session_service=InMemorySessionService())
+    skip = completed_loan_ids(output_path) if resume else set()
+    writer = JsonlWriter(output_path, fsync=fsync)
+    # Bounded so the input file is read only as fast as loans are picked up.
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    latencies: List[float] = []
+    tiers: List[Dict[str, Any]] = []
+    compaction: List[Dict[str, Any]] = []
+    schedules: List[Dict[str, Any]] = []
+    counts = {"completed": 0, "failed": 0, "declined": 0}
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            loan_id, message, enqueued_at = item
+            record = await run_loan(runner, loan_id, message, writer, timeout=timeout, retries=retries,
+                                    checkpoints=checkpoints, enqueued_at=enqueued_at, latency_budget=latency_budget)
+            counts[record["event"]] += 1
+            counts["declined"] += record["policy_decision"] == "decline"
+            tiers.append(record["model_tiers"])
+            compaction.append(record["compaction"])
+            schedules.append(record["schedule"])
+            if record["event"] == "completed":
+                latencies.append(record["latency_s"])
+
+    start = time.perf_counter()
+    try:
+        async with EventLoopLagMonitor() as lag:
+            results = await asyncio.gather(
+                _queue_requests(read_requests(input_path), queue, skip, concurrency),
+                *(worker() for _ in range(concurrency)),
+            )
+    finally:
+        writer.close()
+        await runner.close()
+    summary = summarize(latencies, counts["completed"], counts["failed"], results[0], time.perf_counter() - start)
+    summary["declined"] = counts["declined"]
+    summary["event_loop_lag"] = lag.stats()
+    summary["model_tiers"] = tier_summary(tiers)
+    summary["compaction"] = compaction_summary(compaction)
+    summary["schedule"] = schedule_summary(schedules)
+    if tracer is not None:
+        summary["trace"] = {"path": trace_path, "totals": tracer.totals}
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the underwriting pipeline over a JSONL file of loan requests.")
+    parser.add_argument("input", help="JSONL file of loan requests")
+    parser.add_argument("output", help="JSONL file to append stage and memo records to")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=None, help="per-loan timeout in seconds")
+    parser.add_argument("--no-resume", action="store_true", help="rerun loans already completed in the output")
+    parser.add_argument("--fsync", action="store_true", help="fsync the output after every record")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="retries per failed loan")
+    parser.add_argument("--no-checkpoint", action="store_true", help="do not checkpoint or restore stages")
+    parser.add_argument("--trace", metavar="PATH", help="append agent/model/tool spans to this JSONL file")
+    parser.add_argument("--latency-budget", type=float, default=None, metavar="SECONDS",
+                        help="per-loan latency budget; later stages downgrade model tiers when it is at risk")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run_batch(
+        args.input,
+        args.output,
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        resume=not args.no_resume,
+        fsync=args.fsync,
+        retries=args.retries,
+        checkpoint=not args.no_checkpoint,
+        trace_path=args.trace,
+        latency_budget=args.latency_budget,
+    ))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Stage checkpointing for the root pipeline.
+
+CheckpointPlugin saves each stage's output as soon as the stage writes it to
+session state and, when the same loan is run again, restores it instead of
+running the stage. Rerunning a loan therefore resumes at the first stage
+without a checkpoint, and a failed research agent is retried
+without rerunning the siblings that already finished.
+
+- Checkpoints live in a SQLite file (CHECKPOINT_PATH), keyed by the session's
+  `checkpoint_id` state value (the batch runner sets it to the loan id; the
+  session id is used otherwise) and the state key.
+- Each checkpoint records a hash of the user message; if the loan request
+  changes, its old checkpoints are ignored.
+- `clear(checkpoint_id)` drops a loan's checkpoints once its memo is written.
+
+Install it on the runner: App(name=..., root_agent=root_agent,
+plugins=[CheckpointPlugin()]).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.plugins.base_plugin import BasePlugin
+from google.genai import types
+
+DEFAULT_CHECKPOINT_PATH = os.getenv(
+    "CHECKPOINT_PATH", os.path.join(os.path.expanduser("~"), ".cache", "cre_analyzer", "checkpoints.sqlite")
+)
+CHECKPOINT_KEYS = [
+    "analysis_prompts",
+    "property_analysis",
+    "market_analysis",
+    "property_regulatory_report",
+    "financial_report",
+    "demographic_report",
+    "risk_analysis",
+]
+# State written alongside a stage's output that should be restored with it.
+COMPANION_KEYS = {
+    "analysis_prompts": ["orchestration_path"],
+}
+
+
+def _message_hash(content: Optional[types.Content]) -> str:
+    text = "\n".join(p.text for p in content.parts if p.text) if content and content.parts else ""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class CheckpointStore:
+    """SQLite-backed (checkpoint_id, state key) -> value store."""
+
+    def __init__(self, path: Optional[str] = DEFAULT_CHECKPOINT_PATH):
+        if path and path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints "
+            "(checkpoint_id TEXT, key TEXT, input_hash TEXT, value TEXT, saved_at REAL, "
+            "PRIMARY KEY (checkpoint_id, key))"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def save(self, checkpoint_id: str, key: str, value: Any, input_hash: str = "") -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (checkpoint_id, key, input_hash, value, saved_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (checkpoint_id, key, input_hash, json.dumps(value, default=str), time.time()),
+            )
+            self._conn.commit()
+
+    def load(self, checkpoint_id: str, input_hash: Optional[str] = None) -> Dict[str, Any]:
+        """Saved state values for a checkpoint id (only those saved for input_hash, if given)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, input_hash, value FROM checkpoints WHERE checkpoint_id = ?", (checkpoint_id,)
+            ).fetchall()
+        return {key: json.loads(value) for key, saved_hash, value in rows if input_hash in (None, saved_hash)}
+
+    def completed_stages(self, checkpoint_id: str) -> List[str]:
+        saved = self.load(checkpoint_id)
+        return [key for key in CHECKPOINT_KEYS if key in saved]
+
+    def clear(self, checkpoint_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoints WHERE checkpoint_id = ?", (checkpoint_id,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_store: Optional[CheckpointStore] = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    """Returns the process-wide store, opening it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CheckpointStore()
+    return _store
+
+
+def set_checkpoint_store(store: CheckpointStore) -> None:
+    """Replaces the process-wide store (e.g. with an in-memory one)."""
+    global _store
+    with _store_lock:
+        _store = store
+
+
+class CheckpointPlugin(BasePlugin):
+    """Saves stage outputs as they are produced and skips stages that already have one."""
+
+    def __init__(self, store: Optional[CheckpointStore] = None, keys: Optional[List[str]] = None):
+        super().__init__(name="stage_checkpoints")
+        self._store = store
+        self.keys = keys or CHECKPOINT_KEYS
+        self._companions = {c: k for k, cs in COMPANION_KEYS.items() for c in cs}
+
+    @property
+    def store(self) -> CheckpointStore:
+        return self._store or get_checkpoint_store()
+
+    @staticmethod
+    def _checkpoint_id(state: Any, session_id: str) -> str:
+        return str(state.get("checkpoint_id") or session_id)
+
+    async def before_agent_callback(self, *, agent, callback_context: CallbackContext) -> Optional[types.Content]:
+        key = getattr(agent, "output_key", None)
+        if key not in self.keys:
+            return None
+        checkpoint_id = self._checkpoint_id(callback_context.state, callback_context.session.id)
+        saved = self.store.load(checkpoint_id, _message_hash(callback_context.user_content))
+        if key not in saved:
+            return None
+        print(f"[Checkpoint] {checkpoint_id}: restoring {key}; skipping {agent.name}")
+        callback_context.state[key] = saved[key]
+        for companion in COMPANION_KEYS.get(key, []):
+            if companion in saved:
+                callback_context.state[companion] = saved[companion]
+        restored = list(callback_context.state.get("restored_stages") or [])
+        callback_context.state["restored_stages"] = restored + [key]
+        value = saved[key]
+        return types.Content(role="model", parts=[types.Part(text=value if isinstance(value, str) else json.dumps(value))])
+
+    async def on_event_callback(self, *, invocation_context, event) -> None:
+        delta = event.actions.state_delta if event.actions else None
+        if not delta:
+            return None
+        checkpoint_id = self._checkpoint_id(invocation_context.session.state, invocation_context.session.id)
+        input_hash = _message_hash(invocation_context.user_content)
+        for key, value in delta.items():
+            if key in self.keys or key in self._companions:
+                try:
+                    self.store.save(checkpoint_id, key, value, input_hash)
+                except Exception as e:
+                    print(f"❌ [Checkpoint] Saving {key} for {checkpoint_id} failed: {e}")
+        return None
@@ -0,0 +1,296 @@
+"""
+Context compaction for the serial stages after the parallel research.
+
+risk_analysis_agent and the memo agents run after the research agents
+and used to receive every upstream agent's full output as conversation
+history. The regulatory report alone carries a URL and a snippet for every
+claim. Their `compact_context` before_model_callback replaces that history
+with a deterministic extract of the reports each one consumes
+(CONSUMED_REPORTS), read from session state:
+
+- JSON reports (financial, demographic, risk, the orchestrator's inputs) are
+  flattened to `path: value` lines. `{"value", "source"}` pairs become
+  `value [S1]`, and search bookkeeping (queries, access dates, snippets) is
+  dropped.
+- Text reports lose quoted snippets, the regulatory source catalog and blank
+  or repeated lines. Sections and lines are kept in priority order: the
+  regulatory executive summary, risk matrix and next actions come first, and
+  otherwise lines with figures come first.
+- Each report is cut to its token budget (REPORT_TOKEN_BUDGETS, overridable
+  with COMPACTION_TOKEN_BUDGETS="state_key=tokens,...").
+
+URLs are kept by reference. Every URL is replaced by a reference like [S3],
+numbered across all of the loan's reports so both stages cite the same
+numbers. The reference -> URL table is written to session state under
+`compaction_sources`. The agent's own tool calls and the user's request are
+passed through unchanged. Before/after token counts per report are logged and
+recorded under `compaction:<agent name>`. Tokens are estimated at
+CHARS_PER_TOKEN characters per token.
+"""
+
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
+
+from agents.intake import EXTRACTED_FIELDS, PASSTHROUGH_FIELDS
+from agents.tools.state_json import parse_json_output
+
+CHARS_PER_TOKEN = 4
+# Reports in the order their URLs are numbered.
+REPORT_KEYS = [
+    "analysis_prompts",
+    "policy_decision",
+    "property_analysis",
+    "market_analysis",
+    "property_regulatory_report",
+    "financial_report",
+    "demographic_report",
+    "risk_analysis",
+]
+REPORT_TOKEN_BUDGETS = {
+    "analysis_prompts": 250,
+    "policy_decision": 200,
+    "property_analysis": 400,
+    "market_analysis": 400,
+    "property_regulatory_report": 700,
+    "financial_report": 300,
+    "demographic_report": 250,
+    "risk_analysis": 600,
+}
+CONSUMED_REPORTS = {
+    "risk_analysis_agent": ["analysis_prompts", "financial_report", "demographic_report"],
+    "FinalCreditMemoAgent": [
+        "analysis_prompts",
+        "property_analysis",
+        "market_analysis",
+        "property_regulatory_report",
+        "financial_report",
+        "demographic_report",
+        "risk_analysis",
+    ],
+    "DeclineMemoAgent": [
+        "analysis_prompts",
+        "policy_decision",
+        "property_analysis",
+        "market_analysis",
+        "property_regulatory_report",
+        "financial_report",
+        "demographic_report",
+    ],
+}
+# Agents whose context ends with the reference -> URL list, so their memo can cite sources.
+SOURCE_LIST_AGENTS = ["FinalCreditMemoAgent", "DeclineMemoAgent"]
+# JSON fields that only document how a value was found.
+DROPPED_FIELDS = {"data_sources_consulted", "query_used", "accessed_date", "snippet", "extracted_snippet"}
+# Regulatory report sections by heading number, most important first; 12 (source catalog) is dropped.
+REGULATORY_SECTIONS = [1, 10, 11, 13, 2, 3, 4, 6, 5, 7, 8, 9]
+SOURCES_STATE_KEY = "compaction_sources"
+STATE_KEY_PREFIX = "compaction:"
+
+_URL_RE = re.compile(r"https?://[^\s\)\]\}\"'<>|,]+")
+# Quoted extracts of a source; short quoted strings are kept.
+_SNIPPET_RE = re.compile(r"\"[^\"\n]{40,}\"")
+_SECTION_RE = re.compile(r"^(?:\*\*|#+)\s*(\d{1,2})\.\s")
+_DIGIT_RE = re.compile(r"\d")
+
+
+def _parse_budgets(value: Optional[str]) -> Dict[str, int]:
+    """'state_key=tokens,...' -> {state_key: tokens}; malformed items are ignored."""
+    budgets = {}
+    for item in (value or "").split(","):
+        key, _, tokens = item.partition("=")
+        if key.strip() and tokens.strip().isdigit():
+            budgets[key.strip()] = int(tokens)
+    return budgets
+
+
+REPORT_TOKEN_BUDGETS.update(_parse_budgets(os.getenv("COMPACTION_TOKEN_BUDGETS")))
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+class SourceRefs:
+    """Numbers URLs in order of first appearance: url -> "S1", "S2", ..."""
+
+    def __init__(self):
+        self.refs: Dict[str, str] = {}
+
+    def ref(self, url: str) -> str:
+        url = url.rstrip(".;:")
+        if url not in self.refs:
+            self.refs[url] = f"S{len(self.refs) + 1}"
+        return f"[{self.refs[url]}]"
+
+    def replace_urls(self, text: str) -> str:
+        return _URL_RE.sub(lambda m: self.ref(m.group(0)), text)
+
+    def table(self) -> Dict[str, str]:
+        return {ref: url for url, ref in self.refs.items()}
+
+
+def _flatten(value: Any, path: str, sources: SourceRefs, lines: List[str]) -> None:
+    if isinstance(value, dict):
+        if "value" in value and set(value) <= {"value", "source", "sources", "url"}:
+            refs = [sources.replace_urls(str(value[k])) for k in ("source", "sources", "url") if value.get(k)]
+            lines.append(f"{path}: {_scalar(value['value'], sources)} {' '.join(refs)}".rstrip())
+            return
+        for key, item in value.items():
+            if key not in DROPPED_FIELDS:
+                _flatten(item, f"{path}.{key}" if path else key, sources, lines)
+    elif isinstance(value, list) and any(isinstance(v, (dict, list)) for v in value):
+        for i, item in enumerate(value):
+            _flatten(item, f"{path}[{i}]", sources, lines)
+    elif value not in (None, "", []):
+        lines.append(f"{path}: {_scalar(value, sources)}")
+
+
+def _scalar(value: Any, sources: SourceRefs) -> str:
+    if isinstance(value, list):
+        return "; ".join(_scalar(v, sources) for v in value)
+    return sources.replace_urls(str(value))
+
+
+def _json_lines(key: str, data: Dict[str, Any], sources: SourceRefs) -> List[str]:
+    if key == "analysis_prompts":
+        # Downstream stages need the loan inputs, not the research prompts.
+        extracted = {**(data.get("extracted_data") or {}), **data}
+        data = {f: extracted[f] for f in EXTRACTED_FIELDS + PASSTHROUGH_FIELDS if extracted.get(f) is not None}
+    lines: List[str] = []
+    _flatten(data, "", sources, lines)
+    return lines
+
+
+def _text_blocks(key: str, text: str, sources: SourceRefs) -> List[Tuple[int, List[str]]]:
+    """(priority, lines) blocks of a text report; lower priority values are kept first."""
+    lines, seen = [], set()
+    for line in text.splitlines():
+        line = _SNIPPET_RE.sub('"…"', sources.replace_urls(line)).strip()
+        if line and line not in seen:
+            seen.add(line)
+            lines.append(line)
+    if key == "property_regulatory_report":
+        blocks, section = {}, 0
+        for line in lines:
+            match = _SECTION_RE.match(line)
+            if match:
+                section = int(match.group(1))
+            blocks.setdefault(section, []).append(line)
+        order = [0] + REGULATORY_SECTIONS
+        return [(order.index(s), blocks[s]) for s in blocks if s in order]
+    # Free text: the heading line, then lines with figures, then the rest.
+    return [(0 if i == 0 else 1 if _DIGIT_RE.search(line) else 2, [line]) for i, line in enumerate(lines)]
+
+
+def _fit(blocks: List[Tuple[int, List[str]]], budget: int) -> List[str]:
+    """Lines of the highest-priority blocks that fit the budget, in their original order."""
+    kept, used = set(), 0
+    for index in sorted(range(len(blocks)), key=lambda i: blocks[i][0]):
+        for j, line in enumerate(blocks[index][1]):
+            cost = estimate_tokens(line) + 1
+            if used + cost > budget:
+                break
+            kept.add((index, j))
+            used += cost
+    fitted = [line for i, (_, lines) in enumerate(blocks) for j, line in enumerate(lines) if (i, j) in kept]
+    omitted = sum(len(lines) for _, lines in blocks) - len(fitted)
+    if omitted:
+        fitted.append(f"[{omitted} lines omitted]")
+    return fitted
+
+
+def compact_report(key: str, value: Any, sources: SourceRefs, budget: Optional[int] = None) -> str:
+    """The compacted text of one state report, within `budget` tokens."""
+    data = parse_json_output(value)
+    if data is not None:
+        blocks = [(0, [line]) for line in _json_lines(key, data, sources)]
+    else:
+        blocks = _text_blocks(key, str(value), sources)
+    return "\n".join(_fit(blocks, budget if budget is not None else REPORT_TOKEN_BUDGETS.get(key, 400)))
+
+
+def compact_reports(state: Dict[str, Any], keys: List[str]) -> Tuple[Dict[str, str], Dict[str, Dict[str, int]], Dict[str, str]]:
+    """({key: compacted text}, {key: {"before", "after"} tokens}, {ref: url}) for the given state reports.
+
+    URLs are numbered over all REPORT_KEYS, so a reference means the same
+    source whichever stage's context it appears in.
+    """
+    sources = SourceRefs()
+    compacted, counts = {}, {}
+    for key in REPORT_KEYS:
+        value = state.get(key)
+        if value in (None, ""):
+            continue
+        text = compact_report(key, value, sources)
+        if key in keys:
+            compacted[key] = text
+            raw = value if isinstance(value, str) else json.dumps(value)
+            counts[key] = {"before": estimate_tokens(raw), "after": estimate_tokens(text)}
+    return compacted, counts, sources.table()
+
+
+def _context_text(compacted: Dict[str, str], sources: Dict[str, str], with_sources: bool) -> str:
+    sections = [f"## {key}\n{text}" for key, text in compacted.items()]
+    cited = sorted(set(re.findall(r"\[(S\d+)\]", "\n".join(compacted.values()))), key=lambda r: int(r[1:]))
+    if with_sources and cited:
+        sections.append("## sources\n" + "\n".join(f"[{ref}] {sources[ref]}" for ref in cited))
+    return (
+        "For context: compacted outputs of the earlier analysis stages. "
+        "[S#] marks refer to the source list kept with the loan.\n\n" + "\n\n".join(sections)
+    )
+
+
+def compact_context(callback_context: CallbackContext, llm_request) -> None:
+    """before_model_callback: swaps upstream agents' history for compacted reports.
+
+    Keeps the user's request and this agent's own turns (tool calls and
+    results) so multi-turn tool use is unaffected.
+    """
+    agent = callback_context.agent_name
+    try:
+        compacted, counts, sources = compact_reports(callback_context.state, CONSUMED_REPORTS.get(agent, []))
+    except Exception as e:
+        print(f"❌ [Compaction] {agent}: compaction failed, keeping the full history: {e}")
+        return None
+    # Other agents' messages reach this agent as user text; its own turns are
+    # model contents and the tool results that answer them.
+    own = [
+        content for content in llm_request.contents
+        if content.role == "model" or any(p.function_response for p in content.parts or [])
+    ]
+    context = types.Content(role="user", parts=[types.Part(text=_context_text(
+        compacted, sources, with_sources=agent in SOURCE_LIST_AGENTS))])
+    user = [callback_context.user_content] if callback_context.user_content else []
+    llm_request.contents = user + [context] + own
+
+    key = STATE_KEY_PREFIX + agent
+    if key not in callback_context.state:
+        before = sum(c["before"] for c in counts.values())
+        after = sum(c["after"] for c in counts.values())
+        print(f"[Compaction] {agent}: upstream reports {before} -> {after} tokens "
+              + ", ".join(f"{k} {c['before']}->{c['after']}" for k, c in counts.items()))
+        callback_context.state[key] = {"before_tokens": before, "after_tokens": after, "reports": counts}
+        callback_context.state[SOURCES_STATE_KEY] = sources
+    return None
+
+
+def compaction_stats(state: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """agent -> {"before_tokens", "after_tokens", "reports"} from a session state."""
+    return {key[len(STATE_KEY_PREFIX):]: value for key, value in state.items() if key.startswith(STATE_KEY_PREFIX)}
+
+
+def compaction_summary(stats_per_loan: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    """agent -> summed {"loans", "before_tokens", "after_tokens"} over batch records' compaction stats."""
+    summary: Dict[str, Dict[str, int]] = {}
+    for stats in stats_per_loan:
+        for agent, entry in (stats or {}).items():
+            totals = summary.setdefault(agent, {"loans": 0, "before_tokens": 0, "after_tokens": 0})
+            totals["loans"] += 1
+            totals["before_tokens"] += entry["before_tokens"]
+            totals["after_tokens"] += entry["after_tokens"]
+    return summary
@@ -0,0 +1,32 @@
+"""
+Process configuration.
+
+`.env` is loaded into the environment once per process, when the `agents`
+package is first imported and before any module reads its settings
+(MODEL, GCS_BUCKET, the *_PATH store locations, ...). Modules read settings
+with `os.getenv`; nothing else should call `load_dotenv`.
+"""
+
+import threading
+from typing import Optional
+
+_loaded = False
+_loaded_lock = threading.Lock()
+
+
+def load_config(dotenv_path: Optional[str] = None) -> bool:
+    """Loads `.env` into os.environ on the first call; returns whether this call loaded it.
+
+    Variables already set in the environment win over the file.
+    """
+    global _loaded
+    if _loaded:
+        return False
+    with _loaded_lock:
+        if _loaded:
+            return False
+        from dotenv import load_dotenv
+
+        load_dotenv(dotenv_path)
+        _loaded = True
+    return True
@@ -0,0 +1,218 @@
+"""
+Deterministic fast path for the prompt orchestrator.
+
+Most requests arrive as structured JSON or as a fixed intake form
+("Property Address: ...", "Loan Amount: $4,500,000", ...). For those the
+orchestrator's fields are parsed directly and `analysis_prompts` is built from
+templates, so the first stage of the pipeline needs no model call. Free-text
+requests still go to the LLM orchestrator.
+
+`orchestration_path` in session state records which path was taken
+("deterministic" or "llm").
+"""
+
+import json
+import re
+from typing import Any, Dict, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
+
+from agents.tools.state_json import parse_json_output
+
+TEXT_FIELDS = ["property_address", "property_type"]
+NUMBER_FIELDS = [
+    "gross_rental_income",
+    "operating_expenses",
+    "purchase_price",
+    "loan_amount",
+    "annual_debt_service",
+    "interest_rate",
+]
+INTEGER_FIELDS = ["amortization_years"]
+EXTRACTED_FIELDS = TEXT_FIELDS + NUMBER_FIELDS + INTEGER_FIELDS
+# Optional regulatory-agent inputs passed through when the request has them.
+PASSTHROUGH_FIELDS = ["parcel_id", "jurisdiction", "max_data_age_days", "target_results_count", "required_focus_areas"]
+
+FIELD_ALIASES = {
+    "address": "property_address",
+    "property": "property_address",
+    "site_address": "property_address",
+    "asset_type": "property_type",
+    "type": "property_type",
+    "gross_income": "gross_rental_income",
+    "gross_rent": "gross_rental_income",
+    "gross_rental_revenue": "gross_rental_income",
+    "rental_income": "gross_rental_income",
+    "gri": "gross_rental_income",
+    "opex": "operating_expenses",
+    "expenses": "operating_expenses",
+    "total_operating_expenses": "operating_expenses",
+    "price": "purchase_price",
+    "acquisition_price": "purchase_price",
+    "loan": "loan_amount",
+    "loan_request": "loan_amount",
+    "requested_loan_amount": "loan_amount",
+    "debt_service": "annual_debt_service",
+    "rate": "interest_rate",
+    "interest_rate_pct": "interest_rate",
+    "note_rate": "interest_rate",
+    "amortization": "amortization_years",
+    "amortization_period": "amortization_years",
+    "parcel": "parcel_id",
+    "apn": "parcel_id",
+}
+# A form needs at least this many recognized "Label: value" lines besides the address.
+MIN_FORM_FIELDS = 3
+
+_FORM_LINE_RE = re.compile(r"^\s*[-*]?\s*([A-Za-z][A-Za-z0-9 /()_.-]{1,60}?)\s*[:=]\s*(.+?)\s*$")
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+_MULTIPLIERS = {"k": 1e3, "thousand": 1e3, "m": 1e6, "mm": 1e6, "million": 1e6, "b": 1e9, "billion": 1e9}
+
+
+def _field_name(label: str) -> str:
+    name = re.sub(r"\(.*?\)", "", label.lower())
+    name = re.sub(r"[^a-z0-9]+", "_", name).strip("_")
+    return FIELD_ALIASES.get(name, name)
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """'$1,250,000', '1.25M', '6.5%', '30 years' -> float; None if there is no number."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).lower().replace(",", "").strip()
+    if text in ("", "null", "none", "n/a", "na", "-"):
+        return None
+    if "interest only" in text or "interest-only" in text or text == "io":
+        return 0.0
+    match = _NUMBER_RE.search(text)
+    if not match:
+        return None
+    number = float(match.group())
+    suffix = re.match(r"\s*([a-z]+)", text[match.end():])
+    if suffix and suffix.group(1) in _MULTIPLIERS:
+        number *= _MULTIPLIERS[suffix.group(1)]
+    return number
+
+
+def _normalize_fields(raw: Dict[str, Any]) -> Dict[str, Any]:
+    fields: Dict[str, Any] = {}
+    for label, value in raw.items():
+        if isinstance(value, dict) and label.lower() in ("loan", "property", "financials", "request", "intake"):
+            # {"property": {"address": ...}, "loan": {"amount": ...}}
+            for sub_label, sub_value in value.items():
+                name = _field_name(sub_label)
+                if name not in EXTRACTED_FIELDS + PASSTHROUGH_FIELDS:
+                    name = _field_name(f"{label}_{sub_label}")
+                fields.setdefault(name, sub_value)
+            continue
+        fields.setdefault(_field_name(label), value)
+    result: Dict[str, Any] = {}
+    for name in TEXT_FIELDS:
+        value = fields.get(name)
+        result[name] = str(value).strip() if value not in (None, "") else None
+    for name in NUMBER_FIELDS:
+        result[name] = parse_number(fields.get(name))
+    for name in INTEGER_FIELDS:
+        number = parse_number(fields.get(name))
+        result[name] = int(number) if number is not None else None
+    for name in PASSTHROUGH_FIELDS:
+        if fields.get(name) not in (None, ""):
+            result[name] = fields[name]
+    return result
+
+
+def parse_structured_request(text: str) -> Optional[Dict[str, Any]]:
+    """Extracted fields for a JSON or intake-form request; None for free text."""
+    if not text or not text.strip():
+        return None
+    stripped = text.strip()
+    if stripped.startswith("{") or stripped.startswith("```"):
+        raw = parse_json_output(stripped)
+        if raw is not None:
+            fields = _normalize_fields(raw)
+            return fields if fields["property_address"] else None
+    form = {}
+    other_lines = 0
+    for line in stripped.splitlines():
+        if not line.strip():
+            continue
+        match = _FORM_LINE_RE.match(line)
+        if match and _field_name(match.group(1)) in EXTRACTED_FIELDS + PASSTHROUGH_FIELDS:
+            form.setdefault(match.group(1), match.group(2))
+        else:
+            other_lines += 1
+    fields = _normalize_fields(form)
+    recognized = sum(1 for name in EXTRACTED_FIELDS[1:] if fields.get(name) is not None)
+    # A prose paragraph with a couple of "Label: value" lines is still free text.
+    if not fields["property_address"] or recognized < MIN_FORM_FIELDS or other_lines > len(form):
+        return None
+    return fields
+
+
+def _money(value: Optional[float]) -> str:
+    return f"${value:,.0f}" if value is not None else "not provided"
+
+
+def build_analysis_prompts(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """The orchestrator's output object (extracted fields + four prompts) from templates."""
+    address = fields["property_address"]
+    property_type = fields.get("property_type") or "commercial"
+    rate = fields.get("interest_rate")
+    amortization = fields.get("amortization_years")
+    loan_terms = (
+        f"loan amount {_money(fields.get('loan_amount'))}, purchase price {_money(fields.get('purchase_price'))}, "
+        f"gross rental income {_money(fields.get('gross_rental_income'))}, "
+        f"operating expenses {_money(fields.get('operating_expenses'))}, "
+        f"annual debt service {_money(fields.get('annual_debt_service'))}, "
+        f"interest rate {f'{rate:g}%' if rate is not None else 'not provided'}, "
+        f"amortization {f'{amortization} years' if amortization is not None else 'not provided'}"
+    )
+    regulatory_inputs = {"property_address": address}
+    regulatory_inputs.update({k: fields[k] for k in PASSTHROUGH_FIELDS if k in fields})
+    prompts = {name: fields.get(name) for name in EXTRACTED_FIELDS}
+    prompts.update({k: fields[k] for k in PASSTHROUGH_FIELDS if k in fields})
+    prompts.update({
+        "property_analysis_prompt": (
+            f"Analyze the {property_type} property at {address}: property details, comparable properties "
+            f"in the area, and price and price per square meter statistics."
+        ),
+        "market_analysis_prompt": (
+            f"Analyze the rental market for the location of {address}: FY2025 and FY2026 SAFMR average rents "
+            f"by bedroom type, year-over-year rent inflation, and current market trends for {property_type} properties."
+        ),
+        "risk_analysis_prompt": (
+            f"Assess the credit risk of financing the {property_type} property at {address} ({loan_terms}). "
+            f"Stress-test NOI, DSCR and LTV and estimate the probability of a DSCR breach over the hold period."
+        ),
+        "regulatory_analysis_prompt": (
+            f"Produce the regulatory and compliance report for this property. Inputs: {json.dumps(regulatory_inputs)}"
+        ),
+    })
+    return prompts
+
+
+def deterministic_orchestration(callback_context: CallbackContext) -> Optional[types.Content]:
+    """before_agent_callback: answers for the orchestrator when the request is structured."""
+    content = callback_context.user_content
+    text = "\n".join(p.text for p in content.parts if p.text) if content and content.parts else ""
+    try:
+        fields = parse_structured_request(text)
+    except Exception as e:
+        print(f"❌ [Intake] Structured parse failed, using the LLM orchestrator: {e}")
+        fields = None
+    if fields is None:
+        return None
+    prompts = json.dumps(build_analysis_prompts(fields))
+    print(f"[Intake] Structured request for {fields['property_address']}; skipping the LLM orchestrator")
+    callback_context.state["analysis_prompts"] = prompts
+    callback_context.state["orchestration_path"] = "deterministic"
+    return types.Content(role="model", parts=[types.Part(text=prompts)])
+
+
+def record_llm_orchestration(callback_context: CallbackContext) -> None:
+    """after_agent_callback: only reached when the LLM orchestrator ran."""
+    callback_context.state["orchestration_path"] = "llm"
+    return None
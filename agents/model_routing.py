@@ -0,0 +1,145 @@
+"""
+Model tiers per agent, with downgrades under a per-loan latency budget.
+
+Every agent asks `model_for(agent_name)` for its model instead of hard-coding
+one. Agents are assigned a tier (large / medium / small) in AGENT_TIERS, and
+each tier maps to a model name:
+
+- MODEL_TIER_LARGE (default: MODEL, else gemini-2.5-pro),
+  MODEL_TIER_MEDIUM (gemini-2.5-flash) and MODEL_TIER_SMALL
+  (gemini-2.5-flash-lite) set the model names;
+- MODEL_TIERS="agent=tier,..." overrides agent tiers and
+  MODEL_MIN_TIERS="agent=tier,..." sets the lowest tier an agent may be
+  downgraded to.
+
+ModelRoutingPlugin enforces a latency budget. The budget comes from the
+session state `latency_budget_s` (the batch runner's --latency-budget) or
+LOAN_LATENCY_BUDGET_SECONDS. Once a loan has used DOWNGRADE_STEPS of its
+budget, each following model call is served one or two tiers lower, but
+never below the agent's minimum. The tier and model that served each agent
+are recorded in the session state under `model_tier:<agent name>` (one key
+per agent, so parallel agents never overwrite each other); `model_tiers(state)`
+collects them.
+"""
+
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.plugins.base_plugin import BasePlugin
+
+TIERS = ["large", "medium", "small"]
+TIER_MODELS = {
+    "large": os.getenv("MODEL_TIER_LARGE", os.getenv("MODEL", "gemini-2.5-pro")),
+    "medium": os.getenv("MODEL_TIER_MEDIUM", "gemini-2.5-flash"),
+    "small": os.getenv("MODEL_TIER_SMALL", "gemini-2.5-flash-lite"),
+}
+DEFAULT_TIER = "large"
+# Extraction and tool-driven lookups run on smaller tiers; judgment-heavy stages keep the large model.
+AGENT_TIERS = {
+    "PromptOrchestratorAgent": "small",
+    "property_agent": "medium",
+    "MarketAnalysisAgent": "medium",
+    "property_regulatory_analyst_agent": "large",
+    "financial_metrics_agent": "small",
+    "demographic_details_agent": "medium",
+    "risk_analysis_agent": "large",
+    "FinalCreditMemoAgent": "large",
+    "DeclineMemoAgent": "small",
+    "visualization_agent": "medium",
+}
+MIN_TIERS = {
+    "risk_analysis_agent": "medium",
+    "FinalCreditMemoAgent": "medium",
+}
+# (fraction of the latency budget used, tiers to step down)
+DOWNGRADE_STEPS = [(0.5, 1), (0.8, 2)]
+STATE_KEY_PREFIX = "model_tier:"
+DEFAULT_LATENCY_BUDGET_SECONDS = float(os.getenv("LOAN_LATENCY_BUDGET_SECONDS", "0"))
+
+
+def _parse_assignments(value: Optional[str]) -> Dict[str, str]:
+    """'agent=tier,agent=tier' -> {agent: tier}; unknown tiers are ignored."""
+    assignments = {}
+    for item in (value or "").split(","):
+        name, _, tier = item.partition("=")
+        if name.strip() and tier.strip().lower() in TIERS:
+            assignments[name.strip()] = tier.strip().lower()
+    return assignments
+
+
+AGENT_TIERS.update(_parse_assignments(os.getenv("MODEL_TIERS")))
+MIN_TIERS.update(_parse_assignments(os.getenv("MODEL_MIN_TIERS")))
+
+
+def tier_for(agent_name: str) -> str:
+    return AGENT_TIERS.get(agent_name, DEFAULT_TIER)
+
+
+def model_for(agent_name: str) -> str:
+    """The model name of the agent's configured tier."""
+    return TIER_MODELS[tier_for(agent_name)]
+
+
+def downgraded_tier(agent_name: str, budget_used: float) -> str:
+    """The agent's tier after stepping down for the fraction of the latency budget already used."""
+    tier = tier_for(agent_name)
+    steps = max([s for threshold, s in DOWNGRADE_STEPS if budget_used >= threshold], default=0)
+    floor = TIERS.index(MIN_TIERS.get(agent_name, TIERS[-1]))
+    return TIERS[max(TIERS.index(tier), min(TIERS.index(tier) + steps, floor))]
+
+
+class ModelRoutingPlugin(BasePlugin):
+    """Downgrades model tiers when a loan's latency budget is at risk and records the tier per agent."""
+
+    def __init__(self, latency_budget_s: Optional[float] = None):
+        super().__init__(name="model_routing")
+        self.latency_budget_s = DEFAULT_LATENCY_BUDGET_SECONDS if latency_budget_s is None else latency_budget_s
+        self._started: Dict[str, float] = {}
+
+    async def before_run_callback(self, *, invocation_context) -> None:
+        self._started[invocation_context.invocation_id] = time.perf_counter()
+        return None
+
+    async def after_run_callback(self, *, invocation_context) -> None:
+        self._started.pop(invocation_context.invocation_id, None)
+        return None
+
+    async def before_model_callback(self, *, callback_context: CallbackContext, llm_request) -> None:
+        agent = callback_context.agent_name
+        budget = float(callback_context.state.get("latency_budget_s") or self.latency_budget_s or 0)
+        started = self._started.get(callback_context.invocation_id)
+        tier = tier_for(agent)
+        budget_used = None
+        if budget > 0 and started is not None:
+            budget_used = (time.perf_counter() - started) / budget
+            tier = downgraded_tier(agent, budget_used)
+            if tier != tier_for(agent) and isinstance(llm_request.model, str):
+                # The agent's model object sends the request with llm_request.model.
+                llm_request.model = TIER_MODELS[tier]
+        key = STATE_KEY_PREFIX + agent
+        entry = dict(callback_context.state.get(key) or {"turns": 0, "downgraded_turns": 0})
+        entry["turns"] += 1
+        if tier != tier_for(agent):
+            entry["downgraded_turns"] += 1
+            entry["budget_used"] = round(budget_used, 3)
+        # The tier of the latest turn is the one that wrote the stage output.
+        entry["tier"], entry["model"] = tier, llm_request.model
+        callback_context.state[key] = entry
+        return None
+
+
+def model_tiers(state: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """agent -> {"tier", "model", "turns", "downgraded_turns"} from a session state."""
+    return {key[len(STATE_KEY_PREFIX):]: value for key, value in state.items() if key.startswith(STATE_KEY_PREFIX)}
+
+
+def tier_summary(model_tiers_per_loan: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    """agent -> {tier: number of loans whose stage was served by it}, over batch records' model_tiers."""
+    summary: Dict[str, Dict[str, int]] = {}
+    for tiers in model_tiers_per_loan:
+        for agent, entry in (tiers or {}).items():
+            counts = summary.setdefault(agent, {})
+            counts[entry["tier"]] = counts.get(entry["tier"], 0) + 1
+    return summary
@@ -0,0 +1,166 @@
+"""
+Early-decline policy gate.
+
+PolicyGateAgent runs right after the orchestrator. It computes NOI, DSCR, LTV
+and cap rate from the extracted loan inputs with the financial calculators
+(`compute_underwriting_metrics`), without a model call. Annual debt service
+is amortized from the loan amount, rate and term when the request does not
+state it. The metrics are then checked against POLICY_RULES.
+
+- Pass: the full pipeline runs and the short decline memo is skipped.
+- Hard fail (any rule breached): only the research stages listed in
+  DECLINE_STAGES, plus any listed by the breached rules, still run. Risk
+  analysis and the full credit memo are skipped, and DeclineMemoAgent writes
+  a short decline memo instead.
+
+Metrics that cannot be computed from the inputs never fail a rule, so free-text
+requests with missing figures go through the full pipeline.
+
+Rules are configured with POLICY_RULES="metric<op>threshold[@stage+stage],...".
+The metrics are net_operating_income, debt_service_coverage_ratio,
+loan_to_value_ratio and capitalization_rate. For example:
+"loan_to_value_ratio>90,debt_service_coverage_ratio<1.0@financial_metrics_agent".
+POLICY_DECLINE_STAGES="stage,..." lists the research stages that run on every
+decline.
+
+The decision is written to session state under `policy_decision`, and the
+skipped stages under the scheduler's `skip_stages` key (see agents/scheduler.py).
+"""
+
+import json
+import operator
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+from pydantic import Field
+
+from agents.scheduler import SKIP_STATE_KEY
+from agents.tools.state_json import parse_json_output
+
+DECISION_STATE_KEY = "policy_decision"
+PROCEED, DECLINE = "proceed", "decline"
+OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+# Stages skipped on a decline unless a rule or DECLINE_STAGES lets them run; the
+# decline memo is skipped otherwise.
+DECLINE_SKIPPED_STAGES = ["risk_analysis_agent", "FinalCreditMemoAgent"]
+DECLINE_MEMO_AGENT = "DeclineMemoAgent"
+
+
+@dataclass
+class PolicyRule:
+    metric: str
+    op: str
+    threshold: float
+    # Research stages that still run when this rule fails.
+    stages: List[str] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        return f"{self.metric} {self.op} {self.threshold:g}"
+
+    def breached(self, value: Optional[float]) -> bool:
+        return value is not None and OPERATORS[self.op](value, self.threshold)
+
+
+POLICY_RULES = [
+    PolicyRule("loan_to_value_ratio", ">", 90.0),
+    PolicyRule("debt_service_coverage_ratio", "<", 1.0),
+    PolicyRule("net_operating_income", "<=", 0.0),
+]
+DECLINE_STAGES: List[str] = []
+
+_RULE_RE = re.compile(r"^\s*([a-z_]+)\s*(<=|>=|<|>)\s*(-?\d+(?:\.\d+)?)\s*(?:@\s*([\w+\s]+))?$")
+
+
+def parse_rules(value: Optional[str]) -> List[PolicyRule]:
+    """'metric<op>threshold[@stage+stage],...' -> [PolicyRule]; malformed items are ignored."""
+    rules = []
+    for item in (value or "").split(","):
+        match = _RULE_RE.match(item)
+        if match:
+            stages = [s.strip() for s in (match.group(4) or "").split("+") if s.strip()]
+            rules.append(PolicyRule(match.group(1), match.group(2), float(match.group(3)), stages))
+    return rules
+
+
+if os.getenv("POLICY_RULES") is not None:
+    POLICY_RULES = parse_rules(os.getenv("POLICY_RULES"))
+if os.getenv("POLICY_DECLINE_STAGES") is not None:
+    DECLINE_STAGES = [s.strip() for s in os.getenv("POLICY_DECLINE_STAGES", "").split(",") if s.strip()]
+
+
+def gate_metrics(fields: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """NOI / DSCR / LTV / cap rate from the orchestrator's fields; None where inputs are missing."""
+    from agents.subagents.financial_metrics_agent.tools import compute_underwriting_metrics
+    from agents.subagents.risk_analysis_agent.stress_test import DEFAULT_AMORTIZATION_YEARS, annual_debt_service
+
+    debt_service = fields.get("annual_debt_service")
+    if debt_service is None and fields.get("loan_amount") and fields.get("interest_rate") is not None:
+        amortization = fields.get("amortization_years")
+        debt_service = float(annual_debt_service(
+            fields["loan_amount"], fields["interest_rate"] / 100,
+            DEFAULT_AMORTIZATION_YEARS if amortization is None else amortization,
+        ))
+    metrics = compute_underwriting_metrics(
+        gross_rental_income=fields.get("gross_rental_income"),
+        operating_expenses=fields.get("operating_expenses"),
+        annual_debt_service=debt_service,
+        loan_amount=fields.get("loan_amount"),
+        purchase_price=fields.get("purchase_price"),
+    )
+    values = {name: metric["value"] for name, metric in metrics.items()}
+    values["annual_debt_service"] = round(debt_service, 2) if debt_service is not None else None
+    return values
+
+
+def evaluate_policy(fields: Dict[str, Any], rules: Optional[List[PolicyRule]] = None,
+                    decline_stages: Optional[List[str]] = None) -> Dict[str, Any]:
+    """{"decision", "metrics", "failed_rules", "run_stages"} for the extracted loan fields."""
+    rules = POLICY_RULES if rules is None else rules
+    metrics = gate_metrics(fields)
+    failed = [rule for rule in rules if rule.breached(metrics.get(rule.metric))]
+    run_stages = list(DECLINE_STAGES if decline_stages is None else decline_stages)
+    for rule in failed:
+        run_stages += [s for s in rule.stages if s not in run_stages]
+    return {
+        "decision": DECLINE if failed else PROCEED,
+        "metrics": metrics,
+        "failed_rules": [{"rule": str(rule), "value": metrics.get(rule.metric)} for rule in failed],
+        "run_stages": run_stages if failed else [],
+    }
+
+
+class PolicyGateAgent(BaseAgent):
+    """Declines non-starter loans before the research stages, without a model call."""
+
+    research_stages: List[str] = Field(default_factory=list)
+    """Research stage names; those not allowed by the decision are skipped on a decline."""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        prompts = parse_json_output(state.get("analysis_prompts")) or {}
+        fields = {**(prompts.get("extracted_data") or {}), **prompts}
+        try:
+            decision = evaluate_policy(fields)
+        except Exception as e:
+            print(f"❌ [Policy Gate] Evaluation failed, running the full pipeline: {e}")
+            decision = {"decision": PROCEED, "metrics": {}, "failed_rules": [], "run_stages": [], "error": str(e)}
+        if decision["decision"] == DECLINE:
+            skipped = [s for s in self.research_stages if s not in decision["run_stages"]] + DECLINE_SKIPPED_STAGES
+            print(f"[Policy Gate] Declining {fields.get('property_address')}: "
+                  + "; ".join(f"{f['rule']} (actual {f['value']})" for f in decision["failed_rules"]))
+        else:
+            skipped = [DECLINE_MEMO_AGENT]
+        text = json.dumps(decision)
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=EventActions(state_delta={DECISION_STATE_KEY: text, SKIP_STATE_KEY: skipped}),
+        )
@@ -0,0 +1,215 @@
+"""
+Dependency-aware stage scheduler.
+
+StageGraphAgent runs its sub-agents as a DAG instead of fixed sequential and
+parallel blocks. Each stage declares the session-state keys it reads (`reads`)
+and writes (`writes`, default: its output_key). A stage starts as soon as
+every stage that writes one of its reads has finished. So risk_analysis_agent
+starts once the financial and demographic stages are done, while the
+regulatory research is still running.
+
+- Stages upstream of every other stage (the orchestrator) run on the
+  scheduler's own branch, so every later stage sees them in its history. All
+  other stages run on their own branch, isolated like ParallelAgent branches.
+- Reads that no stage writes are inputs of the run and never block.
+- When a stage fails, the running stages are cancelled and its error is raised.
+- A stage whose name is in the state's `skip_stages` list when it becomes
+  ready is not run; it counts as finished for the stages that depend on it.
+
+After each run the schedule is written to session state under `schedule`.
+It holds each stage's start and end (seconds from the start of the run) and
+the critical path: the chain of stages, each gated by the one before it.
+`barrier_s` is the wall time the same stage durations would take with a
+barrier between dependency levels (the former Sequential -> Parallel ->
+Sequential graph). `saved_s` is the wall time the overlap saved.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional, Set
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from pydantic import Field
+
+SCHEDULE_STATE_KEY = "schedule"
+# Stage names a stage may write to session state to have them skipped (e.g. the policy gate).
+SKIP_STATE_KEY = "skip_stages"
+
+
+class StageGraphAgent(BaseAgent):
+    """Runs sub-agents as soon as the stages producing their inputs have finished."""
+
+    reads: Dict[str, List[str]] = Field(default_factory=dict)
+    """Sub-agent name -> state keys it reads."""
+    writes: Dict[str, List[str]] = Field(default_factory=dict)
+    """Sub-agent name -> state keys it writes; defaults to the agent's output_key."""
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self.levels()  # Rejects cycles at construction time.
+
+    def stage_writes(self, agent: BaseAgent) -> List[str]:
+        if agent.name in self.writes:
+            return self.writes[agent.name]
+        output_key = getattr(agent, "output_key", None)
+        return [output_key] if output_key else []
+
+    def dependencies(self) -> Dict[str, Set[str]]:
+        """Stage name -> names of the stages writing the keys it reads."""
+        writers: Dict[str, Set[str]] = {}
+        for agent in self.sub_agents:
+            for key in self.stage_writes(agent):
+                writers.setdefault(key, set()).add(agent.name)
+        return {
+            agent.name: {w for key in self.reads.get(agent.name, []) for w in writers.get(key, ())} - {agent.name}
+            for agent in self.sub_agents
+        }
+
+    def levels(self) -> Dict[str, int]:
+        """Stage name -> length of its longest dependency chain (0 = no dependencies)."""
+        deps = self.dependencies()
+        levels: Dict[str, int] = {}
+        visiting: Set[str] = set()
+
+        def level(name: str) -> int:
+            if name not in levels:
+                if name in visiting:
+                    raise ValueError(f"{self.name}: stage dependency cycle through {name}")
+                visiting.add(name)
+                levels[name] = 1 + max((level(d) for d in deps[name]), default=-1)
+                visiting.discard(name)
+            return levels[name]
+
+        for name in deps:
+            level(name)
+        return levels
+
+    def _shared_branch_stages(self) -> Set[str]:
+        """Stages every other stage depends on, directly or transitively."""
+        deps = self.dependencies()
+        upstream: Dict[str, Set[str]] = {}
+
+        def ancestors(name: str) -> Set[str]:
+            if name not in upstream:
+                upstream[name] = set(deps[name]).union(*(ancestors(d) for d in deps[name]))
+            return upstream[name]
+
+        names = set(deps)
+        return {n for n in names if all(n in ancestors(other) for other in names - {n})}
+
+    def _stage_ctx(self, agent: BaseAgent, ctx: InvocationContext, shared: Set[str]) -> InvocationContext:
+        if agent.name in shared:
+            return ctx
+        stage_ctx = ctx.model_copy()
+        suffix = f"{self.name}.{agent.name}"
+        stage_ctx.branch = f"{ctx.branch}.{suffix}" if ctx.branch else suffix
+        return stage_ctx
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        deps = self.dependencies()
+        shared = self._shared_branch_stages()
+        agents = {agent.name: agent for agent in self.sub_agents}
+        pending = [agent.name for agent in self.sub_agents]
+        running: Dict[str, asyncio.Task] = {}
+        done: Set[str] = set()
+        times: Dict[str, Dict[str, float]] = {}
+        skipped: List[str] = []
+        queue: asyncio.Queue = asyncio.Queue()
+        start = time.perf_counter()
+
+        async def run_stage(name: str) -> None:
+            error: Optional[BaseException] = None
+            try:
+                async for event in agents[name].run_async(self._stage_ctx(agents[name], ctx, shared)):
+                    consumed = asyncio.Event()
+                    await queue.put((name, event, consumed))
+                    # State deltas are applied once the runner has taken the event.
+                    await consumed.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = e
+            await queue.put((name, None, error))
+
+        def start_ready() -> None:
+            ready = [n for n in pending if deps[n] <= done]
+            while ready:
+                for name in ready:
+                    pending.remove(name)
+                    if name in (ctx.session.state.get(SKIP_STATE_KEY) or []):
+                        skipped.append(name)
+                        done.add(name)
+                    else:
+                        times[name] = {"start_s": time.perf_counter() - start}
+                        running[name] = asyncio.create_task(run_stage(name))
+                # Skipped stages may release their dependents straight away.
+                ready = [n for n in pending if deps[n] <= done]
+
+        try:
+            start_ready()
+            while running:
+                name, event, payload = await queue.get()
+                if event is None:
+                    running.pop(name)
+                    if isinstance(payload, BaseException):
+                        raise payload
+                    times[name]["end_s"] = time.perf_counter() - start
+                    done.add(name)
+                    start_ready()
+                    continue
+                yield event
+                payload.set()
+        finally:
+            for task in running.values():
+                task.cancel()
+
+        schedule = self.schedule_report(times, time.perf_counter() - start)
+        schedule["skipped"] = skipped
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={SCHEDULE_STATE_KEY: schedule}),
+        )
+
+    def schedule_report(self, times: Dict[str, Dict[str, float]], wall_s: float) -> Dict[str, Any]:
+        """Stage timings, critical path and the wall time saved over a levelled barrier schedule."""
+        deps = self.dependencies()
+        levels = self.levels()
+        durations = {name: t["end_s"] - t["start_s"] for name, t in times.items() if "end_s" in t}
+        barrier_s = sum(
+            max((durations.get(n, 0.0) for n, lvl in levels.items() if lvl == level), default=0.0)
+            for level in set(levels.values())
+        )
+        path: List[str] = []
+        name = max(durations, key=lambda n: times[n]["end_s"], default=None)
+        while name is not None:
+            path.append(name)
+            name = max(deps[name] & set(durations), key=lambda n: times[n]["end_s"], default=None)
+        return {
+            "stages": {name: {"start_s": round(t["start_s"], 3), "end_s": round(t.get("end_s", wall_s), 3),
+                              "level": levels[name]} for name, t in times.items()},
+            "critical_path": list(reversed(path)),
+            "wall_s": round(wall_s, 3),
+            "barrier_s": round(barrier_s, 3),
+            "saved_s": round(barrier_s - wall_s, 3),
+        }
+
+
+def schedule_summary(schedules: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Mean wall / barrier / saved seconds and critical-path frequency over batch records' schedules."""
+    schedules = [s for s in schedules if s]
+    if not schedules:
+        return {}
+    paths: Dict[str, int] = {}
+    for schedule in schedules:
+        key = " -> ".join(schedule["critical_path"])
+        paths[key] = paths.get(key, 0) + 1
+    return {
+        "loans": len(schedules),
+        **{f"mean_{k}": round(sum(s[k] for s in schedules) / len(schedules), 3)
+           for k in ("wall_s", "barrier_s", "saved_s")},
+        "critical_paths": dict(sorted(paths.items(), key=lambda item: -item[1])),
+    }
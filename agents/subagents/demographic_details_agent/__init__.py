@@ -14,4 +14,10 @@
 
 """demographic_details_agent for finding demographic information."""
 
-from .agent import demographic_details_agent
\ No newline at end of file
+
+def __getattr__(attr):
+    if attr == "demographic_details_agent":
+        from .agent import demographic_details_agent
+
+        return demographic_details_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
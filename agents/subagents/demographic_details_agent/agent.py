@@ -12,19 +12,76 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""demographic_details_agent for calculating demographic data."""
+"""demographic_details_agent for calculating demographic data.
+
+Reports are read from and written to the jurisdiction store (store.py): when
+the property's city already has a fresh entry the LLM is skipped entirely.
+"""
+
+import json
+from typing import Optional
 
 from google.adk import Agent
-from google.adk.tools import google_search
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
+
+from agents.model_routing import model_for
+from agents.tools.state_json import parse_json_output
+from agents.tools.web_search import search_tool
 
 from . import prompt
+from .store import get_demographic_store, jurisdiction_key
+
+MODEL = model_for("demographic_details_agent")
+
+
+def _jurisdiction(callback_context: CallbackContext) -> Optional[str]:
+    prompts = parse_json_output(callback_context.state.get("analysis_prompts")) or {}
+    address = prompts.get("property_address") or (prompts.get("extracted_data") or {}).get("property_address")
+    if not address and callback_context.user_content and callback_context.user_content.parts:
+        # Pre-warm runs send the jurisdiction as the message.
+        address = callback_context.user_content.parts[0].text
+    return jurisdiction_key(address) if isinstance(address, str) else None
+
+
+def use_stored_demographics(callback_context: CallbackContext) -> Optional[types.Content]:
+    """Answers from the store, skipping the LLM, when the jurisdiction's entry is fresh."""
+    key = _jurisdiction(callback_context)
+    if key is None or callback_context.state.get("demographic_refresh"):
+        return None
+    try:
+        data = get_demographic_store().get_fresh(key)
+    except Exception as e:
+        print(f"❌ [Demographic Store] Lookup failed: {e}")
+        return None
+    if data is None:
+        return None
+    print(f"[Demographic Store] Using stored demographic data for {key}")
+    report = json.dumps({"demographic_data": data})
+    callback_context.state["demographic_report"] = report
+    return types.Content(role="model", parts=[types.Part(text=report)])
+
+
+def store_demographics(callback_context: CallbackContext) -> None:
+    """Saves the researched demographic_data under the property's jurisdiction."""
+    report = parse_json_output(callback_context.state.get("demographic_report")) or {}
+    data = report.get("demographic_data")
+    if not isinstance(data, dict):
+        return None
+    try:
+        key = get_demographic_store().put(_jurisdiction(callback_context) or str(data.get("jurisdiction", "")), data)
+        print(f"[Demographic Store] Saved demographic data for {key}")
+    except Exception as e:
+        print(f"❌ [Demographic Store] Save failed: {e}")
+    return None
 
-MODEL = "gemini-2.5-pro"
 
 demographic_details_agent = Agent(
     model=MODEL,
     name="demographic_details_agent",
     instruction=prompt.DEMOGRAPHIC_DETAILS_AGENT_PROMPT,
     output_key="demographic_report",
-    tools=[google_search],
+    tools=[search_tool()],
+    before_agent_callback=use_stored_demographics,
+    after_agent_callback=store_demographics,
 )
@@ -0,0 +1,94 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bulk pre-warming of the demographic store for a list of target metros.
+
+    python -m agents.subagents.demographic_details_agent.prewarm metros.txt --concurrency 4
+
+metros.txt holds one "City, ST" per line. Metros with a fresh entry are
+skipped (unless --force); the others run demographic_details_agent alone,
+whose after-callback saves the result. --list prints the store's contents.
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, List
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from .agent import demographic_details_agent
+from .store import get_demographic_store, jurisdiction_key
+
+APP_NAME = "demographic_prewarm"
+USER_ID = "prewarm"
+
+
+async def prewarm(metros: List[str], concurrency: int = 4, force: bool = False) -> Dict[str, Any]:
+    """Researches every metro that has no fresh entry; returns per-outcome lists of keys."""
+    store = get_demographic_store()
+    result = {"fetched": [], "fresh": [], "failed": [], "invalid": []}
+    pending = []
+    for metro in dict.fromkeys(m.strip() for m in metros if m.strip()):
+        key = jurisdiction_key(metro)
+        if key is None:
+            result["invalid"].append(metro)
+        elif not force and store.get_fresh(key) is not None:
+            result["fresh"].append(key)
+        else:
+            pending.append(key)
+
+    runner = Runner(agent=demographic_details_agent, app_name=APP_NAME, session_service=InMemorySessionService())
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def research(key: str):
+        async with semaphore:
+            session = await runner.session_service.create_session(
+                app_name=APP_NAME, user_id=USER_ID, state={"demographic_refresh": force}
+            )
+            message = types.Content(role="user", parts=[types.Part(text=key)])
+            try:
+                async for _ in runner.run_async(user_id=USER_ID, session_id=session.id, new_message=message):
+                    pass
+            except Exception as e:
+                print(f"❌ [Demographic Prewarm] {key} failed: {e}")
+        result["fetched" if store.get_fresh(key) is not None else "failed"].append(key)
+
+    try:
+        await asyncio.gather(*(research(key) for key in pending))
+    finally:
+        await runner.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-warm the demographic store for a list of metros.")
+    parser.add_argument("metros", nargs="?", help='file with one "City, ST" per line')
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--force", action="store_true", help="re-research metros that are still fresh")
+    parser.add_argument("--list", action="store_true", help="print stored jurisdictions and stale fields")
+    args = parser.parse_args()
+
+    if args.list or not args.metros:
+        print(json.dumps(get_demographic_store().entries(), indent=2))
+        return
+    with open(args.metros, encoding="utf-8") as f:
+        metros = f.read().splitlines()
+    print(json.dumps(asyncio.run(prewarm(metros, args.concurrency, args.force)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,14 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""demographic_details_agent for finding demographic information using Google Search."""
+"""demographic_details_agent for finding demographic information using web search."""
 
 DEMOGRAPHIC_DETAILS_AGENT_PROMPT = """
 Agent Role: demographic_details_agent
-Tool Usage: Use the Google Search tool to find local demographic statistics.
+Tool Usage: Use the web search tool to find local demographic statistics.
 
 Overall Goal:
-For a given commercial property, produce a detailed demographic report. The agent must use Google Search to find local demographic statistics for the property's city and county. The analysis must be based on verifiable, sourced data.
+For a given commercial property, produce a detailed demographic report. The agent must use the web search tool to find local demographic statistics for the property's city and county. The analysis must be based on verifiable, sourced data.
 
 Inputs (from the `analysis_prompts` object generated by the orchestrator agent):
 - property_address: (string, mandatory) Full address of the property (street, city, state, ZIP).
@@ -27,7 +27,7 @@ Inputs (from the `analysis_prompts` object generated by the orchestrator agent):
 
 Mandatory Process — Data Collection:
 1. Iterative Searching:
-   - Use Google Search to find demographic data for the property's city and county (e.g., from census.gov, city/county economic development sites, reputable data providers).
+   - Use the web search tool to find demographic data for the property's city and county (e.g., from census.gov, city/county economic development sites, reputable data providers).
    - Example query patterns:
      * "<city> <state> population growth rate"
      * "<city> <state> median household income"
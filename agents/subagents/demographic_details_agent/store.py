@@ -0,0 +1,247 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Persistent jurisdiction-level store of `demographic_data`.
+
+The demographic report depends only on the city and state, so it is stored
+under a normalized jurisdiction key ("austin, tx") in a SQLite file
+(DEMOGRAPHIC_STORE_PATH). Every field keeps its value, source URL and the date
+it was fetched.
+
+Staleness is judged per field (DEFAULT_MAX_AGE_DAYS): unemployment is monthly
+data, population and income are annual. A field reported as "Data not
+available" is retried after MISSING_RETRY_DAYS. An entry is fresh when none
+of its fields is stale, and only then does the agent skip the LLM.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+DEFAULT_STORE_PATH = os.getenv(
+    "DEMOGRAPHIC_STORE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "cre_analyzer", "demographics.sqlite"),
+)
+FIELDS = [
+    "population",
+    "population_growth_rate",
+    "median_household_income",
+    "unemployment_rate",
+    "major_employers",
+]
+DEFAULT_MAX_AGE_DAYS = {
+    "population": 365,
+    "population_growth_rate": 365,
+    "median_household_income": 365,
+    "unemployment_rate": 45,
+    "major_employers": 180,
+}
+MISSING_RETRY_DAYS = 7
+NOT_AVAILABLE = "Data not available"
+
+US_STATES = {
+    "alabama": "al", "alaska": "ak", "arizona": "az", "arkansas": "ar", "california": "ca",
+    "colorado": "co", "connecticut": "ct", "delaware": "de", "district of columbia": "dc",
+    "florida": "fl", "georgia": "ga", "hawaii": "hi", "idaho": "id", "illinois": "il",
+    "indiana": "in", "iowa": "ia", "kansas": "ks", "kentucky": "ky", "louisiana": "la",
+    "maine": "me", "maryland": "md", "massachusetts": "ma", "michigan": "mi", "minnesota": "mn",
+    "mississippi": "ms", "missouri": "mo", "montana": "mt", "nebraska": "ne", "nevada": "nv",
+    "new hampshire": "nh", "new jersey": "nj", "new mexico": "nm", "new york": "ny",
+    "north carolina": "nc", "north dakota": "nd", "ohio": "oh", "oklahoma": "ok", "oregon": "or",
+    "pennsylvania": "pa", "rhode island": "ri", "south carolina": "sc", "south dakota": "sd",
+    "tennessee": "tn", "texas": "tx", "utah": "ut", "vermont": "vt", "virginia": "va",
+    "washington": "wa", "west virginia": "wv", "wisconsin": "wi", "wyoming": "wy",
+}
+_STATE_CODES = set(US_STATES.values())
+_STATE_PART_RE = re.compile(r"^(?P<state>[a-z .]+?)\.?(?:\s+(?P<zip>\d{5})(?:-\d{4})?)?$")
+_COUNTRY_PARTS = {"usa", "us", "u.s.", "u.s.a.", "united states", "united states of america"}
+
+
+def _state_code(text: str) -> Optional[str]:
+    match = _STATE_PART_RE.match(text)
+    if not match:
+        return None
+    state = match.group("state").strip().replace(".", "")
+    if state in _STATE_CODES:
+        return state
+    return US_STATES.get(state)
+
+
+def jurisdiction_key(address: str) -> Optional[str]:
+    """Normalized "city, st" for an address or jurisdiction string; None if no state is found.
+
+    "123 Main St, Austin, TX 78701", "Austin, Travis County, Texas" and
+    "austin tx" all map to "austin, tx".
+    """
+    text = re.sub(r"\s+", " ", address.strip().lower())
+    parts = [p.strip() for p in text.split(",") if p.strip() and p.strip() not in _COUNTRY_PARTS]
+    if len(parts) == 1:
+        # "Austin TX" / "Austin Texas 78701"
+        words = parts[0].split(" ")
+        for split in range(len(words) - 1, 0, -1):
+            state = _state_code(" ".join(words[split:]))
+            if state:
+                parts = [" ".join(words[:split]), " ".join(words[split:])]
+                break
+    for i in range(len(parts) - 1, 0, -1):
+        state = _state_code(parts[i])
+        if not state:
+            continue
+        cities = [p for p in parts[:i] if not p.endswith(" county") and not p[:1].isdigit()]
+        if cities:
+            return f"{cities[-1]}, {state}"
+        return None
+    return None
+
+
+def _fetched_on(field: Any) -> Optional[date]:
+    if isinstance(field, dict) and field.get("fetched_at"):
+        try:
+            return date.fromisoformat(str(field["fetched_at"])[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def _is_missing(field: Any) -> bool:
+    return not isinstance(field, dict) or field.get("value") in (None, "", NOT_AVAILABLE, [])
+
+
+class DemographicStore:
+    """SQLite-backed demographic_data per jurisdiction with per-field staleness."""
+
+    def __init__(
+        self,
+        path: Optional[str] = DEFAULT_STORE_PATH,
+        max_age_days: Optional[Dict[str, float]] = None,
+        missing_retry_days: float = MISSING_RETRY_DAYS,
+    ):
+        if path and path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS demographics "
+            "(key TEXT PRIMARY KEY, data TEXT, updated_at REAL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self.max_age_days = {**DEFAULT_MAX_AGE_DAYS, **(max_age_days or {})}
+        self.missing_retry_days = missing_retry_days
+
+    def get(self, jurisdiction: str) -> Optional[Dict[str, Any]]:
+        """Stored demographic_data for a jurisdiction or address (regardless of age)."""
+        key = jurisdiction_key(jurisdiction)
+        if key is None:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM demographics WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def stale_fields(self, data: Optional[Dict[str, Any]], today: Optional[date] = None) -> List[str]:
+        """Fields that are absent, undated, or older than the policy allows."""
+        if data is None:
+            return list(FIELDS)
+        today = today or date.today()
+        stale = []
+        for name in FIELDS:
+            field = data.get(name)
+            fetched = _fetched_on(field)
+            limit = self.missing_retry_days if _is_missing(field) else self.max_age_days[name]
+            if fetched is None or (today - fetched).days > limit:
+                stale.append(name)
+        return stale
+
+    def get_fresh(self, jurisdiction: str, today: Optional[date] = None) -> Optional[Dict[str, Any]]:
+        """Stored demographic_data if no field is stale, else None."""
+        data = self.get(jurisdiction)
+        if data is None or self.stale_fields(data, today):
+            return None
+        return data
+
+    def put(self, jurisdiction: str, demographic_data: Dict[str, Any], fetched_at: Optional[date] = None) -> str:
+        """Merges freshly researched fields into the stored entry and returns its key.
+
+        Fields without a "fetched_at" are stamped with `fetched_at` (today by
+        default). A new "Data not available" never replaces a stored value.
+        """
+        key = jurisdiction_key(jurisdiction) or jurisdiction_key(str(demographic_data.get("jurisdiction", "")))
+        if key is None:
+            raise ValueError(f"Could not determine city and state from {jurisdiction!r}.")
+        stamp = (fetched_at or date.today()).isoformat()
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM demographics WHERE key = ?", (key,)).fetchone()
+            merged = json.loads(row[0]) if row else {}
+            for name, field in demographic_data.items():
+                if name not in FIELDS:
+                    merged[name] = field
+                    continue
+                field = dict(field) if isinstance(field, dict) else {"value": field, "source": None}
+                field.setdefault("fetched_at", stamp)
+                if _is_missing(field) and not _is_missing(merged.get(name)):
+                    continue
+                merged[name] = field
+            self._conn.execute(
+                "INSERT OR REPLACE INTO demographics (key, data, updated_at) VALUES (?, ?, ?)",
+                (key, json.dumps(merged), time.time()),
+            )
+            self._conn.commit()
+        return key
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Every stored jurisdiction with its last update time and stale fields."""
+        with self._lock:
+            rows = self._conn.execute("SELECT key, data, updated_at FROM demographics ORDER BY key").fetchall()
+        return [
+            {
+                "jurisdiction": key,
+                "updated_at": datetime.fromtimestamp(updated_at).isoformat(timespec="seconds"),
+                "stale_fields": self.stale_fields(json.loads(data)),
+            }
+            for key, data, updated_at in rows
+        ]
+
+    def delete(self, jurisdiction: str) -> None:
+        key = jurisdiction_key(jurisdiction)
+        with self._lock:
+            self._conn.execute("DELETE FROM demographics WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_store: Optional[DemographicStore] = None
+_store_lock = threading.Lock()
+
+
+def get_demographic_store() -> DemographicStore:
+    """Returns the process-wide store, opening it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DemographicStore()
+    return _store
+
+
+def set_demographic_store(store: DemographicStore) -> None:
+    """Replaces the process-wide store (e.g. with an in-memory one)."""
+    global _store
+    with _store_lock:
+        _store = store
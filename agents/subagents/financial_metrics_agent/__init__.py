@@ -14,5 +14,12 @@
 
 """financial_metrics_agent for finding information using google search"""
 
-from .agent import financial_metrics_agent
 from . import tools
+
+
+def __getattr__(attr):
+    if attr == "financial_metrics_agent":
+        from .agent import financial_metrics_agent
+
+        return financial_metrics_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
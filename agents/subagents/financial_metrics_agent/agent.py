@@ -15,19 +15,19 @@
 """financial_metrics_agent for calculating financial metrics."""
 
 from google.adk import Agent
-from google.adk.tools import google_search
+
+from agents.model_routing import model_for
+from agents.tools.web_search import search_tool
 
 from . import prompt
 from . import tools
 
-MODEL = "gemini-2.5-pro"
-
-google_search.bypass_multi_tools_limit = True
+MODEL = model_for("financial_metrics_agent")
 
 financial_metrics_agent = Agent(
     model=MODEL,
     name="financial_metrics_agent",
     instruction=prompt.FINANCIAL_METRICS_AGENT_PROMPT,
     output_key="financial_report",
-    tools=[google_search] + tools.FINANCIAL_CALCULATION_TOOLS,
+    tools=[search_tool()] + tools.FINANCIAL_CALCULATION_TOOLS,
 )
@@ -0,0 +1,106 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Vectorized NOI / DSCR / LTV / Cap Rate for portfolios of loans.
+
+Same formulas and rounding as the scalar calculators in `tools.py`, computed
+in one NumPy pass. Invalid rows do not raise: the metric is NaN and the row is
+flagged in `errors[metric]["missing_input"]` or
+`errors[metric]["zero_denominator"]`.
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+INPUT_COLUMNS = [
+    "gross_rental_income",
+    "operating_expenses",
+    "annual_debt_service",
+    "loan_amount",
+    "purchase_price",
+]
+METRICS = ["net_operating_income", "debt_service_coverage_ratio", "loan_to_value_ratio", "capitalization_rate"]
+
+
+def _as_array(values: Any, size: Optional[int] = None) -> np.ndarray:
+    if values is None:
+        return np.full(size or 0, np.nan)
+    # Handles lists with None, NumPy arrays, pandas Series and Arrow arrays.
+    return np.asarray(values, dtype=float)
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray, scale: float):
+    missing = np.isnan(numerator) | np.isnan(denominator)
+    zero = ~missing & (denominator == 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = np.round(numerator / denominator * scale, 2)
+    values[missing | zero] = np.nan
+    return values, {"missing_input": missing, "zero_denominator": zero}
+
+
+def calculate_metrics_batch(
+    gross_rental_income: Any = None,
+    operating_expenses: Any = None,
+    annual_debt_service: Any = None,
+    loan_amount: Any = None,
+    purchase_price: Any = None,
+) -> Dict[str, Any]:
+    """Computes all four metrics for equally sized columns of loan inputs.
+
+    Missing values may be given as None or NaN; an omitted column counts as
+    missing for every row.
+
+    Returns:
+      {"net_operating_income": array, "debt_service_coverage_ratio": array,
+       "loan_to_value_ratio": array, "capitalization_rate": array,
+       "errors": {metric: {"missing_input": bool array, "zero_denominator": bool array}}}
+    """
+    columns = (gross_rental_income, operating_expenses, annual_debt_service, loan_amount, purchase_price)
+    size = next((len(c) for c in columns if c is not None), 0)
+    gri = _as_array(gross_rental_income, size)
+    opex = _as_array(operating_expenses, size)
+    debt_service = _as_array(annual_debt_service, size)
+    loan = _as_array(loan_amount, size)
+    price = _as_array(purchase_price, size)
+    if len({a.shape for a in (gri, opex, debt_service, loan, price)}) != 1:
+        raise ValueError("All input columns must have the same length.")
+
+    noi = gri - opex
+    noi_missing = np.isnan(noi)
+    dscr, dscr_errors = _ratio(noi, debt_service, 1)
+    ltv, ltv_errors = _ratio(loan, price, 100)
+    cap_rate, cap_rate_errors = _ratio(noi, price, 100)
+    return {
+        "net_operating_income": noi,
+        "debt_service_coverage_ratio": dscr,
+        "loan_to_value_ratio": ltv,
+        "capitalization_rate": cap_rate,
+        "errors": {
+            "net_operating_income": {"missing_input": noi_missing, "zero_denominator": np.zeros_like(noi_missing)},
+            "debt_service_coverage_ratio": dscr_errors,
+            "loan_to_value_ratio": ltv_errors,
+            "capitalization_rate": cap_rate_errors,
+        },
+    }
+
+
+def calculate_metrics_table(table: Any) -> Dict[str, Any]:
+    """`calculate_metrics_batch` over a column container.
+
+    Accepts anything indexable by column name: a dict of lists/arrays, a
+    pandas DataFrame or a pyarrow Table. Absent columns count as missing.
+    """
+    names = set(table.column_names) if hasattr(table, "column_names") else set(table.keys())
+    return calculate_metrics_batch(**{c: table[c] for c in INPUT_COLUMNS if c in names})
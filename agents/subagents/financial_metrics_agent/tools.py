@@ -14,6 +14,8 @@
 
 """Tools for financial calculations."""
 
+from typing import Any, Dict, Optional
+
 from google.adk.tools import FunctionTool as Tool
 
 
@@ -51,6 +53,56 @@ def calculate_cap_rate(net_operating_income: float, purchase_price: float) -> fl
     return round((net_operating_income / purchase_price) * 100, 2)
 
 
+def _metric(func, inputs: Dict[str, Optional[float]]) -> Dict[str, Any]:
+    missing = [name for name, value in inputs.items() if value is None]
+    if missing:
+        return {"value": None, "missing_inputs": missing}
+    try:
+        return {"value": func(*inputs.values()), "source": f"Calculated via {func.__name__}"}
+    except ValueError as e:
+        return {"value": None, "error": str(e)}
+
+
+def compute_underwriting_metrics(
+    gross_rental_income: Optional[float] = None,
+    operating_expenses: Optional[float] = None,
+    net_operating_income: Optional[float] = None,
+    annual_debt_service: Optional[float] = None,
+    loan_amount: Optional[float] = None,
+    purchase_price: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Calculates NOI, DSCR, LTV and Cap Rate in one call from whatever inputs are available.
+
+    NOI is calculated from gross rental income and operating expenses unless
+    net_operating_income is given directly. Each metric that cannot be
+    calculated comes back with value null and the `missing_inputs` it needs
+    (or an `error`, e.g. for a zero denominator).
+    """
+    if net_operating_income is not None:
+        noi = {"value": net_operating_income, "source": "Provided"}
+    else:
+        noi = _metric(
+            calculate_noi,
+            {"gross_rental_income": gross_rental_income, "operating_expenses": operating_expenses},
+        )
+    noi_value = noi["value"]
+    noi_inputs = noi.get("missing_inputs", ["net_operating_income"] if noi_value is None else [])
+
+    def _with_noi(func, other_name: str, other_value: Optional[float]) -> Dict[str, Any]:
+        metric = _metric(func, {"net_operating_income": noi_value, other_name: other_value})
+        if "missing_inputs" in metric and noi_value is None:
+            # Report the raw inputs NOI needs, not NOI itself.
+            metric["missing_inputs"] = noi_inputs + [m for m in metric["missing_inputs"] if m != "net_operating_income"]
+        return metric
+
+    return {
+        "net_operating_income": noi,
+        "debt_service_coverage_ratio": _with_noi(calculate_dscr, "annual_debt_service", annual_debt_service),
+        "loan_to_value_ratio": _metric(calculate_ltv, {"loan_amount": loan_amount, "purchase_price": purchase_price}),
+        "capitalization_rate": _with_noi(calculate_cap_rate, "purchase_price", purchase_price),
+    }
+
+
 calculate_noi_tool = Tool(
     func=calculate_noi,
 )
@@ -67,9 +119,12 @@ calculate_cap_rate_tool = Tool(
     func=calculate_cap_rate,
 )
 
+compute_underwriting_metrics_tool = Tool(
+    func=compute_underwriting_metrics,
+)
+
+# One tool call returns every derivable metric; the scalar tools above remain
+# available for agents that need a single metric.
 FINANCIAL_CALCULATION_TOOLS = [
-    calculate_noi_tool,
-    calculate_dscr_tool,
-    calculate_ltv_tool,
-    calculate_cap_rate_tool,
+    compute_underwriting_metrics_tool,
 ]
\ No newline at end of file
@@ -1,3 +1,10 @@
-from .agent import market_analysis_agent
 
-__all__ = ["market_analysis_agent"]
\ No newline at end of file
+__all__ = ["market_analysis_agent"]
+
+
+def __getattr__(attr):
+    if attr == "market_analysis_agent":
+        from .agent import market_analysis_agent
+
+        return market_analysis_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
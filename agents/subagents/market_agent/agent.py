@@ -1,19 +1,16 @@
-import os
-from dotenv import load_dotenv
 from google.adk.agents import LlmAgent
-from google.adk.tools import google_search
+from agents.model_routing import model_for
+from agents.tools.web_search import search_tool
 
 from .prompt import AGENT_INSTRUCTIONS
-from .tools import bigquery_tool
+from .tools import bigquery_tool, location_tool, market_rents_tool
 
-load_dotenv()
-
-MODEL = os.getenv("MODEL", "gemini-2.5-pro")
+MODEL = model_for("MarketAnalysisAgent")
 
 market_analysis_agent = LlmAgent(
     name="MarketAnalysisAgent",
     model=MODEL,
     instruction=AGENT_INSTRUCTIONS,
-    tools=[bigquery_tool, google_search],
+    tools=[market_rents_tool, location_tool, bigquery_tool, search_tool()],
     output_key="market_analysis"
 )
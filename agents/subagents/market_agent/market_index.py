@@ -0,0 +1,205 @@
+"""
+Precomputed SAFMR market index.
+
+Both fiscal-year SAFMR tables are read once per process and reduced to:
+
+- a per-row (n, 5) matrix of bedroom-type averages, each the mean of the
+  `safmr_<n>br`, `_payment_standard_90` and `_payment_standard_110` columns
+  with NULL / non-numeric values ignored;
+- for every lookup key (ZIP code, HUD area code, lower-cased HUD area name) a
+  slot in three arrays: average rents `(n_keys, 2, 5)` for FY2025/FY2026,
+  YoY inflation `(n_keys, 5)` and overall inflation `(n_keys,)`.
+
+`lookup(location)` is then a dict lookup (or a trigram search over the keys
+for partial names) plus array indexing.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from agents.tools.location_index import LocationIndex
+from .prompt import TABLE_FY2025, TABLE_FY2026
+
+BEDROOM_TYPES = ["0br", "1br", "2br", "3br", "4br"]
+RENT_COLUMN_SUFFIXES = ["", "_payment_standard_90", "_payment_standard_110"]
+KEY_COLUMNS = ["zip_code", "hud_area_code", "hud_fair_market_rent_area_name"]
+FISCAL_YEARS = ["fy2025", "fy2026"]
+# Fuzzy matches must contain (nearly) all of the query, like LIKE '%query%'.
+MIN_FUZZY_SCORE = 0.7
+
+
+def _to_float(value: Any) -> float:
+    if value is None:
+        return np.nan
+    if isinstance(value, str):
+        value = value.replace("$", "").replace(",", "").strip()
+        if not value:
+            return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _normalize_key(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    key = " ".join(str(value).lower().split())
+    return key or None
+
+
+def _key_value(row: Dict[str, Any], column: str) -> Any:
+    value = row.get(column)
+    if column == "zip_code" and isinstance(value, int):
+        # Integer-typed ZIP columns drop leading zeros (02108 -> 2108).
+        return str(value).zfill(5)
+    return value
+
+
+def bedroom_averages(rows: List[Dict[str, Any]]) -> np.ndarray:
+    """Returns an (n_rows, 5) array of per-row bedroom-type average rents (NaN if no value)."""
+    values = np.array(
+        [
+            [[_to_float(row.get(f"safmr_{br}{suffix}")) for suffix in RENT_COLUMN_SUFFIXES] for br in BEDROOM_TYPES]
+            for row in rows
+        ],
+        dtype=float,
+    ).reshape(len(rows), len(BEDROOM_TYPES), len(RENT_COLUMN_SUFFIXES))
+    counts = (~np.isnan(values)).sum(axis=2)
+    sums = np.nansum(values, axis=2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+class MarketIndex:
+    """In-memory index of FY2025/FY2026 SAFMR averages and inflation by location key."""
+
+    def __init__(self, rows_fy2025: List[Dict[str, Any]], rows_fy2026: List[Dict[str, Any]]):
+        self._keys: Dict[Tuple[str, str], int] = {}
+        self._labels: List[str] = []
+        self._names = LocationIndex()
+        per_year = [self._group(rows) for rows in (rows_fy2025, rows_fy2026)]
+        for key_map in per_year:
+            for key in key_map:
+                if key not in self._keys:
+                    self._keys[key] = len(self._labels)
+                    self._labels.append(key[1])
+                    self._names.add(key[0], key[1])
+
+        n_keys = len(self._labels)
+        sums = np.zeros((n_keys, len(FISCAL_YEARS), len(BEDROOM_TYPES)))
+        counts = np.zeros((n_keys, len(FISCAL_YEARS), len(BEDROOM_TYPES)))
+        for year_idx, key_map in enumerate(per_year):
+            for key, (key_sums, key_counts) in key_map.items():
+                sums[self._keys[key], year_idx] = key_sums
+                counts[self._keys[key], year_idx] = key_counts
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.rents = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+            self.inflation = (self.rents[:, 1] - self.rents[:, 0]) / self.rents[:, 0] * 100
+        self.inflation[~np.isfinite(self.inflation)] = np.nan
+        valid = ~np.isnan(self.inflation)
+        inflation_sums = np.where(valid, self.inflation, 0.0).sum(axis=1)
+        valid_counts = valid.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.overall_inflation = np.where(valid_counts > 0, inflation_sums / np.maximum(valid_counts, 1), np.nan)
+
+    @staticmethod
+    def _group(rows: List[Dict[str, Any]]) -> Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]]:
+        """Sums and counts of per-row bedroom averages for every (key column, key value)."""
+        grouped: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = {}
+        if not rows:
+            return grouped
+        averages = bedroom_averages(rows)
+        present = ~np.isnan(averages)
+        filled = np.where(present, averages, 0.0)
+        for column in KEY_COLUMNS:
+            keys = [_normalize_key(_key_value(row, column)) for row in rows]
+            labels = sorted({k for k in keys if k is not None})
+            if not labels:
+                continue
+            slot = {label: i for i, label in enumerate(labels)}
+            mask = np.array([k is not None for k in keys])
+            inverse = np.array([slot[k] for k in keys if k is not None], dtype=int)
+            key_sums = np.zeros((len(labels), len(BEDROOM_TYPES)))
+            key_counts = np.zeros((len(labels), len(BEDROOM_TYPES)))
+            np.add.at(key_sums, inverse, filled[mask])
+            np.add.at(key_counts, inverse, present[mask])
+            for label, i in slot.items():
+                grouped[(column, label)] = (key_sums[i], key_counts[i])
+        return grouped
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def keys(self, column: Optional[str] = None) -> Iterable[Tuple[str, str]]:
+        return (k for k in self._keys if column is None or k[0] == column)
+
+    def resolve(self, location: str) -> Optional[Tuple[str, str]]:
+        """Finds the index key for a ZIP code, HUD area code or HUD area name."""
+        needle = _normalize_key(location)
+        if needle is None:
+            return None
+        for column in KEY_COLUMNS:
+            if (column, needle) in self._keys:
+                return (column, needle)
+        candidates = self._names.search(needle, limit=1, min_score=MIN_FUZZY_SCORE)
+        if not candidates:
+            return None
+        return (candidates[0]["column"], candidates[0]["value"])
+
+    def report(self, key: Tuple[str, str]) -> Dict[str, Any]:
+        idx = self._keys[key]
+
+        def _rounded(values: np.ndarray) -> Dict[str, Optional[float]]:
+            return {br: (None if np.isnan(v) else round(float(v), 2)) for br, v in zip(BEDROOM_TYPES, values)}
+
+        overall = self.overall_inflation[idx]
+        return {
+            "matched_on": key[0],
+            "matched_key": key[1],
+            "average_rent_fy2025": _rounded(self.rents[idx, 0]),
+            "average_rent_fy2026": _rounded(self.rents[idx, 1]),
+            "inflation_pct": _rounded(self.inflation[idx]),
+            "overall_inflation_pct": None if np.isnan(overall) else round(float(overall), 2),
+        }
+
+    def lookup(self, location: str) -> Optional[Dict[str, Any]]:
+        key = self.resolve(location)
+        return self.report(key) if key is not None else None
+
+
+_index: Optional[MarketIndex] = None
+_index_lock = threading.Lock()
+
+
+def load_market_index() -> MarketIndex:
+    """Reads both SAFMR tables through the shared executor and builds the index."""
+    from agents.tools.bigquery_executor import get_executor
+
+    columns = KEY_COLUMNS + [f"safmr_{br}{suffix}" for br in BEDROOM_TYPES for suffix in RENT_COLUMN_SUFFIXES]
+    executor = get_executor()
+    # Read straight from the backend: the index replaces the result cache for these tables.
+    rows_fy2025 = list(executor.iter_rows(f"SELECT {', '.join(columns)} FROM `{TABLE_FY2025}`"))
+    rows_fy2026 = list(executor.iter_rows(f"SELECT {', '.join(columns)} FROM `{TABLE_FY2026}`"))
+    return MarketIndex(rows_fy2025, rows_fy2026)
+
+
+def get_market_index() -> MarketIndex:
+    """Returns the process-wide index, building it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_market_index()
+                print(f"[Market Index] Indexed {len(_index)} SAFMR location keys.")
+    return _index
+
+
+def set_market_index(index: Optional[MarketIndex]) -> None:
+    """Replaces (or with None, drops) the process-wide index."""
+    global _index
+    with _index_lock:
+        _index = index
@@ -1,29 +1,41 @@
-from google.cloud import bigquery
+import json
+
 from google.adk.tools import FunctionTool
 
-__all__ = ["bigquery_tool"]
+from agents.tools.async_tools import offload
+from agents.tools.bigquery_executor import bigquery_query_async
+from agents.tools.location_index import register_source, resolve_location
+from .market_index import KEY_COLUMNS, get_market_index
+from .prompt import TABLE_FY2025, TABLE_FY2026
+
+__all__ = ["bigquery_tool", "location_tool", "market_rents_tool"]
+
+register_source(TABLE_FY2025, KEY_COLUMNS)
+register_source(TABLE_FY2026, KEY_COLUMNS)
 
-def bigquery_query(query: str) -> str:
+
+def lookup_market_rents(location: str) -> str:
   """
-  Executes a BigQuery SQL query and returns the result as a string.
+  Looks up precomputed FY2025/FY2026 SAFMR average rents and rent inflation for a location.
 
   Args:
-    query: A valid BigQuery SQL query string.
+    location: A ZIP code, HUD area code, or (partial) HUD Fair Market Rent area name.
 
   Returns:
-    A string representation of the query results, or an error message.
+    A JSON string with average rents per bedroom type for FY2025 and FY2026, the
+    YoY inflation rate per bedroom type and the overall inflation rate, or
+    {"found": false} if the location is not in the SAFMR data.
   """
-  print(f"\n[BigQuery Tool] Attempting to execute query:\n{query}\n")
   try:
-    client = bigquery.Client()
-    print("[BigQuery Tool] Successfully created BigQuery client.")
-    query_job = client.query(query)
-    results = query_job.result()
-    result_list = [dict(row) for row in results]
-    print(f"[BigQuery Tool] Query executed successfully. Found {len(result_list)} rows.")
-    return str(result_list)
+    report = get_market_index().lookup(location)
   except Exception as e:
-    print(f"❌ [BigQuery Tool] Connection/query failed: {e}")
-    return f"An error occurred while querying BigQuery: {e}"
+    print(f"❌ [Market Index] Lookup failed: {e}")
+    return f"An error occurred while looking up market rents: {e}"
+  if report is None:
+    return json.dumps({"location": location, "found": False})
+  return json.dumps({"location": location, "found": True, **report})
+
 
-bigquery_tool = FunctionTool(func=bigquery_query)
\ No newline at end of file
+bigquery_tool = FunctionTool(func=bigquery_query_async)
+location_tool = FunctionTool(func=offload(resolve_location))
+market_rents_tool = FunctionTool(func=offload(lookup_market_rents))
@@ -1,3 +1,10 @@
-from .agent import property_agent
 
 __all__ = ["property_agent"]
+
+
+def __getattr__(attr):
+    if attr == "property_agent":
+        from .agent import property_agent
+
+        return property_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
@@ -1,6 +1,7 @@
 from google.adk.agents import LlmAgent
-from google.adk.tools import google_search
-from .tools import bigquery_tool
+from agents.model_routing import model_for
+from agents.tools.web_search import search_tool
+from .tools import bigquery_tool, comparables_tool, location_tool
 from .prompt import AGENT_INSTRUCTIONS
 
 
@@ -8,8 +9,8 @@ __all__ = ["property_agent"]
 
 property_agent = LlmAgent(
     name="property_agent",
-    model="gemini-2.5-pro",
+    model=model_for("property_agent"),
     instruction=AGENT_INSTRUCTIONS,
-    tools=[bigquery_tool,google_search],
+    tools=[comparables_tool, location_tool, bigquery_tool, search_tool()],
     output_key="property_analysis",
 )
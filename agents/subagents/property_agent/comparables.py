@@ -0,0 +1,128 @@
+"""
+Deterministic comparables for the `commercial_real_estate` table.
+
+Matching rows are reduced to `price` and `area` arrays and summarized with
+NumPy: count, total, mean, median, percentiles and price per square meter
+(total price / total area over rows that have both, plus the per-row
+distribution). Rows with a NULL or non-numeric price are excluded from every
+statistic; rows with a missing or zero area are excluded from price/m² only.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from agents.tools.bigquery_executor import get_executor
+from agents.tools.location_index import get_location_index
+from .prompt import bigquery_table
+
+PERCENTILES = [10, 25, 75, 90]
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def _to_float(value: Any) -> float:
+    if value is None:
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    # "$1,250,000" / "1,200 m²" style strings
+    match = _NUMBER_RE.search(str(value).replace(",", ""))
+    return float(match.group()) if match else np.nan
+
+
+_UNESCAPED_CHARS = ("'", "\\")
+
+
+def _like_pattern(value: str) -> str:
+    # BigQuery and the SQLite stand-in disagree on escaping quotes and
+    # backslashes, so each becomes the `_` single-character wildcard:
+    # "o'fallon" -> '%o_fallon%' still matches O'Fallon on both.
+    for char in _UNESCAPED_CHARS:
+        value = value.replace(char, "_")
+    return f"'%{value}%'"
+
+
+def build_comparables_query(location: str) -> str:
+    """Exact filter when the resolver finds the title/address, LIKE otherwise."""
+    columns = "title, address, price, area"
+    candidates = get_location_index().search(location, columns=["title", "address"], limit=1)
+    if (candidates and candidates[0]["score"] == 1.0
+            and not any(char in candidates[0]["value"] for char in _UNESCAPED_CHARS)):
+        column, value = candidates[0]["column"], candidates[0]["value"]
+        return f"SELECT {columns} FROM `{bigquery_table}` WHERE {column} = '{value}'"
+    pattern = _like_pattern(location.lower())
+    return (
+        f"SELECT {columns} FROM `{bigquery_table}` "
+        f"WHERE LOWER(address) LIKE {pattern} OR LOWER(title) LIKE {pattern}"
+    )
+
+
+def _summary(values: np.ndarray) -> Dict[str, Optional[float]]:
+    if values.size == 0:
+        return {"count": 0}
+    summary = {
+        "count": int(values.size),
+        "mean": round(float(values.mean()), 2),
+        "median": round(float(np.median(values)), 2),
+        "min": round(float(values.min()), 2),
+        "max": round(float(values.max()), 2),
+    }
+    for pct, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        summary[f"p{pct}"] = round(float(value), 2)
+    return summary
+
+
+def summarize_comparables(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Vectorized price and price/m² statistics over `commercial_real_estate` rows."""
+    prices = np.array([_to_float(r.get("price")) for r in rows], dtype=float)
+    areas = np.array([_to_float(r.get("area")) for r in rows], dtype=float)
+    priced = ~np.isnan(prices)
+    with_area = priced & ~np.isnan(areas) & (areas > 0)
+
+    price_stats = _summary(prices[priced])
+    if price_stats["count"]:
+        price_stats["total"] = round(float(prices[priced].sum()), 2)
+
+    per_sqm = _summary(prices[with_area] / areas[with_area])
+    if per_sqm["count"]:
+        per_sqm["aggregate"] = round(float(prices[with_area].sum() / areas[with_area].sum()), 2)
+
+    result = {
+        "matched_rows": len(rows),
+        "price": price_stats,
+        "price_per_sqm": per_sqm,
+        "excluded": {
+            "missing_price": int((~priced).sum()),
+            "missing_area": int((priced & ~with_area).sum()),
+        },
+    }
+    if len(rows) == 1:
+        result["property"] = {k: rows[0].get(k) for k in ("title", "address")}
+    return result
+
+
+def analyze_comparables(location: str) -> str:
+    """
+    Computes price statistics for properties in `commercial_real_estate` matching a location.
+
+    Args:
+      location: A property title, address, or area/city name.
+
+    Returns:
+      A JSON summary with the matched row count, price statistics (count,
+      total, mean, median, min, max, p10/p25/p75/p90), price per square meter
+      (aggregate = total price / total area, plus the per-property
+      distribution) and how many rows were excluded for missing price or area.
+    """
+    try:
+        query = build_comparables_query(location)
+        print(f"\n[Comparables Tool] Executing query:\n{query}\n")
+        rows = get_executor().execute(query)
+        return json.dumps({"location": location, **summarize_comparables(rows)}, default=str)
+    except Exception as e:
+        print(f"❌ [Comparables Tool] Failed: {e}")
+        return f"An error occurred while analyzing comparables: {e}"
@@ -1,29 +1,15 @@
-from google.cloud import bigquery
 from google.adk.tools import FunctionTool
 
-__all__ = ["bigquery_tool"]
+from agents.tools.async_tools import offload
+from agents.tools.bigquery_executor import bigquery_query_async
+from agents.tools.location_index import register_source, resolve_location
+from .comparables import analyze_comparables
+from .prompt import bigquery_table
 
-def bigquery_query(query: str) -> str:
-  """
-  Executes a BigQuery SQL query and returns the result as a string.
+__all__ = ["bigquery_tool", "comparables_tool", "location_tool"]
 
-  Args:
-    query: A valid BigQuery SQL query string.
+register_source(bigquery_table, ["title", "address"])
 
-  Returns:
-    A string representation of the query results, or an error message.
-  """
-  print(f"\n[BigQuery Tool] Attempting to execute query:\n{query}\n")
-  try:
-    client = bigquery.Client()
-    print("[BigQuery Tool] Successfully created BigQuery client.")
-    query_job = client.query(query)
-    results = query_job.result()
-    result_list = [dict(row) for row in results]
-    print(f"[BigQuery Tool] Query executed successfully. Found {len(result_list)} rows.")
-    return str(result_list)
-  except Exception as e:
-    print(f"❌ [BigQuery Tool] Connection/query failed: {e}")
-    return f"An error occurred while querying BigQuery: {e}"
-
-bigquery_tool = FunctionTool(func=bigquery_query)
+bigquery_tool = FunctionTool(func=bigquery_query_async)
+comparables_tool = FunctionTool(func=offload(analyze_comparables))
+location_tool = FunctionTool(func=offload(resolve_location))
@@ -14,4 +14,10 @@
 
 """property_regulatory_analyst_agent for finding information using google search"""
 
-from .agent import property_regulatory_analyst_agent  # noqa: F401
+
+def __getattr__(attr):
+    if attr == "property_regulatory_analyst_agent":
+        from .agent import property_regulatory_analyst_agent
+
+        return property_regulatory_analyst_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
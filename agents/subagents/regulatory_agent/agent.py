@@ -12,19 +12,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""property_regulatory_analyst_agent for finding property regulatory information using Google Search"""
+"""property_regulatory_analyst_agent for finding property regulatory information using web search"""
 
 from google.adk import Agent
-from google.adk.tools import google_search
+
+from agents.model_routing import model_for
+from agents.tools.web_search import search_tool
 
 from . import prompt
+from . import tools
 
-MODEL = "gemini-2.5-pro"
+MODEL = model_for("property_regulatory_analyst_agent")
 
 property_regulatory_analyst_agent = Agent(
     model=MODEL,
     name="property_regulatory_analyst_agent",
     instruction=prompt.PROPERTY_REGULATORY_ANALYST_PROMPT,
     output_key="property_regulatory_report",
-    tools=[google_search],
+    tools=[search_tool()] + tools.search_fanout_tools() + tools.REGULATORY_EVIDENCE_TOOLS,
 )
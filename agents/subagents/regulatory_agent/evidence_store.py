@@ -0,0 +1,185 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Persistent per-property store of regulatory evidence.
+
+Every finding the regulatory analyst collects is kept with its provenance
+(focus area, search query, URL, title, source, publication date, snippet and
+the date it was accessed) in a SQLite file (REGULATORY_EVIDENCE_PATH).
+
+Evidence is keyed by normalized address and, when known, by parcel ID, so a
+refinance or re-review of the same property finds it under either. A focus
+area is fresh when at least one of its records was accessed within
+max_data_age_days; only stale focus areas need to be researched again.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+DEFAULT_STORE_PATH = os.getenv(
+    "REGULATORY_EVIDENCE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "cre_analyzer", "regulatory_evidence.sqlite"),
+)
+DEFAULT_MAX_DATA_AGE_DAYS = 90
+MAX_RECORDS_PER_AREA = 20
+
+# The "Information Focus Areas" of PROPERTY_REGULATORY_ANALYST_PROMPT.
+FOCUS_AREAS = [
+    "ownership",
+    "assessor_tax",
+    "title_liens",
+    "permits_violations",
+    "zoning",
+    "environmental",
+    "local_ordinances",
+    "litigation",
+    "insurance",
+    "policy_changes",
+    "planning_hearings",
+]
+EVIDENCE_FIELDS = ["query", "url", "title", "source", "date_published", "snippet"]
+
+_SUFFIXES = {
+    "street": "st", "avenue": "ave", "road": "rd", "boulevard": "blvd", "drive": "dr", "lane": "ln",
+    "court": "ct", "place": "pl", "parkway": "pkwy", "highway": "hwy", "suite": "ste", "north": "n",
+    "south": "s", "east": "e", "west": "w",
+}
+
+
+def address_key(address: str) -> str:
+    """Lower-cased, punctuation-free address with common street words abbreviated."""
+    words = re.findall(r"[a-z0-9#-]+", address.lower())
+    return " ".join(_SUFFIXES.get(w, w) for w in words if w not in ("usa", "us"))
+
+
+def normalize_parcel_id(parcel_id: Optional[str]) -> str:
+    return re.sub(r"[^a-z0-9]", "", (parcel_id or "").lower())
+
+
+class EvidenceStore:
+    """SQLite-backed regulatory evidence with per-focus-area freshness."""
+
+    def __init__(self, path: Optional[str] = DEFAULT_STORE_PATH):
+        if path and path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS evidence ("
+            "address_key TEXT, parcel_id TEXT, focus_area TEXT, query TEXT, url TEXT, title TEXT, "
+            "source TEXT, date_published TEXT, snippet TEXT, accessed_at TEXT, "
+            "PRIMARY KEY (address_key, focus_area, url))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS evidence_parcel ON evidence (parcel_id)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        property_address: str,
+        evidence: List[Dict[str, Any]],
+        parcel_id: Optional[str] = None,
+        accessed_at: Optional[date] = None,
+    ) -> int:
+        """Upserts evidence records (one per focus area and URL); returns how many were stored."""
+        key = address_key(property_address)
+        parcel = normalize_parcel_id(parcel_id)
+        today = (accessed_at or date.today()).isoformat()
+        rows = []
+        for item in evidence:
+            area = str(item.get("focus_area", "")).strip().lower()
+            if area not in FOCUS_AREAS or not item.get("url"):
+                continue
+            rows.append((key, parcel, area, *(item.get(f) for f in EVIDENCE_FIELDS), item.get("accessed_at") or today))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO evidence (address_key, parcel_id, focus_area, query, url, title, "
+                "source, date_published, snippet, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            if parcel:
+                # Older records of the same property saved before the parcel ID was known.
+                self._conn.execute(
+                    "UPDATE evidence SET parcel_id = ? WHERE address_key = ? AND parcel_id = ''", (parcel, key)
+                )
+            self._conn.commit()
+        return len(rows)
+
+    def load(
+        self,
+        property_address: str,
+        parcel_id: Optional[str] = None,
+        max_data_age_days: int = DEFAULT_MAX_DATA_AGE_DAYS,
+        today: Optional[date] = None,
+    ) -> Dict[str, Any]:
+        """Stored evidence grouped by focus area, plus which areas are fresh and which are stale."""
+        key = address_key(property_address)
+        parcel = normalize_parcel_id(parcel_id)
+        today = today or date.today()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM evidence WHERE address_key = ? OR (? != '' AND parcel_id = ?) "
+                "ORDER BY accessed_at DESC",
+                (key, parcel, parcel),
+            ).fetchall()
+        evidence: Dict[str, List[Dict[str, Any]]] = {}
+        seen = set()
+        for row in rows:
+            area = row["focus_area"]
+            if (area, row["url"]) in seen or len(evidence.get(area, [])) >= MAX_RECORDS_PER_AREA:
+                continue
+            seen.add((area, row["url"]))
+            age = (today - date.fromisoformat(row["accessed_at"])).days
+            evidence.setdefault(area, []).append({
+                **{f: row[f] for f in EVIDENCE_FIELDS},
+                "accessed_at": row["accessed_at"],
+                "age_days": age,
+                "fresh": age <= max_data_age_days,
+            })
+        fresh = [a for a in FOCUS_AREAS if any(r["fresh"] for r in evidence.get(a, []))]
+        return {
+            "property_address": property_address,
+            "max_data_age_days": max_data_age_days,
+            "fresh_focus_areas": fresh,
+            "stale_focus_areas": [a for a in FOCUS_AREAS if a not in fresh],
+            "evidence": evidence,
+        }
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_store: Optional[EvidenceStore] = None
+_store_lock = threading.Lock()
+
+
+def get_evidence_store() -> EvidenceStore:
+    """Returns the process-wide store, opening it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = EvidenceStore()
+    return _store
+
+
+def set_evidence_store(store: EvidenceStore) -> None:
+    """Replaces the process-wide store (e.g. with an in-memory one)."""
+    global _store
+    with _store_lock:
+        _store = store
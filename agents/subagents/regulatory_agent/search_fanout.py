@@ -0,0 +1,193 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Concurrent regulatory search fan-out.
+
+The regulatory prompt lists about a dozen query patterns per property. Run
+one search per model turn, they cost a dozen serial turns. `fan_out` expands
+the patterns of the requested focus areas (QUERY_TEMPLATES) for the address
+and jurisdiction. It runs the searches concurrently through the shared
+SearchService (cache and single-flight included), at most
+REGULATORY_SEARCH_CONCURRENCY at a time, each on the tool thread pool. URLs
+are deduplicated across queries. The sources are ranked by the prompt's
+source-priority rules (SOURCE_PRIORITY: official records first, then news and
+trade press, then data vendors, then forums) and by how many queries surfaced
+them. The result is one compact evidence list.
+"""
+
+import asyncio
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from agents.tools.async_tools import run_blocking
+from agents.tools.web_search import DEFAULT_NUM_RESULTS, SearchService
+
+from .evidence_store import FOCUS_AREAS
+
+DEFAULT_CONCURRENCY = int(os.getenv("REGULATORY_SEARCH_CONCURRENCY", "6"))
+DEFAULT_TARGET_RESULTS = 15
+SNIPPET_CHARS = 200
+
+# The query patterns of PROPERTY_REGULATORY_ANALYST_PROMPT, by focus area. A
+# template whose placeholders are unknown for the property is skipped.
+QUERY_TEMPLATES = {
+    "ownership": ["{address} owner deed transfer"],
+    "assessor_tax": ["{address} parcel ID assessor", "{county} assessor {parcel_id}", "{address} property tax bill"],
+    "title_liens": ["{address} lien", "{address} judgment", "{address} foreclosure"],
+    "permits_violations": ["{address} building permits", "{address} code violation"],
+    "zoning": ["{address} zoning designation"],
+    "environmental": ["{address} Phase I environmental report", "{address} FEMA flood map"],
+    "local_ordinances": ["{address} rent control", "{city} rent control ordinance"],
+    "litigation": ["{address} litigation", "{address} lawsuit"],
+    "insurance": ["{address} flood insurance requirement"],
+    "policy_changes": ["{city} {state} municipal code changes property"],
+    "planning_hearings": ["{city} planning commission {street}"],
+}
+# Checked in order: (priority name, domain patterns). Unmatched domains rank as "other".
+SOURCE_PRIORITY = [
+    ("official", (r"\.gov$", r"\.mil$", r"\.us$", r"courtlistener\.com$",
+                  r"(^|\.)(cityof|countyof)[a-z-]*\.(org|com)$")),
+    ("news_trade", (r"news", r"times", r"journal", r"tribune", r"herald", r"gazette", r"post\.com$",
+                    r"bizjournals\.com$", r"globest\.com$", r"therealdeal\.com$", r"reuters\.com$",
+                    r"bloomberg\.com$", r"apnews\.com$")),
+    ("vendor", (r"costar\.com$", r"loopnet\.com$", r"zillow\.com$", r"redfin\.com$", r"realtor\.com$",
+                r"crexi\.com$", r"propertyshark\.com$", r"reonomy\.com$")),
+    ("other", ()),
+    ("forum", (r"reddit\.com$", r"quora\.com$", r"blogspot\.com$", r"wordpress\.com$", r"medium\.com$",
+               r"facebook\.com$", r"nextdoor\.com$")),
+]
+PRIORITY_RANK = {name: rank for rank, (name, _) in enumerate(SOURCE_PRIORITY)}
+_TRACKING_PARAMS = re.compile(r"^(utm_|fbclid$|gclid$|ref$|srsltid$)")
+_STATE_RE = re.compile(r"\b([A-Z]{2})\b(?:\s+\d{5}(?:-\d{4})?)?\s*$")
+
+
+def parse_location(property_address: str, jurisdiction: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """street / city / county / state of a property; jurisdiction is "City, County, State"."""
+    parts = [p.strip() for p in property_address.split(",") if p.strip()]
+    location: Dict[str, Optional[str]] = {"street": parts[0] if parts else None, "city": None, "county": None,
+                                          "state": None}
+    if len(parts) >= 2:
+        state = _STATE_RE.search(parts[-1])
+        if state is None:
+            location["city"] = parts[1]
+        else:
+            location["state"] = state.group(1)
+            # "Austin TX 78701" holds the city too; "TX 78701" leaves it to the part before.
+            city = parts[-1][:state.start()].strip()
+            location["city"] = city or (parts[-2] if len(parts) >= 3 else None)
+    if jurisdiction:
+        named = [p.strip() for p in jurisdiction.split(",") if p.strip()]
+        if len(named) >= 3:
+            location["city"], location["county"], location["state"] = named[0], named[-2], named[-1]
+        elif len(named) == 2:
+            location["city"], location["state"] = named
+        elif named:
+            location["city"] = named[0]
+    return location
+
+
+def expand_queries(
+    property_address: str,
+    jurisdiction: Optional[str] = None,
+    parcel_id: Optional[str] = None,
+    focus_areas: Optional[List[str]] = None,
+    query_templates: Optional[List[str]] = None,
+) -> List[Tuple[str, str]]:
+    """(focus_area, query) pairs, without duplicates; caller templates are tagged "custom"."""
+    values = {**parse_location(property_address, jurisdiction), "address": property_address, "parcel_id": parcel_id}
+    templates = [(area, t) for area in (focus_areas or FOCUS_AREAS) for t in QUERY_TEMPLATES.get(area, [])]
+    templates += [("custom", t) for t in query_templates or []]
+    queries, seen = [], set()
+    for area, template in templates:
+        try:
+            query = template.format(**values)
+        except (KeyError, IndexError):
+            continue
+        needed = re.findall(r"{(\w+)}", template)
+        if any(not values.get(name) for name in needed) or query.lower() in seen:
+            continue
+        seen.add(query.lower())
+        queries.append((area, query))
+    return queries
+
+
+def canonical_url(url: str) -> str:
+    """URL with lowercase host, no fragment, tracking parameters or trailing slash."""
+    parts = urlsplit(url.strip())
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query) if not _TRACKING_PARAMS.match(k)])
+    host = parts.netloc.lower().removeprefix("www.")
+    return urlunsplit((parts.scheme.lower() or "https", host, parts.path.rstrip("/") or "/", query, ""))
+
+
+def source_priority(url: str) -> str:
+    host = urlsplit(url).netloc.lower().split(":")[0]
+    for name, patterns in SOURCE_PRIORITY:
+        if any(re.search(p, host) for p in patterns):
+            return name
+    return "other"
+
+
+async def fan_out(
+    service: SearchService,
+    queries: List[Tuple[str, str]],
+    results_per_query: int = DEFAULT_NUM_RESULTS,
+    max_concurrency: int = DEFAULT_CONCURRENCY,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Runs the searches concurrently; returns (deduplicated sources, per-query status)."""
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def one(query: str) -> Tuple[List[Dict[str, Any]], Optional[str], Optional[str]]:
+        async with semaphore:
+            try:
+                results, origin = await run_blocking(service.search, query, results_per_query)
+                return results, origin, None
+            except Exception as e:
+                return [], None, str(e)
+
+    outcomes = await asyncio.gather(*(one(query) for _, query in queries))
+    sources: Dict[str, Dict[str, Any]] = {}
+    status = []
+    for (area, query), (results, origin, error) in zip(queries, outcomes):
+        status.append({"query": query, "focus_area": area, "results": len(results),
+                       **({"error": error} if error else {"origin": origin})})
+        for position, result in enumerate(results):
+            if not result.get("url"):
+                continue
+            key = canonical_url(result["url"])
+            source = sources.get(key)
+            if source is None:
+                sources[key] = source = {
+                    "url": result["url"],
+                    "title": result.get("title"),
+                    "source": result.get("source"),
+                    "priority": source_priority(result["url"]),
+                    "focus_areas": [],
+                    "query": query,
+                    "snippet": (result.get("snippet") or "")[:SNIPPET_CHARS],
+                    "hits": 0,
+                    "best_position": position,
+                }
+            source["hits"] += 1
+            source["best_position"] = min(source["best_position"], position)
+            if area not in source["focus_areas"]:
+                source["focus_areas"].append(area)
+    return list(sources.values()), status
+
+
+def rank_sources(sources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Official records first, then by how many queries found the source and its best position."""
+    ranked = sorted(sources, key=lambda s: (PRIORITY_RANK[s["priority"]], -s["hits"], s["best_position"]))
+    return [{"rank": i + 1, **s} for i, s in enumerate(ranked)]
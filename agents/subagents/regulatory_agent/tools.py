@@ -0,0 +1,157 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tools for reusing, searching for and recording regulatory evidence."""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from google.adk.tools import FunctionTool as Tool
+
+from agents.tools.async_tools import offload
+from agents.tools.web_search import DEFAULT_NUM_RESULTS, get_search_service
+
+from .evidence_store import DEFAULT_MAX_DATA_AGE_DAYS, FOCUS_AREAS, get_evidence_store
+from .search_fanout import DEFAULT_CONCURRENCY, DEFAULT_TARGET_RESULTS, expand_queries, fan_out, rank_sources
+
+
+def load_regulatory_evidence(
+    property_address: str,
+    parcel_id: Optional[str] = None,
+    max_data_age_days: int = DEFAULT_MAX_DATA_AGE_DAYS,
+) -> str:
+    """
+    Loads previously collected regulatory evidence for a property.
+
+    Args:
+      property_address: Full property address.
+      parcel_id: County parcel / assessor ID, if known.
+      max_data_age_days: Freshness window in days.
+
+    Returns:
+      A JSON string with `fresh_focus_areas` (evidence accessed within the
+      window; reuse it and do not search these again), `stale_focus_areas`
+      (research these) and `evidence` grouped by focus area, each record with
+      query, url, title, source, date_published, snippet, accessed_at and age_days.
+    """
+    try:
+        result = get_evidence_store().load(property_address, parcel_id, max_data_age_days)
+        print(
+            f"[Regulatory Evidence] {property_address}: {len(result['fresh_focus_areas'])} fresh, "
+            f"{len(result['stale_focus_areas'])} stale focus areas"
+        )
+        return json.dumps(result)
+    except Exception as e:
+        print(f"❌ [Regulatory Evidence] Load failed: {e}")
+        return f"An error occurred while loading regulatory evidence: {e}"
+
+
+def record_regulatory_evidence(
+    property_address: str,
+    evidence: List[Dict[str, Any]],
+    parcel_id: Optional[str] = None,
+) -> str:
+    """
+    Saves newly collected regulatory evidence with its provenance.
+
+    Args:
+      property_address: Full property address.
+      evidence: One object per source: {"focus_area", "query", "url", "title",
+        "source", "date_published", "snippet"}. focus_area is one of: ownership,
+        assessor_tax, title_liens, permits_violations, zoning, environmental,
+        local_ordinances, litigation, insurance, policy_changes, planning_hearings.
+      parcel_id: County parcel / assessor ID, if known.
+
+    Returns:
+      A JSON string with the number of records stored and skipped.
+    """
+    try:
+        stored = get_evidence_store().record(property_address, evidence, parcel_id)
+        print(f"[Regulatory Evidence] Stored {stored} records for {property_address}")
+        return json.dumps({"stored": stored, "skipped": len(evidence) - stored, "focus_areas": FOCUS_AREAS})
+    except Exception as e:
+        print(f"❌ [Regulatory Evidence] Save failed: {e}")
+        return f"An error occurred while recording regulatory evidence: {e}"
+
+
+async def search_regulatory_sources(
+    property_address: str,
+    jurisdiction: Optional[str] = None,
+    parcel_id: Optional[str] = None,
+    focus_areas: Optional[List[str]] = None,
+    query_templates: Optional[List[str]] = None,
+    target_results_count: int = DEFAULT_TARGET_RESULTS,
+) -> str:
+    """
+    Runs the regulatory query patterns for a property concurrently and returns ranked, deduplicated sources.
+
+    Args:
+      property_address: Full property address.
+      jurisdiction: "City, County, State", if known (otherwise inferred from the address).
+      parcel_id: County parcel / assessor ID, if known.
+      focus_areas: Focus areas to search (default: all), e.g. the `stale_focus_areas`
+        from load_regulatory_evidence.
+      query_templates: Extra queries; may use {address}, {street}, {city}, {county},
+        {state} and {parcel_id}.
+      target_results_count: Number of distinct sources wanted.
+
+    Returns:
+      A JSON string with `queries` (each query run, its focus_area and result count),
+      `unique_sources`, `target_met` and `evidence`: at most target_results_count * 2
+      sources ranked official > news_trade > vendor > other > forum, each with rank,
+      url, title, source, priority, focus_areas, query and snippet.
+    """
+    service = get_search_service()
+    if service is None:
+        return "An error occurred while searching regulatory sources: no search backend is configured."
+    try:
+        queries = expand_queries(property_address, jurisdiction, parcel_id, focus_areas, query_templates)
+        sources, status = await fan_out(service, queries, DEFAULT_NUM_RESULTS, DEFAULT_CONCURRENCY)
+        ranked = rank_sources(sources)
+        for source in ranked:
+            del source["hits"], source["best_position"]
+        print(f"[Regulatory Search] {property_address}: {len(queries)} queries, {len(ranked)} unique sources")
+        return json.dumps({
+            "property_address": property_address,
+            "queries": status,
+            "unique_sources": len(ranked),
+            "target_met": len(ranked) >= target_results_count,
+            "evidence": ranked[:max(1, target_results_count) * 2],
+        })
+    except Exception as e:
+        print(f"❌ [Regulatory Search] Search failed: {e}")
+        return f"An error occurred while searching regulatory sources: {e}"
+
+
+load_regulatory_evidence_tool = Tool(
+    func=offload(load_regulatory_evidence),
+)
+
+record_regulatory_evidence_tool = Tool(
+    func=offload(record_regulatory_evidence),
+)
+
+search_regulatory_sources_tool = Tool(
+    func=search_regulatory_sources,
+)
+
+REGULATORY_EVIDENCE_TOOLS = [
+    load_regulatory_evidence_tool,
+    record_regulatory_evidence_tool,
+]
+
+
+def search_fanout_tools() -> List[Tool]:
+    """The fan-out search tool when a client-side search backend is configured (see web_search.search_tool)."""
+    return [search_regulatory_sources_tool] if get_search_service() is not None else []
@@ -14,4 +14,10 @@
 
 """Risk analysis agent for assessing risks and stress testing metrics."""
 
-from .agent import risk_analysis_agent
\ No newline at end of file
+
+def __getattr__(attr):
+    if attr == "risk_analysis_agent":
+        from .agent import risk_analysis_agent
+
+        return risk_analysis_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
@@ -16,13 +16,20 @@
 
 from google.adk.agents import LlmAgent
 
+from agents.compaction import compact_context
+from agents.model_routing import model_for
+
 from . import prompt
+from . import tools
 
-MODEL = "gemini-2.5-pro"
+MODEL = model_for("risk_analysis_agent")
 
 risk_analysis_agent = LlmAgent(
     model=MODEL,
     name="risk_analysis_agent",
     instruction=prompt.RISK_ANALYSIS_AGENT_PROMPT,
     output_key="risk_analysis",
-)
\ No newline at end of file
+    tools=tools.RISK_ANALYSIS_TOOLS,
+    # Reads compacted upstream reports instead of the full parallel-stage history.
+    before_model_callback=compact_context,
+)
@@ -0,0 +1,194 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Monte Carlo credit simulation over the hold period.
+
+Each loan is simulated as an (n_paths, hold_years) NumPy array per factor:
+
+- rent growth: i.i.d. normal per year around rent_growth_mean_pct, which
+  `rent_growth_from_market` seeds from the SAFMR FY2025 -> FY2026 inflation;
+- vacancy: AR(1) mean-reverting around base_vacancy_pct, clipped to [0, 95%];
+- interest rate: random walk from the loan rate, floored at 0. Floating-rate
+  loans re-amortize debt service every year; fixed-rate loans keep the
+  original payment and are additionally tested at a refinance in the last year
+  of the balance still outstanding after the hold period.
+
+A stated annual_debt_service is the year-0 payment, as in the stress grid
+(stress_test.run_stress_grid): fixed-rate loans keep it, and floating-rate
+paths add the change in the re-amortized payment at the simulated rate.
+
+gross_rental_income is taken as income at base vacancy, so a path that keeps
+vacancy and rents flat reproduces the base NOI.
+
+Runs are reproducible: every loan gets a child of SeedSequence(seed), so the
+result for a loan does not depend on how a portfolio is sharded across the
+process pool.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .stress_test import DEFAULT_AMORTIZATION_YEARS, annual_debt_service, implied_rate, remaining_balance
+
+DEFAULT_PATHS = 100_000
+DEFAULT_HOLD_YEARS = 5
+DEFAULT_SEED = 20250101
+SUMMARY_PERCENTILES = [1, 5, 25, 50, 75, 95]
+
+
+def rent_growth_from_market(location: str) -> Optional[float]:
+    """Overall SAFMR FY2025 -> FY2026 inflation (percent) for a location, if indexed."""
+    from agents.subagents.market_agent.market_index import get_market_index
+
+    report = get_market_index().lookup(location)
+    return report["overall_inflation_pct"] if report else None
+
+
+def _percentiles(values: np.ndarray) -> Dict[str, float]:
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return {}
+    return {f"p{p}": round(float(v), 3) for p, v in zip(SUMMARY_PERCENTILES, np.percentile(finite, SUMMARY_PERCENTILES))}
+
+
+def simulate_loan(
+    gross_rental_income: float,
+    operating_expenses: float,
+    loan_amount: float,
+    interest_rate_pct: Optional[float] = None,
+    amortization_years: int = DEFAULT_AMORTIZATION_YEARS,
+    annual_debt_service_amount: Optional[float] = None,
+    floating_rate: bool = False,
+    hold_years: int = DEFAULT_HOLD_YEARS,
+    n_paths: int = DEFAULT_PATHS,
+    rent_growth_mean_pct: float = 3.0,
+    rent_growth_vol_pct: float = 3.0,
+    base_vacancy_pct: float = 5.0,
+    vacancy_vol_pct: float = 3.0,
+    vacancy_persistence: float = 0.6,
+    expense_growth_pct: float = 3.0,
+    rate_vol_bp: float = 75.0,
+    seed: Any = DEFAULT_SEED,
+) -> Dict[str, Any]:
+    """Simulates one loan and returns summary distributions and breach probabilities."""
+    rng = np.random.default_rng(seed)
+    if interest_rate_pct is not None:
+        base_rate = interest_rate_pct / 100
+    elif annual_debt_service_amount:
+        base_rate = implied_rate(loan_amount, annual_debt_service_amount, amortization_years)
+    else:
+        base_rate = None
+    if base_rate is None:
+        raise ValueError("interest_rate_pct or annual_debt_service is required for the simulation.")
+
+    shape = (n_paths, hold_years)
+    growth = rng.normal(rent_growth_mean_pct / 100, rent_growth_vol_pct / 100, shape)
+    rent_index = np.cumprod(1 + growth, axis=1)
+
+    base_vacancy = base_vacancy_pct / 100
+    shocks = rng.normal(0.0, vacancy_vol_pct / 100, shape)
+    vacancy = np.empty(shape)
+    previous = np.full(n_paths, base_vacancy)
+    for year in range(hold_years):
+        previous = base_vacancy + vacancy_persistence * (previous - base_vacancy) + shocks[:, year]
+        vacancy[:, year] = previous
+    np.clip(vacancy, 0.0, 0.95, out=vacancy)
+
+    expenses = operating_expenses * (1 + expense_growth_pct / 100) ** np.arange(1, hold_years + 1)
+    noi = gross_rental_income * rent_index * (1 - vacancy) / (1 - base_vacancy) - expenses
+
+    rates = np.maximum(base_rate + np.cumsum(rng.normal(0.0, rate_vol_bp / 10_000, shape), axis=1), 0.0)
+    base_debt_service = float(annual_debt_service(loan_amount, base_rate, amortization_years))
+    # Stated debt service minus the re-amortized one, as in run_stress_grid.
+    ds_offset = 0.0
+    if annual_debt_service_amount:
+        ds_offset = annual_debt_service_amount - base_debt_service
+        base_debt_service = float(annual_debt_service_amount)
+    if floating_rate:
+        debt_service = annual_debt_service(loan_amount, rates, amortization_years) + ds_offset
+    else:
+        debt_service = np.full(shape, base_debt_service)
+    dscr = noi / debt_service
+    min_dscr = dscr.min(axis=1)
+
+    result = {
+        "n_paths": n_paths,
+        "hold_years": hold_years,
+        "inputs": {
+            "interest_rate_pct": round(base_rate * 100, 3),
+            "rent_growth_mean_pct": rent_growth_mean_pct,
+            "floating_rate": floating_rate,
+            "seed": seed if isinstance(seed, int) else None,
+        },
+        "base_dscr": round((gross_rental_income - operating_expenses) / base_debt_service, 3),
+        "probability_dscr_below_1_0": round(float((min_dscr < 1.0).mean()), 4),
+        "probability_dscr_below_1_25": round(float((min_dscr < 1.25).mean()), 4),
+        "probability_negative_noi": round(float((noi.min(axis=1) < 0).mean()), 4),
+        "min_dscr_distribution": _percentiles(min_dscr),
+        "final_year_dscr_distribution": _percentiles(dscr[:, -1]),
+        "final_year_noi_distribution": _percentiles(noi[:, -1]),
+        "probability_dscr_below_1_0_by_year": [round(float(p), 4) for p in (dscr < 1.0).mean(axis=0)],
+    }
+    if not floating_rate:
+        # Refinancing the balance left after the hold period at the simulated final-year rate.
+        refi_balance = float(remaining_balance(loan_amount, base_rate, amortization_years, hold_years))
+        refi_dscr = noi[:, -1] / annual_debt_service(refi_balance, rates[:, -1], amortization_years)
+        result["probability_refinance_dscr_below_1_0"] = round(float((refi_dscr < 1.0).mean()), 4)
+        result["refinance_dscr_distribution"] = _percentiles(refi_dscr)
+        result["refinance_balance"] = round(refi_balance, 2)
+    return result
+
+
+def _simulate_shard(shard: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    results = []
+    for loan in shard:
+        try:
+            results.append(simulate_loan(**loan))
+        except ValueError as e:
+            results.append({"error": str(e)})
+    return results
+
+
+def simulate_portfolio(
+    loans: List[Dict[str, Any]],
+    n_paths: int = DEFAULT_PATHS,
+    hold_years: int = DEFAULT_HOLD_YEARS,
+    seed: int = DEFAULT_SEED,
+    max_workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Simulates every loan (dicts of `simulate_loan` keyword arguments) across a process pool.
+
+    Results are returned in input order. Each loan's seed is a child of
+    SeedSequence(seed), so results are identical for any max_workers.
+    """
+    children = np.random.SeedSequence(seed).spawn(len(loans))
+    jobs = [
+        {"n_paths": n_paths, "hold_years": hold_years, **loan, "seed": int(np.random.default_rng(child).integers(2**63))}
+        for loan, child in zip(loans, children)
+    ]
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(jobs) == 1:
+        return _simulate_shard(jobs)
+    shard_count = min(max_workers, len(jobs))
+    shards = [jobs[i::shard_count] for i in range(shard_count)]
+    with ProcessPoolExecutor(max_workers=shard_count) as pool:
+        shard_results = list(pool.map(_simulate_shard, shards))
+    results: List[Dict[str, Any]] = [None] * len(jobs)
+    for shard_index, shard in enumerate(shard_results):
+        for offset, result in enumerate(shard):
+            results[shard_index + offset * shard_count] = result
+    return results
@@ -0,0 +1,213 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deterministic stress-test grid for NOI, DSCR and LTV.
+
+Every combination of vacancy, interest-rate, expense-growth and cap-rate
+shocks is evaluated in one NumPy pass:
+
+- stressed income   = gross_rental_income * (1 - vacancy)
+- stressed expenses = operating_expenses * (1 + expense_growth)
+- debt service is re-amortized at (interest_rate + rate shock) over the
+  amortization period (interest-only when amortization_years is 0)
+- stressed value    = stressed NOI / (going-in cap rate + cap-rate shock),
+  LTV = loan_amount / stressed value
+
+When annual_debt_service is stated it is the 0bp debt service: it may cover
+interest-only periods, fees or another term than the re-amortized figure, so
+rate shocks are applied as the change in the amortized payment on top of it.
+When only annual_debt_service is known, the rate implied by the loan amount
+and amortization period is solved for so rate shocks can still be applied.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_VACANCY_SHOCKS_PCT = [0.0, 5.0, 10.0, 15.0, 20.0]
+DEFAULT_RATE_SHOCKS_BP = [0.0, 100.0, 200.0, 300.0]
+DEFAULT_EXPENSE_GROWTH_PCT = [0.0, 5.0, 10.0]
+DEFAULT_CAP_RATE_SHOCKS_BP = [0.0, 50.0, 100.0]
+DEFAULT_AMORTIZATION_YEARS = 30
+
+
+def annual_debt_service(loan_amount, annual_rate, amortization_years):
+    """Level annual payment (monthly amortization); interest-only if amortization_years is 0."""
+    loan_amount = np.asarray(loan_amount, dtype=float)
+    annual_rate = np.asarray(annual_rate, dtype=float)
+    if not amortization_years:
+        return loan_amount * annual_rate
+    n = amortization_years * 12
+    monthly = annual_rate / 12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = np.where(
+            monthly == 0,
+            loan_amount / n,
+            loan_amount * monthly / (1 - (1 + monthly) ** -n),
+        )
+    return payment * 12
+
+
+def remaining_balance(loan_amount, annual_rate, amortization_years, years_paid):
+    """Balance outstanding after `years_paid` years of level monthly payments; unchanged if interest-only."""
+    loan_amount = np.asarray(loan_amount, dtype=float)
+    if not amortization_years:
+        return loan_amount
+    annual_rate = np.asarray(annual_rate, dtype=float)
+    n = amortization_years * 12
+    k = min(years_paid * 12, n)
+    monthly = annual_rate / 12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        balance = np.where(
+            monthly == 0,
+            loan_amount * (1 - k / n),
+            loan_amount * ((1 + monthly) ** n - (1 + monthly) ** k) / ((1 + monthly) ** n - 1),
+        )
+    return np.maximum(balance, 0.0)
+
+
+def implied_rate(loan_amount: float, debt_service: float, amortization_years: int) -> Optional[float]:
+    """Annual rate at which `debt_service` amortizes `loan_amount` (bisection); None if out of range."""
+    if loan_amount <= 0 or debt_service <= 0:
+        return None
+    if not amortization_years:
+        return debt_service / loan_amount
+    low, high = 0.0, 1.0
+    if annual_debt_service(loan_amount, high, amortization_years) < debt_service:
+        return None
+    for _ in range(100):
+        mid = (low + high) / 2
+        if annual_debt_service(loan_amount, mid, amortization_years) < debt_service:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+def _break_even_rate(noi: float, loan_amount: float, amortization_years: int, min_dscr: float) -> Optional[float]:
+    """Highest rate at which DSCR stays at min_dscr."""
+    if noi <= 0:
+        return None
+    return implied_rate(loan_amount, noi / min_dscr, amortization_years)
+
+
+def _round(value: Optional[float], digits: int = 2) -> Optional[float]:
+    if value is None or not np.isfinite(value):
+        return None
+    return round(float(value), digits)
+
+
+def run_stress_grid(
+    gross_rental_income: float,
+    operating_expenses: float,
+    loan_amount: Optional[float] = None,
+    purchase_price: Optional[float] = None,
+    interest_rate_pct: Optional[float] = None,
+    amortization_years: int = DEFAULT_AMORTIZATION_YEARS,
+    annual_debt_service_amount: Optional[float] = None,
+    vacancy_shocks_pct: Optional[List[float]] = None,
+    rate_shocks_bp: Optional[List[float]] = None,
+    expense_growth_pct: Optional[List[float]] = None,
+    cap_rate_shocks_bp: Optional[List[float]] = None,
+    min_dscr: float = 1.25,
+    max_ltv_pct: float = 75.0,
+) -> Dict[str, Any]:
+    """Evaluates the full shock grid; see the module docstring for the model."""
+    vacancy = np.asarray(vacancy_shocks_pct or DEFAULT_VACANCY_SHOCKS_PCT, dtype=float) / 100
+    rate_shock = np.asarray(rate_shocks_bp or DEFAULT_RATE_SHOCKS_BP, dtype=float) / 10_000
+    expense_growth = np.asarray(expense_growth_pct or DEFAULT_EXPENSE_GROWTH_PCT, dtype=float) / 100
+    cap_shock = np.asarray(cap_rate_shocks_bp or DEFAULT_CAP_RATE_SHOCKS_BP, dtype=float) / 10_000
+    notes = []
+
+    base_noi = gross_rental_income - operating_expenses
+    base_rate = interest_rate_pct / 100 if interest_rate_pct is not None else None
+    if base_rate is None and loan_amount and annual_debt_service_amount:
+        base_rate = implied_rate(loan_amount, annual_debt_service_amount, amortization_years)
+        if base_rate is not None:
+            notes.append(
+                f"interest rate not provided; implied {base_rate * 100:.3f}% from annual debt service "
+                f"over {amortization_years}-year amortization"
+            )
+    base_cap = base_noi / purchase_price if purchase_price else None
+
+    v, r, g, c = np.meshgrid(vacancy, rate_shock, expense_growth, cap_shock, indexing="ij")
+    v, r, g, c = v.ravel(), r.ravel(), g.ravel(), c.ravel()
+    noi = gross_rental_income * (1 - v) - operating_expenses * (1 + g)
+
+    # Stated debt service minus the re-amortized one; shifts every rate row.
+    ds_offset = 0.0
+    if loan_amount and base_rate is not None:
+        base_ds = float(annual_debt_service(loan_amount, base_rate, amortization_years))
+        if annual_debt_service_amount:
+            ds_offset = annual_debt_service_amount - base_ds
+            base_ds = float(annual_debt_service_amount)
+        debt_service = annual_debt_service(loan_amount, base_rate + r, amortization_years) + ds_offset
+    elif annual_debt_service_amount:
+        base_ds = annual_debt_service_amount
+        debt_service = np.where(r == 0, annual_debt_service_amount, np.nan)
+        notes.append("rate shocks need interest_rate_pct or loan_amount; only 0bp rows have a DSCR")
+    else:
+        base_ds = None
+        debt_service = np.full(noi.shape, np.nan)
+        notes.append("no debt terms provided; DSCR not computed")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dscr = noi / debt_service
+
+    if loan_amount and base_cap and base_cap > 0:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            value = noi / (base_cap + c)
+            ltv = np.where(value > 0, loan_amount / value * 100, np.nan)
+    else:
+        ltv = np.full(noi.shape, np.nan)
+        notes.append("LTV needs loan_amount and a positive going-in cap rate (purchase_price)")
+
+    rate_at_dscr_1 = (_break_even_rate(base_noi - ds_offset, loan_amount, amortization_years, 1.0)
+                      if loan_amount else None)
+    break_even = {
+        "vacancy_pct_at_dscr_1_0": _round((1 - (base_ds + operating_expenses) / gross_rental_income) * 100)
+        if base_ds and gross_rental_income else None,
+        f"vacancy_pct_at_dscr_{min_dscr:g}": _round(
+            (1 - (min_dscr * base_ds + operating_expenses) / gross_rental_income) * 100)
+        if base_ds and gross_rental_income else None,
+        "expense_growth_pct_at_dscr_1_0": _round(((gross_rental_income - base_ds) / operating_expenses - 1) * 100)
+        if base_ds and operating_expenses else None,
+        "interest_rate_pct_at_dscr_1_0": _round(rate_at_dscr_1 * 100, 3) if rate_at_dscr_1 is not None else None,
+        f"cap_rate_pct_at_ltv_{max_ltv_pct:g}": _round(base_noi / (loan_amount * 100 / max_ltv_pct) * 100, 3)
+        if loan_amount and base_noi > 0 else None,
+    }
+
+    grid_columns = ["vacancy_pct", "rate_shock_bp", "expense_growth_pct", "cap_rate_shock_bp",
+                    "noi", "debt_service", "dscr", "ltv_pct"]
+    grid = np.column_stack([v * 100, r * 10_000, g * 100, c * 10_000, noi, debt_service, dscr, ltv])
+    rows = [[_round(x) for x in row] for row in grid]
+
+    finite_dscr = np.where(np.isfinite(dscr), dscr, np.inf)
+    worst = int(np.argmin(finite_dscr)) if np.isfinite(dscr).any() else None
+    return {
+        "base": {
+            "noi": _round(base_noi),
+            "debt_service": _round(base_ds),
+            "interest_rate_pct": _round(base_rate * 100, 3) if base_rate is not None else None,
+            "going_in_cap_rate_pct": _round(base_cap * 100, 3) if base_cap is not None else None,
+            "dscr": _round(base_noi / base_ds) if base_ds else None,
+            "ltv_pct": _round(loan_amount / purchase_price * 100) if loan_amount and purchase_price else None,
+        },
+        "grid": {"columns": grid_columns, "rows": rows},
+        "scenarios_below_dscr_1_0": int((dscr < 1.0).sum()),
+        f"scenarios_below_dscr_{min_dscr:g}": int((dscr < min_dscr).sum()),
+        f"scenarios_above_ltv_{max_ltv_pct:g}": int((ltv > max_ltv_pct).sum()),
+        "worst_case": dict(zip(grid_columns, rows[worst])) if worst is not None else None,
+        "break_even": break_even,
+        "notes": notes,
+    }
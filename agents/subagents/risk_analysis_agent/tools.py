@@ -0,0 +1,132 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tools for risk analysis and stress testing."""
+
+from typing import Any, Dict, List, Optional
+
+from google.adk.tools import FunctionTool as Tool
+
+from agents.tools.async_tools import offload
+
+from .monte_carlo import DEFAULT_HOLD_YEARS, DEFAULT_PATHS, DEFAULT_SEED, rent_growth_from_market, simulate_loan
+from .stress_test import DEFAULT_AMORTIZATION_YEARS, run_stress_grid
+
+
+def run_stress_test(
+    gross_rental_income: float,
+    operating_expenses: float,
+    loan_amount: Optional[float] = None,
+    purchase_price: Optional[float] = None,
+    interest_rate_pct: Optional[float] = None,
+    amortization_years: int = DEFAULT_AMORTIZATION_YEARS,
+    annual_debt_service: Optional[float] = None,
+    vacancy_shocks_pct: Optional[List[float]] = None,
+    rate_shocks_bp: Optional[List[float]] = None,
+    expense_growth_pct: Optional[List[float]] = None,
+    cap_rate_shocks_bp: Optional[List[float]] = None,
+) -> Dict[str, Any]:
+    """Stress-tests NOI, DSCR and LTV over a grid of vacancy, rate, expense and cap-rate shocks.
+
+    A stated annual_debt_service is the unshocked debt service; rate shocks
+    add the change in the payment re-amortized from loan_amount,
+    interest_rate_pct and amortization_years (0 = interest-only). If
+    interest_rate_pct is unknown, the rate implied by annual_debt_service is
+    used. Shock lists default to vacancy +0/5/10/15/20 pts, rates
+    +0/100/200/300 bp, expenses +0/5/10% and cap rates +0/50/100 bp.
+
+    Returns base metrics, the stressed grid (columns + rows), counts of
+    scenarios breaching DSCR 1.0 / 1.25 and LTV 75%, the worst case, and
+    break-even vacancy, expense growth, interest rate and cap rate.
+    """
+    return run_stress_grid(
+        gross_rental_income=gross_rental_income,
+        operating_expenses=operating_expenses,
+        loan_amount=loan_amount,
+        purchase_price=purchase_price,
+        interest_rate_pct=interest_rate_pct,
+        amortization_years=amortization_years,
+        annual_debt_service_amount=annual_debt_service,
+        vacancy_shocks_pct=vacancy_shocks_pct,
+        rate_shocks_bp=rate_shocks_bp,
+        expense_growth_pct=expense_growth_pct,
+        cap_rate_shocks_bp=cap_rate_shocks_bp,
+    )
+
+
+def simulate_credit_risk(
+    gross_rental_income: float,
+    operating_expenses: float,
+    loan_amount: float,
+    interest_rate_pct: Optional[float] = None,
+    amortization_years: int = DEFAULT_AMORTIZATION_YEARS,
+    annual_debt_service: Optional[float] = None,
+    floating_rate: bool = False,
+    location: Optional[str] = None,
+    hold_years: int = DEFAULT_HOLD_YEARS,
+    seed: int = DEFAULT_SEED,
+) -> Dict[str, Any]:
+    """Monte Carlo probability of DSCR breach over the hold period.
+
+    Simulates 100,000 paths of rent growth, vacancy and interest rates. If
+    `location` (ZIP code, HUD area code or area name) is in the SAFMR data,
+    mean rent growth is seeded from its FY2025 -> FY2026 rent inflation.
+    A stated annual_debt_service is the starting payment, as in run_stress_test.
+
+    Returns P(DSCR < 1.0) and P(DSCR < 1.25) at any point in the hold period,
+    P(negative NOI), per-year breach probabilities, percentile distributions
+    of minimum and final-year DSCR and NOI, and (fixed-rate loans) the
+    probability that refinancing the remaining balance at the simulated
+    final-year rate breaches 1.0x.
+    """
+    options: Dict[str, Any] = {}
+    if location:
+        try:
+            growth = rent_growth_from_market(location)
+        except Exception as e:
+            print(f"❌ [Monte Carlo] Market rent growth lookup failed: {e}")
+            growth = None
+        if growth is not None:
+            options["rent_growth_mean_pct"] = growth
+    try:
+        return simulate_loan(
+            gross_rental_income=gross_rental_income,
+            operating_expenses=operating_expenses,
+            loan_amount=loan_amount,
+            interest_rate_pct=interest_rate_pct,
+            amortization_years=amortization_years,
+            annual_debt_service_amount=annual_debt_service,
+            floating_rate=floating_rate,
+            hold_years=hold_years,
+            n_paths=DEFAULT_PATHS,
+            seed=seed,
+            **options,
+        )
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+run_stress_test_tool = Tool(
+    func=run_stress_test,
+)
+
+# 100k paths take long enough to stall the other sessions on the loop.
+simulate_credit_risk_tool = Tool(
+    func=offload(simulate_credit_risk),
+)
+
+RISK_ANALYSIS_TOOLS = [
+    run_stress_test_tool,
+    simulate_credit_risk_tool,
+]
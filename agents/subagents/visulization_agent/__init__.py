@@ -14,4 +14,10 @@
 
 """property_regulatory_analyst_agent for finding information using google search"""
 
-from .agent import visualization_agent # noqa: F401
+
+def __getattr__(attr):
+    if attr == "visualization_agent":
+        from .agent import visualization_agent
+
+        return visualization_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
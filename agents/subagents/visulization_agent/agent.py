@@ -1,9 +1,10 @@
 # loan_analyzer/visualization_agent.py
 from google.adk import Agent
-from google.adk.tools import google_search
+from agents.model_routing import model_for
+from agents.tools.web_search import search_tool
 from agents.tools.visualization_tool import visualization_tool
 
-MODEL = "gemini-2.5-pro"
+MODEL = model_for("visualization_agent")
 
 VISUAL_AGENT_PROMPT = """
 You are a visualization expert agent. Your primary goal is to create insightful trend and metric visualizations based on the data you receive.
@@ -12,12 +13,12 @@ You are a visualization expert agent. Your primary goal is to create insightful
 Given a structured analysis payload or a list of insights from another agent, your task is to:
 1.  Construct a `visual_spec` (a list of chart specifications).
 2.  Call the visualization_tool.run tool to render these charts.
-3.  If necessary, use the `google_search` tool to find additional data to create more comprehensive trend and metric visualizations.
+3.  If necessary, use the web search tool to find additional data to create more comprehensive trend and metric visualizations.
 
 **Workflow:**
 1.  **Analyze Input:** Carefully examine the provided input.
 2.  **Identify Visualization Opportunities:** Determine what trends and metrics can be visualized. Prioritize simple, clear charts like line, bar, pie, and scatter plots.
-3.  **Gather Missing Data:** If the provided data is insufficient for a trend visualization (e.g., historical data is missing), use `google_search` to find the necessary information.
+3.  **Gather Missing Data:** If the provided data is insufficient for a trend visualization (e.g., historical data is missing), use the web search tool to find the necessary information.
 4.  **Generate `visual_spec`:** Create a list of chart specifications based on the available data. Do not invent data; use only the supplied analysis fields or data found via search.
 5.  **Create Visuals:** Call the visualization_tool.run tool with the `visual_spec`.
 
@@ -33,5 +34,5 @@ visualization_agent = Agent(
     name="visualization_agent",
     instruction=VISUAL_AGENT_PROMPT,
     output_key="visualization_output",
-    tools=[google_search, visualization_tool],
+    tools=[search_tool(), visualization_tool],
 )
@@ -0,0 +1,134 @@
+"""
+Keeping blocking tool work off the event loop.
+
+ADK calls a synchronous tool function directly on the event loop, so a
+BigQuery round trip, a matplotlib render or a GCS upload inside one sub-agent
+stalls every other sub-agent of the ParallelAgent (and every other session in
+the process) until it returns.
+
+- `offload(func)` wraps a blocking tool function in an async function with the
+  same name, docstring and signature; the call runs on one bounded, process-wide
+  thread pool (TOOL_EXECUTOR_WORKERS threads) so the model sees the same tool.
+- When a tracer has set `tool_timing` for the current tool call, the time the
+  call waited for a pool thread is stored in it as "queue_ms".
+- `EventLoopLagMonitor` measures how late the loop wakes up a periodic timer.
+  Lag stays near zero while tools are offloaded and grows to the length of the
+  blocking call when they are not.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_WORKERS = int(os.getenv("TOOL_EXECUTOR_WORKERS", "16"))
+DEFAULT_LAG_INTERVAL_SECONDS = 0.01
+
+# Attributes dict of the active tool span, if any; run_blocking adds "queue_ms".
+tool_timing: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("tool_timing", default=None)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_tool_executor() -> ThreadPoolExecutor:
+    """Returns the process-wide tool thread pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=DEFAULT_WORKERS, thread_name_prefix="agent-tool")
+    return _executor
+
+
+def set_tool_executor(executor: ThreadPoolExecutor) -> None:
+    """Replaces the process-wide tool thread pool (the old one is shut down)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = executor
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Runs func(*args, **kwargs) on the tool thread pool, preserving context variables."""
+    loop = asyncio.get_running_loop()
+    submitted = time.perf_counter()
+
+    def call():
+        timing = tool_timing.get()
+        if timing is not None:
+            timing["queue_ms"] = round((time.perf_counter() - submitted) * 1000, 3)
+        return func(*args, **kwargs)
+
+    return await loop.run_in_executor(get_tool_executor(), functools.partial(contextvars.copy_context().run, call))
+
+
+def offload(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Async variant of a blocking tool function, for use with FunctionTool."""
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await run_blocking(func, *args, **kwargs)
+
+    return wrapper
+
+
+class EventLoopLagMonitor:
+    """
+    Samples event-loop lag while active.
+
+    Every `interval` seconds a timer is scheduled; lag is how much later than
+    requested it actually ran. Use as `async with EventLoopLagMonitor() as lag:`
+    and read `lag.stats()` afterwards (or during).
+    """
+
+    def __init__(self, interval: float = DEFAULT_LAG_INTERVAL_SECONDS):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _sample(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def __aenter__(self) -> "EventLoopLagMonitor":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Lag in milliseconds: samples, mean, p50, p99 and max."""
+        if not self.samples:
+            return {"samples": 0}
+        lag_ms = np.asarray(self.samples) * 1000
+        p50, p99 = np.percentile(lag_ms, [50, 99])
+        return {
+            "samples": int(lag_ms.size),
+            "mean_ms": round(float(lag_ms.mean()), 3),
+            "p50_ms": round(float(p50), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(float(lag_ms.max()), 3),
+        }
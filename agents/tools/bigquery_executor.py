@@ -0,0 +1,275 @@
+"""
+Shared query execution for the agents that read from the warehouse.
+
+- One process-wide executor owns a pooled backend. The default backend keeps a
+  single `bigquery.Client` (and therefore a single authorized HTTP session with
+  a sized connection pool) for the life of the process instead of creating a
+  client per tool call.
+- Every call carries a timeout (BIGQUERY_QUERY_TIMEOUT seconds by default).
+- Tool responses are streamed page by page into a compact, bounded columnar
+  encoding (see result_encoding.py) instead of str() of every row.
+- Read-only results go through a normalized-SQL TTL/LRU cache (see
+  query_cache.py); BIGQUERY_CACHE_SIZE=0 turns it off.
+- `bigquery_query_async` is the tool the agents use: the same function, run
+  on the tool thread pool so a slow query does not stall the event loop.
+- The backend is pluggable: `set_backend(SQLiteBackend(...))` points every
+  agent at a local stand-in, which is what load tests and offline runs use.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from agents.tools.async_tools import offload
+from agents.tools.query_cache import DEFAULT_MAX_ENTRIES, QueryResultCache, is_cacheable
+from agents.tools.result_encoding import DEFAULT_MAX_BYTES, DEFAULT_MAX_ROWS, encode_rows, to_text
+
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv("BIGQUERY_QUERY_TIMEOUT", "60"))
+DEFAULT_POOL_SIZE = int(os.getenv("BIGQUERY_POOL_SIZE", "16"))
+DEFAULT_PAGE_SIZE = int(os.getenv("BIGQUERY_PAGE_SIZE", "500"))
+
+
+class QueryBackend:
+    """Interface for anything that can execute a SQL string and yield rows."""
+
+    name = "base"
+
+    def iter_rows(
+        self,
+        query: str,
+        timeout: Optional[float] = None,
+        max_results: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class BigQueryBackend(QueryBackend):
+    """BigQuery backend holding one lazily created, shared client."""
+
+    name = "bigquery"
+
+    def __init__(self, project: Optional[str] = None, pool_size: int = DEFAULT_POOL_SIZE):
+        self._project = project or os.getenv("GOOGLE_CLOUD_PROJECT")
+        self._pool_size = pool_size
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    # Lazy import so the module can be used with other backends
+                    from google.cloud import bigquery
+                    client = bigquery.Client(project=self._project)
+                    self._size_http_pool(client)
+                    self._client = client
+                    print("[BigQuery Tool] Successfully created shared BigQuery client.")
+        return self._client
+
+    def _size_http_pool(self, client) -> None:
+        # The client's AuthorizedSession is a requests.Session; the default
+        # adapter only keeps 10 connections, which parallel sub-agents exhaust.
+        try:
+            from requests.adapters import HTTPAdapter
+            adapter = HTTPAdapter(pool_connections=self._pool_size, pool_maxsize=self._pool_size)
+            client._http.mount("https://", adapter)
+        except Exception as e:
+            print(f"[BigQuery Tool] Could not resize HTTP pool, using defaults: {e}")
+
+    def iter_rows(
+        self,
+        query: str,
+        timeout: Optional[float] = None,
+        max_results: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        client = self._get_client()
+        query_job = client.query(query, timeout=timeout)
+        # RowIterator fetches one page at a time as it is consumed.
+        results = query_job.result(timeout=timeout, page_size=DEFAULT_PAGE_SIZE, max_results=max_results)
+        for row in results:
+            yield dict(row)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+class SQLiteBackend(QueryBackend):
+    """
+    Local stand-in backed by sqlite3.
+
+    BigQuery's backtick-quoted `project.dataset.table` names are valid quoted
+    identifiers in SQLite, so tables can be created under their warehouse names
+    and the agents' SQL runs unchanged for simple SELECT/WHERE/LIKE queries.
+    latency_seconds adds a fixed delay per query to mimic a network round trip.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, database: str = ":memory:", latency_seconds: float = 0.0):
+        self._conn = sqlite3.connect(database, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._latency_seconds = latency_seconds
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        return self._conn
+
+    def load_table(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        """Create (or replace) `table` and insert rows (list of dicts with identical keys)."""
+        if not rows:
+            raise ValueError("load_table needs at least one row to infer columns.")
+        columns = list(rows[0].keys())
+        column_sql = ", ".join(f'"{c}"' for c in columns)
+        placeholders = ", ".join("?" for _ in columns)
+        with self._lock:
+            self._conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            self._conn.execute(f'CREATE TABLE "{table}" ({column_sql})')
+            self._conn.executemany(
+                f'INSERT INTO "{table}" ({column_sql}) VALUES ({placeholders})',
+                [tuple(r.get(c) for c in columns) for r in rows],
+            )
+            self._conn.commit()
+
+    def iter_rows(
+        self,
+        query: str,
+        timeout: Optional[float] = None,
+        max_results: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        if self._latency_seconds:
+            time.sleep(self._latency_seconds if timeout is None else min(self._latency_seconds, timeout))
+        with self._lock:
+            cursor = self._conn.execute(query)
+            rows = cursor.fetchmany(max_results) if max_results is not None else cursor.fetchall()
+        return (dict(r) for r in rows)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _default_cache() -> Optional[QueryResultCache]:
+    if DEFAULT_MAX_ENTRIES <= 0:
+        return None
+    return QueryResultCache(disk_path=os.getenv("BIGQUERY_CACHE_PATH"))
+
+
+class QueryExecutor:
+    """Runs queries against the configured backend with a default per-call timeout."""
+
+    def __init__(
+        self,
+        backend: Optional[QueryBackend] = None,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        cache: Optional[QueryResultCache] = None,
+    ):
+        self.backend = backend or BigQueryBackend()
+        self.timeout = timeout
+        self.cache = cache
+
+    def iter_rows(
+        self,
+        query: str,
+        timeout: Optional[float] = None,
+        max_results: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        return self.backend.iter_rows(query, timeout=timeout or self.timeout, max_results=max_results)
+
+    def execute(self, query: str, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        use_cache = self.cache is not None and is_cacheable(query)
+        if use_cache:
+            cached = self.cache.get(query)
+            if cached is not None:
+                return cached
+        rows = list(self.iter_rows(query, timeout=timeout))
+        if use_cache:
+            self.cache.put(query, rows)
+        return rows
+
+    def execute_encoded(
+        self,
+        query: str,
+        max_rows: Optional[int] = DEFAULT_MAX_ROWS,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Streams at most max_rows (+1 to detect truncation) rows into the compact encoding."""
+        if max_rows is not None:
+            # The encoding always returns at least one row; see result_encoding.
+            max_rows = max(1, max_rows)
+        variant = f"encoded:{max_rows}:{max_bytes}"
+        use_cache = self.cache is not None and is_cacheable(query)
+        if use_cache:
+            cached = self.cache.get(query, variant)
+            if cached is not None:
+                return cached
+        max_results = max_rows + 1 if max_rows is not None else None
+        encoded = encode_rows(self.iter_rows(query, timeout=timeout, max_results=max_results), max_rows, max_bytes)
+        if use_cache:
+            self.cache.put(query, encoded, variant)
+        return encoded
+
+
+_executor: Optional[QueryExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> QueryExecutor:
+    """Returns the process-wide executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = QueryExecutor(cache=_default_cache())
+    return _executor
+
+
+def set_backend(
+    backend: QueryBackend,
+    timeout: Optional[float] = None,
+    cache: Optional[QueryResultCache] = None,
+) -> QueryExecutor:
+    """Swaps the backend used by every agent's `bigquery_query` tool."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.backend.close()
+        _executor = QueryExecutor(backend, timeout=timeout or DEFAULT_TIMEOUT_SECONDS, cache=cache)
+    return _executor
+
+
+def bigquery_query(query: str, max_rows: int = DEFAULT_MAX_ROWS, max_bytes: int = DEFAULT_MAX_BYTES) -> str:
+    """
+    Executes a BigQuery SQL query and returns a compact JSON encoding of the results.
+
+    Args:
+      query: A valid BigQuery SQL query string.
+      max_rows: Maximum number of rows to return (at least 1).
+      max_bytes: Maximum size of the returned rows in bytes.
+
+    Returns:
+      A JSON string {"columns": [...], "rows": [[...], ...], "row_count": n,
+      "truncated": bool} (rows hold values in column order), or an error message.
+    """
+    print(f"\n[BigQuery Tool] Attempting to execute query:\n{query}\n")
+    try:
+        encoded = get_executor().execute_encoded(query, max_rows=max_rows, max_bytes=max_bytes)
+        print(
+            f"[BigQuery Tool] Query executed successfully. Returned {encoded['row_count']} rows"
+            f"{' (truncated)' if encoded['truncated'] else ''}."
+        )
+        return to_text(encoded)
+    except Exception as e:
+        print(f"❌ [BigQuery Tool] Connection/query failed: {e}")
+        return f"An error occurred while querying BigQuery: {e}"
+
+
+bigquery_query_async = offload(bigquery_query)
@@ -0,0 +1,240 @@
+"""
+Location resolver index.
+
+Values from the warehouse location columns (ZIP codes, HUD area codes, HUD area
+names, property titles and addresses) are normalized (lower-cased, punctuation
+folded to spaces) and indexed by character trigram. A query is answered from
+the posting lists of its own trigrams:
+
+- score = 0.7 * containment (share of the query's trigrams found in the value)
+        + 0.3 * Jaccard similarity, with exact matches scored 1.0 and
+          prefix matches (useful for partial ZIP codes) boosted;
+- candidates come back ranked with the table(s) and column they belong to,
+  so tools can issue `column = 'value'` lookups instead of LIKE '%...%' scans.
+
+Sources are registered by the agents that own the tables (`register_source`);
+the process-wide index loads them on first use and `refresh()` adds only
+values it has not seen before. `get_location_index` refreshes the index again
+once it is older than LOCATION_INDEX_REFRESH_SECONDS (default one hour, 0
+disables), so values added to the warehouse later become resolvable in a
+long-running process. The refresh runs in the calling thread; concurrent
+callers keep using the current index meanwhile.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+DEFAULT_MIN_SCORE = 0.35
+SEARCH_CACHE_SIZE = 1024
+REFRESH_INTERVAL_SECONDS = float(os.getenv("LOCATION_INDEX_REFRESH_SECONDS", "3600"))
+
+
+def normalize_location(value: Any) -> str:
+    return _NON_ALNUM_RE.sub(" ", str(value).lower()).strip()
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class LocationIndex:
+    """Trigram + prefix index over (column, value) pairs."""
+
+    def __init__(self):
+        self._docs: List[Tuple[str, str, str]] = []  # (column, original value, normalized)
+        self._doc_ids: Dict[Tuple[str, str], int] = {}
+        self._tables: List[Set[str]] = []
+        self._grams: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        # The same locations are resolved for every loan in a market; results
+        # are memoized until the next value is added.
+        self._search_cache: "OrderedDict[Tuple, List[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, column: str, value: Any, table: Optional[str] = None) -> bool:
+        """Indexes one value; returns False if it was already present."""
+        if value is None:
+            return False
+        normalized = normalize_location(value)
+        if not normalized:
+            return False
+        with self._lock:
+            doc_id = self._doc_ids.get((column, normalized))
+            if doc_id is not None:
+                if table and table not in self._tables[doc_id]:
+                    self._tables[doc_id].add(table)
+                    self._search_cache.clear()
+                return False
+            doc_id = len(self._docs)
+            self._doc_ids[(column, normalized)] = doc_id
+            self._docs.append((column, str(value), normalized))
+            self._tables.append({table} if table else set())
+            grams = trigrams(normalized)
+            self._grams.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(doc_id)
+            self._search_cache.clear()
+        return True
+
+    def add_rows(self, rows: Iterable[Dict[str, Any]], columns: List[str], table: Optional[str] = None) -> int:
+        """Indexes the given columns of every row; returns the number of new values."""
+        added = 0
+        for row in rows:
+            for column in columns:
+                added += self.add(column, row.get(column), table)
+        return added
+
+    def search(
+        self,
+        query: str,
+        columns: Optional[List[str]] = None,
+        limit: int = 5,
+        min_score: float = DEFAULT_MIN_SCORE,
+    ) -> List[Dict[str, Any]]:
+        """Returns up to `limit` candidates ranked by score (highest first)."""
+        needle = normalize_location(query)
+        if not needle:
+            return []
+        cache_key = (needle, tuple(columns or ()), limit, min_score)
+        with self._lock:
+            cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        query_grams = trigrams(needle)
+        hits: Counter = Counter()
+        for gram in query_grams:
+            hits.update(self._postings.get(gram, ()))
+
+        scored = []
+        for doc_id, shared in hits.items():
+            column, value, normalized = self._docs[doc_id]
+            if columns and column not in columns:
+                continue
+            if normalized == needle:
+                score = 1.0
+            else:
+                containment = shared / len(query_grams)
+                jaccard = shared / (len(query_grams) + self._grams[doc_id] - shared)
+                score = 0.7 * containment + 0.3 * jaccard
+                if normalized.startswith(needle):
+                    score = min(0.99, score + 0.1)
+            if score >= min_score:
+                scored.append((score, doc_id))
+        scored.sort(key=lambda item: (-item[0], self._docs[item[1]][2]))
+        candidates = [
+            {
+                "column": self._docs[doc_id][0],
+                "value": self._docs[doc_id][1],
+                "tables": sorted(self._tables[doc_id]),
+                "score": round(score, 3),
+            }
+            for score, doc_id in scored[:limit]
+        ]
+        with self._lock:
+            self._search_cache[cache_key] = candidates
+            if len(self._search_cache) > SEARCH_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
+        return candidates
+
+
+_sources: List[Tuple[str, List[str]]] = []
+_index: Optional[LocationIndex] = None
+_index_lock = threading.Lock()
+_refreshed_at = 0.0
+_refresh_lock = threading.Lock()
+
+
+def register_source(table: str, columns: List[str]) -> None:
+    """Declares a warehouse table whose columns should be resolvable."""
+    if (table, columns) not in _sources:
+        _sources.append((table, columns))
+
+
+def refresh(index: Optional[LocationIndex] = None) -> int:
+    """Pulls distinct values of every registered source; only unseen ones are indexed."""
+    from agents.tools.bigquery_executor import get_executor
+
+    if index is None:
+        index = get_location_index()
+    executor = get_executor()
+    added = 0
+    for table, columns in _sources:
+        for column in columns:
+            try:
+                rows = executor.iter_rows(f"SELECT DISTINCT {column} FROM `{table}` WHERE {column} IS NOT NULL")
+                added += index.add_rows(rows, [column], table)
+            except Exception as e:
+                # One unreachable table should not disable resolution for the others.
+                print(f"❌ [Location Index] Could not load {table}.{column}: {e}")
+    return added
+
+
+def _refresh_if_stale(index: LocationIndex) -> None:
+    global _refreshed_at
+    # Only one caller refreshes; the others keep searching the current index.
+    if not _refresh_lock.acquire(blocking=False):
+        return
+    try:
+        if time.monotonic() - _refreshed_at < REFRESH_INTERVAL_SECONDS:
+            return
+        _refreshed_at = time.monotonic()
+        added = refresh(index)
+        if added:
+            print(f"[Location Index] Refresh indexed {added} new location values.")
+    finally:
+        _refresh_lock.release()
+
+
+def get_location_index() -> LocationIndex:
+    """Returns the process-wide index, loading registered sources on first use and refreshing them periodically."""
+    global _index, _refreshed_at
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = LocationIndex()
+                added = refresh(index)
+                print(f"[Location Index] Indexed {added} location values.")
+                _refreshed_at = time.monotonic()
+                _index = index
+    elif REFRESH_INTERVAL_SECONDS > 0 and time.monotonic() - _refreshed_at >= REFRESH_INTERVAL_SECONDS:
+        _refresh_if_stale(_index)
+    return _index
+
+
+def set_location_index(index: Optional[LocationIndex]) -> None:
+    """Replaces (or with None, drops) the process-wide index."""
+    global _index, _refreshed_at
+    with _index_lock:
+        _index = index
+        _refreshed_at = time.monotonic()
+
+
+def resolve_location(query: str, limit: int = 5) -> str:
+    """
+    Resolves a free-text location to exact values in the warehouse tables.
+
+    Args:
+      query: A ZIP code, HUD area code, area/city name, property title or address (partial is fine).
+      limit: Maximum number of candidates to return.
+
+    Returns:
+      A JSON list of candidates, best first, each with `column`, `value`,
+      `tables` and `score` (1.0 is an exact match). Use them in exact
+      `column = 'value'` filters.
+    """
+    try:
+        return json.dumps(get_location_index().search(query, limit=limit))
+    except Exception as e:
+        print(f"❌ [Location Index] Resolution failed: {e}")
+        return f"An error occurred while resolving the location: {e}"
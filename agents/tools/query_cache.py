@@ -0,0 +1,277 @@
+"""
+Result cache for warehouse queries.
+
+- Keys are built from normalized SQL: comments and redundant whitespace are
+  dropped, everything outside string literals is lower-cased, literal IN-lists
+  are sorted and top-level AND-ed WHERE predicates are put in a canonical order.
+  String literal contents keep their case because they change query results.
+- The in-memory tier is an LRU bounded by max_entries with a default TTL;
+  ttl_overrides maps a table-name substring to its own TTL so static tables
+  (the SAFMR fiscal-year tables) stay cached much longer than live ones.
+- An optional SQLite file tier (BIGQUERY_CACHE_PATH) survives restarts.
+- hits / misses / disk_hits / evictions / expirations are counted in stats().
+"""
+
+import hashlib
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("BIGQUERY_CACHE_SIZE", "512"))
+DEFAULT_TTL_SECONDS = float(os.getenv("BIGQUERY_CACHE_TTL", "900"))
+
+# SAFMR tables are published once per fiscal year.
+DEFAULT_TTL_OVERRIDES = {
+    "safmrs": 30 * 24 * 3600.0,
+}
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<comment>--[^\n]*|/\*.*?\*/)
+    | (?P<string>'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.)*")
+    | (?P<quoted>`[^`]*`)
+    | (?P<number>\d+(?:\.\d+)?)
+    | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+    | (?P<op><>|!=|<=|>=|\|\||[^\sA-Za-z0-9_])
+    | (?P<space>\s+)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+_LITERAL_KINDS = ("string", "number")
+_WHERE_TERMINATORS = {"group", "order", "limit", "having", "qualify", "window", "union", "except", "intersect"}
+_READ_ONLY_PREFIXES = ("select", "with", "(")
+_TABLE_RE = re.compile(r"\b(?:from|join)\s+`?([\w.-]+)`?")
+
+
+def _tokenize(sql: str) -> List[Tuple[str, str]]:
+    tokens = []
+    for m in _TOKEN_RE.finditer(sql):
+        kind = m.lastgroup
+        if kind in ("comment", "space"):
+            continue
+        text = m.group()
+        if kind in ("word", "quoted"):
+            text = text.lower()
+        tokens.append((kind, text))
+    while tokens and tokens[-1][1] == ";":
+        tokens.pop()
+    return tokens
+
+
+def _literal_in_list(tokens: List[Tuple[str, str]], start: int) -> Tuple[List[Tuple[str, str]], int]:
+    # Parses "( lit , lit , ... )" beginning at tokens[start] == "(".
+    # Returns the literals and the index of ")" or ([], -1) if it isn't one.
+    items = []
+    j = start + 1
+    while j + 1 < len(tokens) and tokens[j][0] in _LITERAL_KINDS:
+        items.append(tokens[j])
+        if tokens[j + 1][1] == ")":
+            return items, j + 1
+        if tokens[j + 1][1] != ",":
+            break
+        j += 2
+    return [], -1
+
+
+def _sort_in_lists(tokens: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    out = []
+    i = 0
+    while i < len(tokens):
+        out.append(tokens[i])
+        if tokens[i] == ("word", "in") and i + 1 < len(tokens) and tokens[i + 1][1] == "(":
+            items, close = _literal_in_list(tokens, i + 1)
+            if items:
+                out.append(tokens[i + 1])
+                for k, item in enumerate(sorted(set(items))):
+                    if k:
+                        out.append(("op", ","))
+                    out.append(item)
+                out.append(tokens[close])
+                i = close + 1
+                continue
+        i += 1
+    return out
+
+
+def _sort_where_conjuncts(tokens: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    out = []
+    i = 0
+    while i < len(tokens):
+        out.append(tokens[i])
+        if tokens[i] != ("word", "where"):
+            i += 1
+            continue
+        # Collect the WHERE clause up to the first terminator at depth 0.
+        depth = 0
+        j = i + 1
+        conjuncts = [[]]
+        has_or = False
+        while j < len(tokens):
+            kind, text = tokens[j]
+            if text == "(":
+                depth += 1
+            elif text == ")":
+                if depth == 0:
+                    break
+                depth -= 1
+            elif depth == 0 and kind == "word":
+                if text in _WHERE_TERMINATORS:
+                    break
+                if text == "or":
+                    has_or = True
+                if text == "and" and not _is_between_and(conjuncts[-1]):
+                    conjuncts.append([])
+                    j += 1
+                    continue
+            conjuncts[-1].append(tokens[j])
+            j += 1
+        if not has_or and len(conjuncts) > 1 and all(conjuncts):
+            conjuncts.sort(key=lambda c: " ".join(t for _, t in c))
+            for k, conjunct in enumerate(conjuncts):
+                if k:
+                    out.append(("word", "and"))
+                out.extend(conjunct)
+        else:
+            out.extend(tokens[i + 1:j])
+        i = j
+    return out
+
+
+def _is_between_and(conjunct: List[Tuple[str, str]]) -> bool:
+    # "x BETWEEN a AND b": the AND belongs to BETWEEN, not the conjunction.
+    words = [t for k, t in conjunct if k == "word"]
+    return "between" in words and words.count("between") > words.count("and")
+
+
+def normalize_sql(sql: str) -> str:
+    """Returns a canonical form of `sql` used as the cache key."""
+    tokens = _tokenize(sql)
+    tokens = _sort_in_lists(tokens)
+    tokens = _sort_where_conjuncts(tokens)
+    return " ".join(text for _, text in tokens)
+
+
+def is_cacheable(sql: str) -> bool:
+    """Only read-only statements are cached."""
+    return sql.lstrip().lower().startswith(_READ_ONLY_PREFIXES)
+
+
+class QueryResultCache:
+    """Two-tier (memory LRU + optional SQLite file) cache of query results."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        ttl_overrides: Optional[Dict[str, float]] = None,
+        disk_path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.ttl_overrides = DEFAULT_TTL_OVERRIDES if ttl_overrides is None else ttl_overrides
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0, "expirations": 0}
+        self._disk = None
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS query_cache "
+                "(key TEXT PRIMARY KEY, expires_at REAL, payload BLOB)"
+            )
+            self._disk.commit()
+
+    @staticmethod
+    def key_for(sql: str, variant: str = "") -> str:
+        # variant separates differently shaped results of the same query
+        # (e.g. full rows vs. a capped, encoded result).
+        return hashlib.sha256(f"{variant}|{normalize_sql(sql)}".encode("utf-8")).hexdigest()
+
+    def ttl_for(self, sql: str) -> float:
+        tables = _TABLE_RE.findall(sql.lower())
+        if not tables:
+            return self.ttl_seconds
+        # A query joining a static table with a live one gets the shorter TTL.
+        return min(self._table_ttl(table) for table in tables)
+
+    def _table_ttl(self, table: str) -> float:
+        for marker, ttl in self.ttl_overrides.items():
+            if marker in table:
+                return ttl
+        return self.ttl_seconds
+
+    def get(self, sql: str, variant: str = "") -> Optional[Any]:
+        key = self.key_for(sql, variant)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, rows = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return rows
+                del self._entries[key]
+                self._stats["expirations"] += 1
+            if self._disk is not None:
+                found = self._disk.execute(
+                    "SELECT expires_at, payload FROM query_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if found is not None:
+                    expires_at, payload = found
+                    if expires_at > now:
+                        rows = pickle.loads(payload)
+                        self._store_memory(key, expires_at, rows)
+                        self._stats["hits"] += 1
+                        self._stats["disk_hits"] += 1
+                        return rows
+                    self._disk.execute("DELETE FROM query_cache WHERE key = ?", (key,))
+                    self._disk.commit()
+                    self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, sql: str, rows: Any, variant: str = "") -> None:
+        key = self.key_for(sql, variant)
+        expires_at = time.time() + self.ttl_for(sql)
+        with self._lock:
+            self._store_memory(key, expires_at, rows)
+            if self._disk is not None:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO query_cache (key, expires_at, payload) VALUES (?, ?, ?)",
+                    (key, expires_at, pickle.dumps(rows)),
+                )
+                self._disk.commit()
+
+    def _store_memory(self, key: str, expires_at: float, rows: Any) -> None:
+        self._entries[key] = (expires_at, rows)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM query_cache")
+                self._disk.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
@@ -0,0 +1,87 @@
+"""
+Compact, bounded encoding of query results for the model context.
+
+Rows are consumed from an iterator one at a time and never materialized as a
+full list. The output is columnar - the header once, then one value list per
+row - and stops at max_rows or max_bytes (measured on the JSON-encoded value
+rows), whichever comes first:
+
+    {"columns": ["title", "price"], "rows": [["A", 1.0], ...],
+     "row_count": 2, "truncated": true, "truncated_by": "max_rows"}
+
+At least one row is always returned (max_rows below 1 counts as 1), so
+`row_count` is 0 only for an empty result. A first row larger than max_bytes has its longest string values
+shortened to fit and the result is marked `"row_too_large": true`.
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable, Optional
+
+DEFAULT_MAX_ROWS = int(os.getenv("BIGQUERY_MAX_ROWS", "200"))
+DEFAULT_MAX_BYTES = int(os.getenv("BIGQUERY_MAX_BYTES", "32000"))
+
+
+def _dumps(value: Any) -> str:
+    # Decimal / date / datetime values from the warehouse become strings.
+    return json.dumps(value, default=str, separators=(",", ":"))
+
+
+def _clip_row(row_values: list, max_bytes: int) -> list:
+    """Halves the longest string value until the row fits in max_bytes (or no string is left to shorten)."""
+    clipped = list(row_values)
+    while len(_dumps(clipped)) + 1 > max_bytes:
+        lengths = [len(v) if isinstance(v, str) else 0 for v in clipped]
+        longest = max(range(len(clipped)), key=lengths.__getitem__, default=None)
+        if longest is None or lengths[longest] == 0:
+            break
+        clipped[longest] = clipped[longest][:lengths[longest] // 2]
+    return clipped
+
+
+def encode_rows(
+    rows: Iterable[Dict[str, Any]],
+    max_rows: Optional[int] = DEFAULT_MAX_ROWS,
+    max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+) -> Dict[str, Any]:
+    """Encodes rows (dicts) into the columnar shape described in the module docstring."""
+    if max_rows is not None:
+        max_rows = max(1, max_rows)
+    columns = None
+    values = []
+    used_bytes = 0
+    truncated_by = None
+    row_too_large = False
+    for row in rows:
+        if columns is None:
+            columns = list(row.keys())
+        if max_rows is not None and len(values) >= max_rows:
+            truncated_by = "max_rows"
+            break
+        row_values = [row.get(c) for c in columns]
+        row_bytes = len(_dumps(row_values)) + 1
+        if max_bytes is not None and used_bytes + row_bytes > max_bytes:
+            truncated_by = "max_bytes"
+            if not values:
+                # An empty result would read as "not found"; return the row shortened instead.
+                values.append(_clip_row(row_values, max_bytes))
+                row_too_large = True
+            break
+        values.append(row_values)
+        used_bytes += row_bytes
+    result = {
+        "columns": columns or [],
+        "rows": values,
+        "row_count": len(values),
+        "truncated": truncated_by is not None,
+    }
+    if truncated_by:
+        result["truncated_by"] = truncated_by
+    if row_too_large:
+        result["row_too_large"] = True
+    return result
+
+
+def to_text(encoded: Dict[str, Any]) -> str:
+    """Serializes an encoded result for a tool response."""
+    return _dumps(encoded)
@@ -0,0 +1,33 @@
+"""
+Reading the JSON objects that agents write to session state.
+
+LLM agents store their final text under their output_key; the prompts ask for
+a JSON object, but models often wrap it in a ```json fence or add a sentence
+around it. `parse_json_output` recovers the object in all of those cases.
+"""
+
+import json
+import re
+from typing import Any, Dict, Optional
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+
+
+def parse_json_output(value: Any) -> Optional[Dict[str, Any]]:
+    """Returns the JSON object held in a state value, or None if there is none."""
+    if isinstance(value, dict):
+        return value
+    if not isinstance(value, str):
+        return None
+    candidates = [m.group(1) for m in _FENCE_RE.finditer(value)] + [value]
+    start, end = value.find("{"), value.rfind("}")
+    if 0 <= start < end:
+        candidates.append(value[start:end + 1])
+    for candidate in candidates:
+        try:
+            parsed = json.loads(candidate.strip())
+        except json.JSONDecodeError:
+            continue
+        if isinstance(parsed, dict):
+            return parsed
+    return None
@@ -17,16 +17,28 @@ Generic VisualizationTool for ADK agents.
   - expires_seconds (optional) signed url expiry
 - Returns a dict with "visuals": list of metadata for each created chart
   each element: {id, name, local_bytes_len, gcs_path?, signed_url?, data_url?}
+
+When called by an agent the tool runs through `arun`: each chart is rendered
+and uploaded on the shared tool thread pool (renders are serialized because
+pyplot state is global; uploads overlap), so the event loop is never blocked.
 """
 
 from google.adk.tools import BaseTool
+from google.genai import types
+import asyncio
 import os
+import threading
 import io
 import uuid
 import datetime
 import base64
 from typing import List, Dict, Any, Optional
 
+from agents.tools.async_tools import run_blocking
+
+# pyplot keeps global figure state; concurrent renders from the thread pool would interleave.
+_RENDER_LOCK = threading.Lock()
+
 class VisualizationTool(BaseTool):
     name = "visualization.generic_create"
     description = (
@@ -101,7 +113,7 @@ class VisualizationTool(BaseTool):
         buf.seek(0)
         return buf.read()
 
-    def _upload_to_gcs(self, bytes_data: bytes, filename: str, bucket_name: str):
+    def _upload_to_gcs(self, bytes_data: bytes, filename: str, bucket_name: str, expires_seconds: int = 3600):
         from google.cloud import storage
         storage_client = storage.Client()
         bucket = storage_client.bucket(bucket_name)
@@ -109,9 +121,65 @@ class VisualizationTool(BaseTool):
         blob.upload_from_string(bytes_data, content_type="image/png")
         # Generate signed URL. This uses google-cloud-storage generate_signed_url.
         # Requires properly scoped credentials (service account or key).
-        signed_url = blob.generate_signed_url(expiration=datetime.timedelta(seconds=self._expires_seconds))
+        signed_url = blob.generate_signed_url(expiration=datetime.timedelta(seconds=expires_seconds))
         return f"gs://{bucket_name}/{filename}", signed_url
 
+    def _create_visual(
+        self,
+        idx: int,
+        spec: Dict[str, Any],
+        bucket_name: Optional[str],
+        default_upload: bool,
+        expires_seconds: int,
+        prefix: str,
+    ) -> Dict[str, Any]:
+        """Validates, renders and (optionally) uploads one chart; returns its metadata entry."""
+        try:
+            self._validate_spec(spec)
+        except Exception as e:
+            return {"id": spec.get("id") or f"chart_{idx}", "error": f"invalid spec: {e}"}
+
+        chart_id = spec.get("id") or f"chart_{uuid.uuid4().hex[:8]}"
+        filename = spec.get("filename")
+        upload_flag = spec.get("upload", default_upload)
+
+        try:
+            with _RENDER_LOCK:
+                png_bytes = self._render_chart_png(spec)
+        except Exception as e:
+            return {"id": chart_id, "error": f"render_failed: {e}"}
+
+        entry = {
+            "id": chart_id,
+            "name": spec.get("title") or filename or chart_id,
+            "local_bytes_len": len(png_bytes),
+        }
+
+        # If upload requested and bucket available, upload and provide signed URL
+        if upload_flag:
+            if not bucket_name:
+                # fallback to inline if no bucket
+                data_url = "data:image/png;base64," + base64.b64encode(png_bytes).decode("ascii")
+                entry["data_url"] = data_url
+                entry["warning"] = "upload requested but no bucket configured; returning inline data_url"
+            else:
+                # ensure filename
+                if not filename:
+                    filename = f"{prefix}{chart_id}_{uuid.uuid4().hex}.png"
+                try:
+                    gcs_path, signed_url = self._upload_to_gcs(png_bytes, filename, bucket_name, expires_seconds)
+                    entry["gcs_path"] = gcs_path
+                    entry["signed_url"] = signed_url
+                except Exception as e:
+                    # fallback to inline data url if upload fails
+                    entry["error"] = f"upload_failed: {e}"
+                    entry["data_url"] = "data:image/png;base64," + base64.b64encode(png_bytes).decode("ascii")
+        else:
+            # return inline base64 data url
+            entry["data_url"] = "data:image/png;base64," + base64.b64encode(png_bytes).decode("ascii")
+
+        return entry
+
     def run(
         self,
         visual_spec: List[Dict[str, Any]],
@@ -127,59 +195,53 @@ class VisualizationTool(BaseTool):
         default_expires_seconds: signed URL expiry in seconds
         prefix: GCS object prefix for auto-generated filenames
         """
-        # store for signed url expiry usage in _upload_to_gcs
-        self._expires_seconds = default_expires_seconds
-        load_dotenv()
         bucket_name = bucket_name or os.environ.get("GCS_BUCKET")
-        visuals = []
-        for idx, spec in enumerate(visual_spec):
-            try:
-                self._validate_spec(spec)
-            except Exception as e:
-                visuals.append({"id": spec.get("id") or f"chart_{idx}", "error": f"invalid spec: {e}"})
-                continue
-
-            chart_id = spec.get("id") or f"chart_{uuid.uuid4().hex[:8]}"
-            filename = spec.get("filename")
-            upload_flag = spec.get("upload", default_upload)
-
-            try:
-                png_bytes = self._render_chart_png(spec)
-            except Exception as e:
-                visuals.append({"id": chart_id, "error": f"render_failed: {e}"})
-                continue
-
-            entry = {
-                "id": chart_id,
-                "name": spec.get("title") or filename or chart_id,
-                "local_bytes_len": len(png_bytes),
-            }
-
-            # If upload requested and bucket available, upload and provide signed URL
-            if upload_flag:
-                if not bucket_name:
-                    # fallback to inline if no bucket
-                    data_url = "data:image/png;base64," + base64.b64encode(png_bytes).decode("ascii")
-                    entry["data_url"] = data_url
-                    entry["warning"] = "upload requested but no bucket configured; returning inline data_url"
-                else:
-                    # ensure filename
-                    if not filename:
-                        filename = f"{prefix}{chart_id}_{uuid.uuid4().hex}.png"
-                    try:
-                        gcs_path, signed_url = self._upload_to_gcs(png_bytes, filename, bucket_name)
-                        entry["gcs_path"] = gcs_path
-                        entry["signed_url"] = signed_url
-                    except Exception as e:
-                        # fallback to inline data url if upload fails
-                        entry["error"] = f"upload_failed: {e}"
-                        entry["data_url"] = "data:image/png;base64," + base64.b64encode(png_bytes).decode("ascii")
-            else:
-                # return inline base64 data url
-                entry["data_url"] = "data:image/png;base64," + base64.b64encode(png_bytes).decode("ascii")
-
-            visuals.append(entry)
-
+        visuals = [
+            self._create_visual(idx, spec, bucket_name, default_upload, default_expires_seconds, prefix)
+            for idx, spec in enumerate(visual_spec)
+        ]
         return {"visuals": visuals}
 
-visualization_tool = VisualizationTool()
\ No newline at end of file
+    async def arun(
+        self,
+        visual_spec: List[Dict[str, Any]],
+        bucket_name: Optional[str] = None,
+        default_upload: bool = True,
+        default_expires_seconds: int = 3600,
+        prefix: str = "visuals/",
+    ) -> Dict[str, Any]:
+        """Async `run`: charts are rendered and uploaded on the tool thread pool."""
+        bucket_name = bucket_name or os.environ.get("GCS_BUCKET")
+        visuals = await asyncio.gather(*(
+            run_blocking(self._create_visual, idx, spec, bucket_name, default_upload, default_expires_seconds, prefix)
+            for idx, spec in enumerate(visual_spec)
+        ))
+        return {"visuals": list(visuals)}
+
+    async def run_async(self, *, args: Dict[str, Any], tool_context) -> Any:
+        return await self.arun(**args)
+
+    def _get_declaration(self) -> Optional[types.FunctionDeclaration]:
+        return types.FunctionDeclaration(
+            name=self.name,
+            description=self.description,
+            parameters=types.Schema(
+                type=types.Type.OBJECT,
+                properties={
+                    "visual_spec": types.Schema(
+                        type=types.Type.ARRAY,
+                        description="Chart specifications: type, title, data (series or categories + values), "
+                                    "x_label, y_label, size, filename, upload.",
+                        items=types.Schema(type=types.Type.OBJECT),
+                    ),
+                    "bucket_name": types.Schema(type=types.Type.STRING),
+                    "default_upload": types.Schema(type=types.Type.BOOLEAN),
+                    "default_expires_seconds": types.Schema(type=types.Type.INTEGER),
+                    "prefix": types.Schema(type=types.Type.STRING),
+                },
+                required=["visual_spec"],
+            ),
+        )
+
+
+visualization_tool = VisualizationTool()
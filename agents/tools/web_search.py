@@ -0,0 +1,354 @@
+"""
+Shared, cached web search for the research agents.
+
+The built-in `google_search` tool is grounding done inside the model, so its
+queries cannot be seen or cached client-side. When a search backend is
+configured, `search_tool()` hands the agents a `web_search` function tool
+instead, and every query goes through one process-wide SearchService:
+
+- Queries are normalized (case, punctuation, stop words and word order are
+  ignored), so "Austin TX unemployment rate" and "unemployment rate in austin,
+  tx" share one entry.
+- Identical queries in flight at the same time, from any agent or session,
+  are sent to the backend once; the other callers wait for that result
+  (single-flight).
+- Results are cached with a TTL per query category (see classify_query and
+  DEFAULT_CATEGORY_TTLS) in memory and in a SQLite file (WEB_SEARCH_CACHE_PATH)
+  that survives restarts, so city-level queries are shared across a batch.
+
+Backends: GoogleCustomSearchBackend (Programmable Search JSON API; needs
+GOOGLE_CSE_ID and GOOGLE_CSE_API_KEY or GOOGLE_API_KEY) and FakeSearchBackend
+(canned or synthetic results for offline runs). WEB_SEARCH_BACKEND=google_cse
+or fake selects one explicitly; without either, agents keep `google_search`.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agents.tools.async_tools import offload
+from agents.tools.query_cache import QueryResultCache
+
+DEFAULT_NUM_RESULTS = 5
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv("WEB_SEARCH_TIMEOUT", "10"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("WEB_SEARCH_CACHE_SIZE", "2048"))
+DEFAULT_TTL_SECONDS = float(os.getenv("WEB_SEARCH_CACHE_TTL", str(24 * 3600)))
+DEFAULT_CACHE_PATH = os.getenv(
+    "WEB_SEARCH_CACHE_PATH", os.path.join(os.path.expanduser("~"), ".cache", "cre_analyzer", "web_search.sqlite")
+)
+
+DAY = 24 * 3600.0
+# How long a result stays usable, by what the query is about.
+DEFAULT_CATEGORY_TTLS = {
+    "news": 6 * 3600.0,
+    "regulatory": 1 * DAY,
+    "market": 1 * DAY,
+    "tax": 7 * DAY,
+    "demographics": 7 * DAY,
+}
+# Checked in order; the first category with a matching keyword wins.
+CATEGORY_KEYWORDS = [
+    ("news", ("news", "latest", "today", "announced", "breaking")),
+    ("regulatory", ("zoning", "permit", "permits", "violation", "ordinance", "lien", "liens", "lawsuit",
+                    "litigation", "foreclosure", "judgment", "flood", "fema", "environmental", "epa",
+                    "superfund", "rent control", "code enforcement", "variance", "historic")),
+    ("tax", ("tax", "taxes", "assessor", "assessed", "assessment", "millage", "parcel")),
+    ("demographics", ("population", "unemployment", "employment", "income", "census", "household",
+                      "households", "demographic", "demographics", "crime", "school", "poverty", "jobs")),
+    ("market", ("rent", "rents", "vacancy", "cap rate", "absorption", "market", "lease", "comparable",
+                "comps", "sales", "price")),
+]
+_STOP_WORDS = {"a", "an", "and", "for", "in", "of", "on", "the", "to", "what", "is", "are", "at", "by"}
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[':./-][a-z0-9]+)*")
+
+
+def normalize_query(query: str) -> str:
+    """Order- and punctuation-insensitive form of a search query."""
+    text = unicodedata.normalize("NFKC", query).lower()
+    tokens = {t for t in _TOKEN_RE.findall(text) if t not in _STOP_WORDS}
+    return " ".join(sorted(tokens))
+
+
+def classify_query(query: str) -> str:
+    """Category used to pick the cache TTL ("general" if nothing matches)."""
+    text = " " + " ".join(_TOKEN_RE.findall(query.lower())) + " "
+    for category, keywords in CATEGORY_KEYWORDS:
+        if any(f" {k} " in text for k in keywords):
+            return category
+    return "general"
+
+
+class SearchBackend:
+    """Interface for anything that can run a web search."""
+
+    name = "base"
+
+    def search(self, query: str, num_results: int = DEFAULT_NUM_RESULTS) -> List[Dict[str, Any]]:
+        """Returns [{"title", "url", "snippet", "source"}, ...]."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class GoogleCustomSearchBackend(SearchBackend):
+    """Google Programmable Search (Custom Search JSON API) over one pooled HTTP session."""
+
+    name = "google_cse"
+    ENDPOINT = "https://www.googleapis.com/customsearch/v1"
+
+    def __init__(self, api_key: Optional[str] = None, cse_id: Optional[str] = None,
+                 timeout: float = DEFAULT_TIMEOUT_SECONDS):
+        self.api_key = api_key or os.getenv("GOOGLE_CSE_API_KEY") or os.getenv("GOOGLE_API_KEY")
+        self.cse_id = cse_id or os.getenv("GOOGLE_CSE_ID")
+        if not self.api_key or not self.cse_id:
+            raise ValueError("GOOGLE_CSE_ID and GOOGLE_CSE_API_KEY (or GOOGLE_API_KEY) are required.")
+        self.timeout = timeout
+        import requests
+
+        self._session = requests.Session()
+
+    def search(self, query: str, num_results: int = DEFAULT_NUM_RESULTS) -> List[Dict[str, Any]]:
+        response = self._session.get(
+            self.ENDPOINT,
+            params={"key": self.api_key, "cx": self.cse_id, "q": query, "num": max(1, min(num_results, 10))},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return [
+            {
+                "title": item.get("title"),
+                "url": item.get("link"),
+                "snippet": item.get("snippet"),
+                "source": item.get("displayLink"),
+            }
+            for item in response.json().get("items", [])
+        ]
+
+    def close(self) -> None:
+        self._session.close()
+
+
+class FakeSearchBackend(SearchBackend):
+    """
+    Offline stand-in.
+
+    `canned` maps queries (matched after normalization) to result lists;
+    other queries get deterministic synthetic results. latency_seconds adds a
+    fixed delay per call, and `calls` counts backend round trips.
+    """
+
+    name = "fake"
+
+    def __init__(self, canned: Optional[Dict[str, List[Dict[str, Any]]]] = None, latency_seconds: float = 0.0):
+        self.canned = {normalize_query(q): results for q, results in (canned or {}).items()}
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str, latency_seconds: float = 0.0) -> "FakeSearchBackend":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), latency_seconds=latency_seconds)
+
+    def search(self, query: str, num_results: int = DEFAULT_NUM_RESULTS) -> List[Dict[str, Any]]:
+        with self._lock:
+            self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        normalized = normalize_query(query)
+        if normalized in self.canned:
+            return self.canned[normalized][:num_results]
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:10]
+        return [
+            {
+                "title": f"{query} ({i + 1})",
+                "url": f"https://example.com/{digest}/{i + 1}",
+                "snippet": f"Synthetic result {i + 1} for '{query}'.",
+                "source": "example.com",
+            }
+            for i in range(num_results)
+        ]
+
+
+class SearchResultCache(QueryResultCache):
+    """QueryResultCache keyed by normalized search query, with a TTL per query category."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        category_ttls: Optional[Dict[str, float]] = None,
+        disk_path: Optional[str] = None,
+    ):
+        super().__init__(max_entries=max_entries, ttl_seconds=ttl_seconds, ttl_overrides={}, disk_path=disk_path)
+        self.category_ttls = DEFAULT_CATEGORY_TTLS if category_ttls is None else category_ttls
+
+    @staticmethod
+    def key_for(query: str, variant: str = "") -> str:
+        return hashlib.sha256(f"{variant}|{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+    def ttl_for(self, query: str) -> float:
+        return self.category_ttls.get(classify_query(query), self.ttl_seconds)
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Returns (result, shared); shared is True if another caller's execution was reused."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+        if not leader:
+            return future.result(), True
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return future.result(), False
+
+
+class SearchService:
+    """Backend + cache + single-flight; shared by every agent's `web_search` tool."""
+
+    def __init__(self, backend: SearchBackend, cache: Optional[SearchResultCache] = None):
+        self.backend = backend
+        self.cache = cache
+        self._flight = SingleFlight()
+        self._stats_lock = threading.Lock()
+        self._stats = {"backend_calls": 0, "coalesced": 0}
+
+    def search(self, query: str, num_results: int = DEFAULT_NUM_RESULTS) -> Tuple[List[Dict[str, Any]], str]:
+        """Returns (results, origin) with origin "cache", "coalesced" or "backend"."""
+        variant = f"n={num_results}"
+        if self.cache is not None:
+            cached = self.cache.get(query, variant)
+            if cached is not None:
+                return cached, "cache"
+
+        def fetch():
+            with self._stats_lock:
+                self._stats["backend_calls"] += 1
+            results = self.backend.search(query, num_results)
+            if self.cache is not None:
+                self.cache.put(query, results, variant)
+            return results
+
+        key = SearchResultCache.key_for(query, variant)
+        results, shared = self._flight.do(key, fetch)
+        if shared:
+            with self._stats_lock:
+                self._stats["coalesced"] += 1
+        return results, "coalesced" if shared else "backend"
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+
+
+def _default_cache() -> Optional[SearchResultCache]:
+    if DEFAULT_MAX_ENTRIES <= 0:
+        return None
+    disk_path = DEFAULT_CACHE_PATH or None
+    if disk_path:
+        os.makedirs(os.path.dirname(disk_path) or ".", exist_ok=True)
+    return SearchResultCache(disk_path=disk_path)
+
+
+def _default_backend() -> Optional[SearchBackend]:
+    choice = os.getenv("WEB_SEARCH_BACKEND", "").lower()
+    if choice == "fake":
+        path = os.getenv("WEB_SEARCH_FAKE_RESULTS")
+        return FakeSearchBackend.from_file(path) if path else FakeSearchBackend()
+    if choice == "google_cse" or (not choice and os.getenv("GOOGLE_CSE_ID")):
+        return GoogleCustomSearchBackend()
+    return None
+
+
+_service: Optional[SearchService] = None
+_service_lock = threading.Lock()
+
+
+def get_search_service() -> Optional[SearchService]:
+    """Returns the process-wide search service, or None if no backend is configured."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                backend = _default_backend()
+                if backend is not None:
+                    _service = SearchService(backend, cache=_default_cache())
+    return _service
+
+
+def set_search_backend(backend: SearchBackend, cache: Optional[SearchResultCache] = None) -> SearchService:
+    """Swaps the backend used by every agent's `web_search` tool."""
+    global _service
+    with _service_lock:
+        if _service is not None:
+            _service.backend.close()
+            if _service.cache is not None and _service.cache is not cache:
+                _service.cache.close()
+        _service = SearchService(backend, cache=cache)
+    return _service
+
+
+def web_search(query: str, num_results: int = DEFAULT_NUM_RESULTS) -> str:
+    """
+    Searches the web (Google) and returns the top results.
+
+    Args:
+      query: The search query, e.g. "<city> unemployment rate" or "<property_address> zoning designation".
+      num_results: Number of results to return (at most 10).
+
+    Returns:
+      A JSON string {"query", "results": [{"title", "url", "snippet", "source"}, ...]},
+      or an error message.
+    """
+    service = get_search_service()
+    if service is None:
+        return "An error occurred while searching the web: no search backend is configured."
+    try:
+        results, origin = service.search(query, num_results)
+        print(f"[Web Search Tool] {query!r}: {len(results)} results ({origin})")
+        return json.dumps({"query": query, "results": results})
+    except Exception as e:
+        print(f"❌ [Web Search Tool] Search failed: {e}")
+        return f"An error occurred while searching the web: {e}"
+
+
+_search_tool = None
+
+
+def search_tool():
+    """The search tool for an agent: cached `web_search` when a backend is configured, else `google_search`."""
+    global _search_tool
+    from google.adk.tools import FunctionTool, google_search
+
+    if get_search_service() is None:
+        # Built-in grounding is otherwise rejected next to function tools on the same agent.
+        google_search.bypass_multi_tools_limit = True
+        return google_search
+    if _search_tool is None:
+        _search_tool = FunctionTool(func=offload(web_search))
+    return _search_tool
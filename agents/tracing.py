@@ -0,0 +1,325 @@
+"""
+Nested latency / token tracing for the agent pipeline.
+
+TracingPlugin records one span per invocation, agent (every sub-agent of
+root_agent, including the concurrent research stages), model call and
+tool call (bigquery_query, the financial calculators, the visualization tool,
+search, ...), nested by parent. Spans carry:
+
+- wall_ms, and queue_ms for tools (time spent waiting for a thread of the
+  shared tool pool) and for batch invocations (time spent in the batch queue);
+- model_turns, input_tokens and output_tokens (per model call, and summed on
+  the agent span);
+- rows (`row_count` of warehouse results) and bytes of every tool result.
+
+Finished spans are appended to a JSONL file (TRACE_PATH, default
+traces.jsonl) in the OpenTelemetry JSON span layout (traceId, spanId,
+parentSpanId, name, kind, start/endTimeUnixNano, attributes, status), and a
+summary table with the critical path is printed after every run.
+
+    App(name=..., root_agent=root_agent, plugins=[TracingPlugin()])
+    python -m agents.tracing traces.jsonl      # summarize an existing trace file
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.plugins.base_plugin import BasePlugin
+
+from agents.tools.async_tools import tool_timing
+from agents.tools.state_json import parse_json_output
+
+DEFAULT_TRACE_PATH = os.getenv("TRACE_PATH", "traces.jsonl")
+SUMMARY_COLUMNS = ["count", "wall_ms", "max_ms", "queue_ms", "model_turns", "input_tokens", "output_tokens",
+                   "rows", "bytes"]
+
+
+def _span_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class Span:
+    """One timed operation; serialized in the OpenTelemetry JSON span layout."""
+
+    def __init__(self, trace_id: str, name: str, kind: str, parent: Optional["Span"] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = trace_id
+        self.span_id = _span_id()
+        self.parent_span_id = parent.span_id if parent else None
+        self.name = name
+        self.kind = kind
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def end(self, error: Optional[BaseException] = None, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns or time.time_ns()
+        self.attributes["wall_ms"] = round((self.end_ns - self.start_ns) / 1e6, 3)
+        if error is not None:
+            self.error = repr(error)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": "ERROR", "message": self.error} if self.error else {"code": "OK"},
+        }
+
+
+def _result_size(result: Any) -> Dict[str, int]:
+    """Bytes of a tool result and, for warehouse results, the number of rows."""
+    if isinstance(result, dict) and set(result) == {"result"}:
+        result = result["result"]
+    text = result if isinstance(result, str) else json.dumps(result, default=str)
+    size = {"bytes": len(text.encode("utf-8"))}
+    parsed = parse_json_output(result) if text.lstrip().startswith("{") else None
+    if parsed and isinstance(parsed.get("row_count"), int):
+        size["rows"] = parsed["row_count"]
+    return size
+
+
+class TracingPlugin(BasePlugin):
+    """Records nested spans for agents, model calls and tools; exports JSONL and prints a summary."""
+
+    def __init__(self, path: Optional[str] = DEFAULT_TRACE_PATH, print_summary: bool = True):
+        super().__init__(name="tracing")
+        self.path = path
+        self.print_summary = print_summary
+        self._open: Dict[tuple, Span] = {}
+        self._spans: Dict[str, List[Span]] = {}
+        self._last_event_ns: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+        # Per-name totals over every run traced by this plugin (see summarize_spans).
+        self.totals: Dict[str, Dict[str, Any]] = {}
+
+    def _start(self, key: tuple, invocation_id: str, name: str, kind: str, parent_key: Optional[tuple],
+               attributes: Optional[Dict[str, Any]] = None) -> Span:
+        parent = self._open.get(parent_key) if parent_key else None
+        span = Span(invocation_id, name, kind, parent, attributes)
+        self._open[key] = span
+        self._spans.setdefault(invocation_id, []).append(span)
+        return span
+
+    def _end(self, key: tuple, error: Optional[BaseException] = None) -> Optional[Span]:
+        span = self._open.pop(key, None)
+        if span is not None:
+            span.end(error)
+        return span
+
+    # Invocation -----------------------------------------------------------
+
+    async def before_run_callback(self, *, invocation_context) -> None:
+        state = invocation_context.session.state
+        attributes = {"session_id": invocation_context.session.id, "agent": invocation_context.agent.name}
+        if state.get("enqueued_at"):
+            attributes["queue_ms"] = round((time.time() - state["enqueued_at"]) * 1000, 3)
+        if state.get("checkpoint_id"):
+            attributes["checkpoint_id"] = state["checkpoint_id"]
+        inv = invocation_context.invocation_id
+        self._start((inv,), inv, f"invocation {invocation_context.agent.name}", "invocation", None, attributes)
+        return None
+
+    async def after_run_callback(self, *, invocation_context) -> None:
+        inv = invocation_context.invocation_id
+        for key in [k for k in self._open if k[0] == inv and len(k) > 1]:
+            # Agents short-circuited by a before-callback never reach after_agent_callback;
+            # their span ends at their last event.
+            span = self._open.pop(key)
+            span.attributes["short_circuited"] = True
+            span.end(end_ns=self._last_event_ns.get((inv, key[-1])))
+        self._end((inv,))
+        for key in [k for k in self._last_event_ns if k[0] == inv]:
+            del self._last_event_ns[key]
+        spans = self._spans.pop(inv, [])
+        exported = [span.to_json() for span in spans]
+        for name, row in summarize_spans(exported).items():
+            total = self.totals.setdefault(name, {c: 0 for c in SUMMARY_COLUMNS})
+            for column in SUMMARY_COLUMNS:
+                total[column] = max(total[column], row[column]) if column == "max_ms" else total[column] + row[column]
+        if self.path:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                for span in exported:
+                    f.write(json.dumps(span, default=str) + "\n")
+        if self.print_summary and exported:
+            print(format_summary(exported))
+        return None
+
+    async def on_event_callback(self, *, invocation_context, event) -> None:
+        self._last_event_ns[(invocation_context.invocation_id, event.author)] = time.time_ns()
+        return None
+
+    # Agents ---------------------------------------------------------------
+
+    async def before_agent_callback(self, *, agent, callback_context: CallbackContext) -> None:
+        inv = callback_context.invocation_id
+        parent = getattr(agent, "parent_agent", None)
+        parent_key = (inv, "agent", parent.name) if parent is not None and (inv, "agent", parent.name) in self._open \
+            else (inv,)
+        self._start((inv, "agent", agent.name), inv, agent.name, "agent", parent_key,
+                    {"agent": agent.name, "model_turns": 0, "input_tokens": 0, "output_tokens": 0})
+        return None
+
+    async def after_agent_callback(self, *, agent, callback_context: CallbackContext) -> None:
+        self._end((callback_context.invocation_id, "agent", agent.name))
+        return None
+
+    async def on_agent_error_callback(self, *, agent, callback_context: CallbackContext, error: Exception) -> None:
+        self._end((callback_context.invocation_id, "agent", agent.name), error)
+
+    # Model calls ----------------------------------------------------------
+
+    async def before_model_callback(self, *, callback_context: CallbackContext, llm_request) -> None:
+        inv, agent = callback_context.invocation_id, callback_context.agent_name
+        self._start((inv, "model", agent), inv, f"model {llm_request.model or ''}".strip(), "model",
+                    (inv, "agent", agent), {"agent": agent, "model": llm_request.model})
+        return None
+
+    async def after_model_callback(self, *, callback_context: CallbackContext, llm_response) -> None:
+        inv, agent = callback_context.invocation_id, callback_context.agent_name
+        if getattr(llm_response, "partial", False):
+            return None
+        span = self._end((inv, "model", agent))
+        usage = llm_response.usage_metadata
+        input_tokens = (usage.prompt_token_count or 0) if usage else 0
+        output_tokens = ((usage.candidates_token_count or 0) + (usage.thoughts_token_count or 0)) if usage else 0
+        if span is not None:
+            span.attributes.update({"model_turns": 1, "input_tokens": input_tokens, "output_tokens": output_tokens})
+        agent_span = self._open.get((inv, "agent", agent))
+        if agent_span is not None:
+            agent_span.attributes["model_turns"] += 1
+            agent_span.attributes["input_tokens"] += input_tokens
+            agent_span.attributes["output_tokens"] += output_tokens
+        return None
+
+    async def on_model_error_callback(self, *, callback_context: CallbackContext, llm_request, error: Exception):
+        self._end((callback_context.invocation_id, "model", callback_context.agent_name), error)
+        return None
+
+    # Tools ----------------------------------------------------------------
+
+    @staticmethod
+    def _tool_key(tool, tool_context) -> tuple:
+        return (tool_context.invocation_id, "tool", tool_context.function_call_id or f"{tool_context.agent_name}:{tool.name}")
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context) -> None:
+        inv, agent = tool_context.invocation_id, tool_context.agent_name
+        span = self._start(self._tool_key(tool, tool_context), inv, f"tool {tool.name}", "tool",
+                           (inv, "agent", agent), {"agent": agent, "tool": tool.name})
+        # run_blocking fills in queue_ms when the tool is offloaded to the pool.
+        tool_timing.set(span.attributes)
+        return None
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result) -> None:
+        span = self._end(self._tool_key(tool, tool_context))
+        if span is not None:
+            span.attributes.update(_result_size(result))
+        tool_timing.set(None)
+        return None
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error: Exception) -> None:
+        self._end(self._tool_key(tool, tool_context), error)
+        tool_timing.set(None)
+        return None
+
+
+def summarize_spans(spans: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-span-name totals (count, wall/queue time, model turns, tokens, rows, bytes)."""
+    rows: Dict[str, Dict[str, Any]] = {}
+    for span in spans:
+        if span["kind"] == "model":
+            # Model calls are already summed on their agent span.
+            continue
+        attrs = span["attributes"]
+        row = rows.setdefault(span["name"], {c: 0 for c in SUMMARY_COLUMNS})
+        row["count"] += 1
+        row["max_ms"] = max(row["max_ms"], attrs.get("wall_ms", 0))
+        for column in ("wall_ms", "queue_ms", "model_turns", "input_tokens", "output_tokens", "rows", "bytes"):
+            row[column] += attrs.get(column, 0) or 0
+    return rows
+
+
+def critical_path(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Chain of spans that determined the end-to-end time of each trace.
+
+    Walking back from a span's end, the child that finished last is on the
+    path, then the child that finished last before that one started, and so on;
+    this keeps every stage of a sequential agent and only the slowest branch of
+    a parallel one.
+    """
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for span in spans:
+        if span["kind"] != "model" and span["endTimeUnixNano"] is not None:
+            children.setdefault(span["parentSpanId"], []).append(span)
+    path: List[Dict[str, Any]] = []
+
+    def walk(span: Dict[str, Any], depth: int) -> None:
+        path.append({"name": span["name"], "kind": span["kind"], "depth": depth,
+                     "wall_ms": span["attributes"].get("wall_ms")})
+        chain = []
+        cursor = span["endTimeUnixNano"]
+        candidates = sorted(children.get(span["spanId"], []), key=lambda s: s["endTimeUnixNano"], reverse=True)
+        for child in candidates:
+            if child["endTimeUnixNano"] <= cursor:
+                chain.append(child)
+                cursor = child["startTimeUnixNano"]
+        for child in reversed(chain):
+            walk(child, depth + 1)
+
+    for root in children.get(None, []):
+        walk(root, 0)
+    return path
+
+
+def format_summary(spans: List[Dict[str, Any]]) -> str:
+    """Summary table plus critical path as printable text."""
+    rows = summarize_spans(spans)
+    name_width = max([len(n) for n in rows] + [4]) + 2
+    lines = ["name".ljust(name_width) + "".join(c.rjust(14) for c in SUMMARY_COLUMNS)]
+    for name, row in sorted(rows.items(), key=lambda item: -item[1]["wall_ms"]):
+        lines.append(name.ljust(name_width) + "".join(
+            (f"{row[c]:.1f}" if isinstance(row[c], float) else str(row[c])).rjust(14) for c in SUMMARY_COLUMNS))
+    lines.append("")
+    lines.append("critical path:")
+    for step in critical_path(spans):
+        lines.append(f"{'  ' * step['depth']}{step['name']} ({step['wall_ms']} ms)")
+    return "\n".join(lines)
+
+
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a trace file written by TracingPlugin.")
+    parser.add_argument("path", nargs="?", default=DEFAULT_TRACE_PATH)
+    parser.add_argument("--trace-id", help="only this trace (invocation id)")
+    parser.add_argument("--json", action="store_true", help="print per-name totals as JSON")
+    args = parser.parse_args()
+
+    spans = load_spans(args.path)
+    if args.trace_id:
+        spans = [s for s in spans if s["traceId"] == args.trace_id]
+    if args.json:
+        print(json.dumps(summarize_spans(spans), indent=2))
+    else:
+        print(format_summary(spans))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Event-loop lag and overlap of concurrent sub-agent tool calls, blocking vs. offloaded.
+
+Each simulated sub-agent makes --calls `bigquery_query` calls against a local
+SQLite stand-in with --latency seconds per query. With the blocking tool the
+calls serialize on the event loop; with `bigquery_query_async` they overlap.
+
+    python -m benchmarks.bench_event_loop_lag --agents 5 --calls 3 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from agents.tools.async_tools import EventLoopLagMonitor
+from agents.tools.bigquery_executor import SQLiteBackend, bigquery_query, bigquery_query_async, set_backend
+
+TABLE = "bench.dataset.loans"
+
+
+async def run_agents(n_agents: int, calls: int, offloaded: bool):
+    async def sub_agent(agent_index: int) -> float:
+        busy = 0.0
+        for call in range(calls):
+            query = f"SELECT * FROM `{TABLE}` WHERE id = {agent_index * calls + call}"
+            start = time.perf_counter()
+            if offloaded:
+                await bigquery_query_async(query)
+            else:
+                bigquery_query(query)
+            busy += time.perf_counter() - start
+            # Stands in for the model turn between tool calls.
+            await asyncio.sleep(0)
+        return busy
+
+    start = time.perf_counter()
+    async with EventLoopLagMonitor() as lag:
+        busy = await asyncio.gather(*(sub_agent(i) for i in range(n_agents)))
+    wall = time.perf_counter() - start
+    return {
+        "wall_seconds": round(wall, 3),
+        "tool_seconds": round(sum(busy), 3),
+        # 1.0 means the sub-agents ran one after another; n_agents means full overlap.
+        "overlap": round(sum(busy) / wall, 2),
+        "event_loop_lag": lag.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--agents", type=int, default=5)
+    parser.add_argument("--calls", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    backend = SQLiteBackend(latency_seconds=args.latency)
+    backend.load_table(TABLE, [{"id": i, "amount": 1000.0 * i} for i in range(args.agents * args.calls)])
+    # No cache, so every call pays the query latency.
+    set_backend(backend, cache=None)
+    print(json.dumps({
+        "benchmark": "event_loop_lag",
+        "agents": args.agents,
+        "calls_per_agent": args.calls,
+        "query_latency_seconds": args.latency,
+        "blocking": asyncio.run(run_agents(args.agents, args.calls, offloaded=False)),
+        "offloaded": asyncio.run(run_agents(args.agents, args.calls, offloaded=True)),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
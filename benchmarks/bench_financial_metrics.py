@@ -0,0 +1,80 @@
+"""Throughput of the batch financial metrics API against the scalar calculators.
+
+    python -m benchmarks.bench_financial_metrics --loans 100000
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from agents.subagents.financial_metrics_agent import tools
+from agents.subagents.financial_metrics_agent.batch import calculate_metrics_batch
+
+
+def make_portfolio(n: int, seed: int = 7, missing_rate: float = 0.02):
+    rng = np.random.default_rng(seed)
+    price = rng.uniform(1e6, 5e7, n)
+    portfolio = {
+        "gross_rental_income": price * rng.uniform(0.06, 0.12, n),
+        "operating_expenses": price * rng.uniform(0.02, 0.05, n),
+        "annual_debt_service": price * rng.uniform(0.03, 0.07, n),
+        "loan_amount": price * rng.uniform(0.5, 0.85, n),
+        "purchase_price": price,
+    }
+    for values in portfolio.values():
+        values[rng.random(n) < missing_rate] = np.nan
+    portfolio["annual_debt_service"][rng.random(n) < missing_rate] = 0.0
+    return portfolio
+
+
+def run_scalar(portfolio) -> int:
+    errors = 0
+    rows = zip(*(portfolio[c].tolist() for c in portfolio))
+    for gri, opex, debt_service, loan, price in rows:
+        gri, opex, debt_service, loan, price = (None if v != v else v for v in (gri, opex, debt_service, loan, price))
+        for calc in (
+            lambda: tools.calculate_noi(gri, opex),
+            lambda: tools.calculate_dscr(tools.calculate_noi(gri, opex), debt_service),
+            lambda: tools.calculate_ltv(loan, price),
+            lambda: tools.calculate_cap_rate(tools.calculate_noi(gri, opex), price),
+        ):
+            try:
+                calc()
+            except ValueError:
+                errors += 1
+    return errors
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--loans", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    portfolio = make_portfolio(args.loans)
+    scalar_s = timed(lambda: run_scalar(portfolio), args.repeat)
+    batch_s = timed(lambda: calculate_metrics_batch(**portfolio), args.repeat)
+    print(json.dumps({
+        "benchmark": "financial_metrics",
+        "loans": args.loans,
+        "scalar_seconds": round(scalar_s, 4),
+        "batch_seconds": round(batch_s, 4),
+        "scalar_loans_per_sec": round(args.loans / scalar_s),
+        "batch_loans_per_sec": round(args.loans / batch_s),
+        "speedup": round(scalar_s / batch_s, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Cold-start cost: import time of the `agents` package and time to build the agent graph.
+
+Each target runs --repeat times in a fresh interpreter with `-X importtime`.
+The report gives the median wall time per target and, from the slowest
+target, the modules with the most self import time and the totals per
+top-level package (google, numpy, agents, ...).
+
+    python -m benchmarks.bench_import_time --output benchmarks/results.jsonl
+"""
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.results import append_record, make_record
+
+# Code run in the child interpreter; it prints its own wall time in milliseconds.
+TARGETS = {
+    "import_agents": "import agents",
+    "import_batch_runner": "import agents.batch_runner",
+    "build_root_agent": "import agents.agent\nagents.agent.root_agent",
+}
+_TIMER = "import time as _t\n_s = _t.perf_counter()\n{code}\nprint((_t.perf_counter() - _s) * 1000)\n"
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s+(\s*)(\S+)$")
+
+
+def run_once(code: str) -> Tuple[float, List[Tuple[str, int, int]]]:
+    """(wall ms, [(module, self us, cumulative us), ...]) for one fresh interpreter."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", _TIMER.format(code=code)],
+                          capture_output=True, text=True, check=True)
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            modules.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return float(proc.stdout.strip().splitlines()[-1]), modules
+
+
+def report(modules: List[Tuple[str, int, int]], top: int) -> Dict[str, Any]:
+    packages: Dict[str, int] = {}
+    for name, self_us, _ in modules:
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0) + self_us
+    slowest = sorted(modules, key=lambda m: m[1], reverse=True)[:top]
+    return {
+        "modules_imported": len(modules),
+        "top_self_ms": [{"module": n, "self_ms": round(s / 1000, 2), "cumulative_ms": round(c / 1000, 2)}
+                        for n, s, c in slowest],
+        "packages_ms": {k: round(v / 1000, 2) for k, v in sorted(packages.items(), key=lambda i: -i[1])[:top]},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="modules/packages to list")
+    parser.add_argument("--output", help="JSONL file to append the results to")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {}
+    for name, code in TARGETS.items():
+        runs = [run_once(code) for _ in range(args.repeat)]
+        walls = [wall for wall, _ in runs]
+        results[name] = {
+            "wall_ms_median": round(statistics.median(walls), 2),
+            "wall_ms_min": round(min(walls), 2),
+            **report(runs[-1][1], args.top),
+        }
+    record = make_record("import_time", {"repeat": args.repeat, "python": sys.version.split()[0]}, results)
+    print(json.dumps(record, indent=2))
+    if args.output:
+        append_record(args.output, record)
+
+
+if __name__ == "__main__":
+    main()
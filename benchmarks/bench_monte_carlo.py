@@ -0,0 +1,84 @@
+"""Monte Carlo credit simulation throughput (paths/sec) versus process-pool size.
+
+    python -m benchmarks.bench_monte_carlo --loans 32 --paths 100000
+
+`consistent_with_stress_test` checks that every loan's base DSCR matches the
+stress grid's; every third loan states an interest-only annual debt service.
+"""
+
+import argparse
+import json
+import os
+import time
+
+from agents.subagents.risk_analysis_agent.monte_carlo import simulate_portfolio
+from agents.subagents.risk_analysis_agent.stress_test import run_stress_grid
+
+
+def make_loans(n: int):
+    return [
+        {
+            "gross_rental_income": 1_000_000 + 10_000 * i,
+            "operating_expenses": 400_000,
+            "loan_amount": 5_000_000,
+            "interest_rate_pct": 6.0 + (i % 5) * 0.25,
+            "floating_rate": bool(i % 2),
+            **({"annual_debt_service_amount": 5_000_000 * (0.06 + (i % 5) * 0.0025)} if i % 3 == 0 else {}),
+        }
+        for i in range(n)
+    ]
+
+
+def consistent_with_stress_test(loans, summaries) -> bool:
+    """Base DSCR of each simulated loan equals the stress-test base DSCR."""
+    for loan, summary in zip(loans, summaries):
+        stress = run_stress_grid(
+            gross_rental_income=loan["gross_rental_income"],
+            operating_expenses=loan["operating_expenses"],
+            loan_amount=loan["loan_amount"],
+            interest_rate_pct=loan["interest_rate_pct"],
+            annual_debt_service_amount=loan.get("annual_debt_service_amount"),
+        )
+        # base_dscr is rounded to 3 places here and to 2 in the stress grid.
+        if abs(summary["base_dscr"] - stress["base"]["dscr"]) > 0.006:
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--loans", type=int, default=32)
+    parser.add_argument("--paths", type=int, default=100_000)
+    parser.add_argument("--hold-years", type=int, default=5)
+    parser.add_argument("--workers", type=int, nargs="*", help="pool sizes to test (default: 1, 2, 4, ... cpu_count)")
+    args = parser.parse_args()
+
+    cpu_count = os.cpu_count() or 1
+    workers = args.workers or sorted({1, cpu_count} | {2 ** k for k in range(1, cpu_count.bit_length()) if 2 ** k <= cpu_count})
+    loans = make_loans(args.loans)
+    reference = None
+    results = []
+    for count in workers:
+        start = time.perf_counter()
+        summaries = simulate_portfolio(loans, n_paths=args.paths, hold_years=args.hold_years, max_workers=count)
+        elapsed = time.perf_counter() - start
+        reference = reference or summaries
+        results.append({
+            "workers": count,
+            "seconds": round(elapsed, 3),
+            "paths_per_sec": round(args.loans * args.paths / elapsed),
+            "reproducible": summaries == reference,
+        })
+    print(json.dumps({
+        "benchmark": "monte_carlo",
+        "loans": args.loans,
+        "paths_per_loan": args.paths,
+        "hold_years": args.hold_years,
+        "cpu_count": cpu_count,
+        "consistent_with_stress_test": consistent_with_stress_test(loans, reference),
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""End-to-end pipeline benchmark, fully offline.
+
+Runs the real root_agent (orchestrator, research agents, risk, memo)
+with the stand-ins from benchmarks/offline_harness.py: a scripted model, an
+in-memory SQLite warehouse and canned search, each with injected latency.
+It measures:
+
+- framework overhead: wall time per loan with zero injected latency, minus
+  the tool time on the loan's critical path;
+- stage overlap: summed stage time divided by the root agent's wall time
+  (1.0 = serial), and the scheduler's critical paths and the wall time saved
+  over a barrier between dependency levels (see agents/scheduler.py);
+- tool latency: per-tool p50/p95 wall time and thread-pool queue time;
+- memory per session: traced Python memory retained per finished session,
+  and peak memory per concurrent session;
+- throughput: loans/min, latency percentiles and the model tier that served
+  each stage at each --levels concurrency, through agents.batch_runner
+  (with --latency-budget, stages downgrade tiers as in production; with
+  --decline-share, that share of loans is declined by the policy gate).
+
+The results are printed as JSON. --output appends them, with the git commit,
+to a JSONL file so that runs can be compared across commits:
+
+    python -m benchmarks.bench_pipeline --levels 1,10,100 --output benchmarks/results.jsonl
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.offline_harness import OfflineConfig, install, make_loans, reset
+from benchmarks.results import append_record, make_record
+
+
+def _write_requests(path: str, loans) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for loan_id, message in loans:
+            f.write(json.dumps({"loan_id": loan_id, "request": message}) + "\n")
+
+
+def _percentiles(values: List[float]) -> Dict[str, Any]:
+    if not values:
+        return {"count": 0}
+    p50, p95 = np.percentile(values, [50, 95])
+    return {"count": len(values), "mean": round(float(np.mean(values)), 3),
+            "p50": round(float(p50), 3), "p95": round(float(p95), 3)}
+
+
+async def _batch(root_agent, loans, concurrency: int, trace: bool,
+                 latency_budget: Optional[float] = None) -> Dict[str, Any]:
+    from agents.batch_runner import run_batch
+    from agents.tracing import load_spans
+
+    with tempfile.TemporaryDirectory() as tmp:
+        requests, output, trace_path = (os.path.join(tmp, name) for name in ("in.jsonl", "out.jsonl", "trace.jsonl"))
+        _write_requests(requests, loans)
+        # Tools and callbacks print progress; keep the JSON output readable.
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary = await run_batch(requests, output, concurrency=concurrency, agent=root_agent, resume=False,
+                                      retries=0, trace_path=trace_path if trace else None,
+                                      latency_budget=latency_budget)
+        summary.pop("trace", None)
+        if trace:
+            summary["spans"] = load_spans(trace_path)
+    return summary
+
+
+def _by_trace(spans: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    traces: Dict[str, List[Dict[str, Any]]] = {}
+    for span in spans:
+        traces.setdefault(span["traceId"], []).append(span)
+    return traces
+
+
+def framework_overhead(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    from agents.tracing import critical_path
+
+    per_loan, model_turns = [], []
+    for trace in _by_trace(spans).values():
+        root = next(s for s in trace if s["kind"] == "invocation")
+        tool_ms = sum(step["wall_ms"] or 0 for step in critical_path(trace) if step["kind"] == "tool")
+        per_loan.append(root["attributes"]["wall_ms"] - tool_ms)
+        model_turns.append(sum(1 for s in trace if s["kind"] == "model"))
+    return {
+        "framework_ms_per_loan": _percentiles(per_loan),
+        "model_turns_per_loan": float(np.mean(model_turns)) if model_turns else 0,
+        "framework_ms_per_model_turn": round(float(np.mean(per_loan) / max(1, np.mean(model_turns))), 3)
+        if per_loan else None,
+    }
+
+
+def stage_overlap(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    overlaps, stages = [], []
+    for trace in _by_trace(spans).values():
+        invocation = next(s for s in trace if s["kind"] == "invocation")
+        root = next((s for s in trace if s["parentSpanId"] == invocation["spanId"] and s["kind"] == "agent"), None)
+        if root is None:
+            continue
+        children = [s for s in trace if s["parentSpanId"] == root["spanId"] and s["kind"] == "agent"]
+        busy = sum(s["attributes"].get("wall_ms", 0) for s in children)
+        overlaps.append(busy / max(root["attributes"]["wall_ms"], 1e-9))
+        stages.append(len(children))
+    return {"overlap": _percentiles(overlaps), "stages": max(stages) if stages else 0}
+
+
+def tool_latency(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    tools: Dict[str, Dict[str, List[float]]] = {}
+    for span in spans:
+        if span["kind"] != "tool":
+            continue
+        entry = tools.setdefault(span["attributes"]["tool"], {"wall_ms": [], "queue_ms": []})
+        entry["wall_ms"].append(span["attributes"].get("wall_ms", 0))
+        if "queue_ms" in span["attributes"]:
+            entry["queue_ms"].append(span["attributes"]["queue_ms"])
+    return {name: {"wall_ms": _percentiles(v["wall_ms"]), "queue_ms": _percentiles(v["queue_ms"])}
+            for name, v in sorted(tools.items())}
+
+
+async def session_memory(root_agent, loans) -> Dict[str, Any]:
+    """Traced memory retained by finished sessions (kept in the session service) and peak while running."""
+    from google.adk.apps import App
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+
+    runner = Runner(app=App(name="bench_memory", root_agent=root_agent), session_service=InMemorySessionService())
+
+    async def run(loan_id: str, message: str):
+        await runner.session_service.create_session(app_name=runner.app_name, user_id="bench", session_id=loan_id)
+        content = types.Content(role="user", parts=[types.Part(text=message)])
+        async for _ in runner.run_async(user_id="bench", session_id=loan_id, new_message=content):
+            pass
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        # One warm-up loan so lazily built indexes are not counted per session.
+        await run("warmup", loans[0][1])
+        gc.collect()
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        await asyncio.gather(*(run(loan_id, message) for loan_id, message in loans[1:]))
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    await runner.close()
+    sessions = max(1, len(loans) - 1)
+    return {
+        "sessions": sessions,
+        "retained_kb_per_session": round((current - baseline) / sessions / 1024, 1),
+        "peak_kb_per_concurrent_session": round((peak - baseline) / sessions / 1024, 1),
+    }
+
+
+async def run_benchmark(config: OfflineConfig, levels: List[int], loans: int, free_text: bool,
+                        latency_budget: Optional[float] = None, decline_share: float = 0.0) -> Dict[str, Any]:
+    zero = OfflineConfig(report_chars=config.report_chars, comparables_per_city=config.comparables_per_city)
+    cities = max(levels) * 2 + loans * 3 + 10
+    root_agent = install(zero, cities=cities)
+    results: Dict[str, Any] = {}
+
+    batch = await _batch(root_agent, make_loans(loans, free_text), 1, trace=True)
+    results["framework_overhead"] = framework_overhead(batch["spans"])
+
+    reset(root_agent, config, cities=cities)
+    batch = await _batch(root_agent, make_loans(loans, free_text, start=loans), 1, trace=True)
+    results["stage_overlap"] = stage_overlap(batch["spans"])
+    results["schedule"] = batch["schedule"]
+    results["tool_latency"] = tool_latency(batch["spans"])
+
+    reset(root_agent, config, cities=cities)
+    results["memory"] = await session_memory(root_agent, make_loans(loans + 1, free_text, start=2 * loans))
+
+    results["throughput"] = {}
+    for concurrency in levels:
+        reset(root_agent, config, cities=cities)
+        summary = await _batch(root_agent, make_loans(max(10, 2 * concurrency), free_text, start=3 * loans,
+                                                          decline_share=decline_share), concurrency,
+                               trace=False, latency_budget=latency_budget)
+        results["throughput"][str(concurrency)] = summary
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,10,100", help="comma-separated concurrency levels")
+    parser.add_argument("--loans", type=int, default=10, help="loans for the overhead/overlap/memory phases")
+    parser.add_argument("--model-latency", type=float, default=0.05, help="seconds per model turn")
+    parser.add_argument("--sql-latency", type=float, default=0.02, help="seconds per warehouse query")
+    parser.add_argument("--search-latency", type=float, default=0.05, help="seconds per search")
+    parser.add_argument("--report-chars", type=int, default=2000, help="length of each agent's report")
+    parser.add_argument("--free-text", action="store_true", help="free-text requests (orchestrator model runs)")
+    parser.add_argument("--latency-budget", type=float, default=None,
+                        help="per-loan latency budget (seconds) for the throughput runs; enables tier downgrades")
+    parser.add_argument("--decline-share", type=float, default=0.0,
+                        help="share of throughput-run loans that fail the policy gate (early decline)")
+    parser.add_argument("--output", help="JSONL file to append the results to")
+    args = parser.parse_args()
+
+    config = OfflineConfig(model_latency=args.model_latency, sql_latency=args.sql_latency,
+                           search_latency=args.search_latency, report_chars=args.report_chars)
+    levels = [int(level) for level in args.levels.split(",") if level.strip()]
+    start = time.perf_counter()
+    results = asyncio.run(run_benchmark(config, levels, args.loans, args.free_text, args.latency_budget,
+                                        args.decline_share))
+    record = make_record("pipeline", {**asdict(config), "levels": levels, "loans": args.loans,
+                                      "free_text": args.free_text, "latency_budget": args.latency_budget,
+                                      "decline_share": args.decline_share}, results)
+    record["benchmark_seconds"] = round(time.perf_counter() - start, 1)
+    print(json.dumps(record, indent=2))
+    if args.output:
+        append_record(args.output, record)
+
+
+if __name__ == "__main__":
+    main()
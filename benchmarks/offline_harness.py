@@ -0,0 +1,351 @@
+"""Offline stand-ins for running the full root_agent pipeline without network access.
+
+- `ScriptedModel` replaces every LlmAgent's model. Each agent follows a fixed
+  script of tool calls (one list of calls per model turn, so one turn can
+  call several tools), then answers with a deterministic report. Every turn
+  sleeps for `model_latency` times the factor of the tier whose model the
+  request names (see agents/model_routing.py), and token usage is estimated at four
+  characters per token so tracing reports realistic counts.
+- `seed_warehouse` loads synthetic `commercial_real_estate` and FY2025/FY2026
+  SAFMR tables into a `SQLiteBackend` under their BigQuery names, so
+  `bigquery_query`, `analyze_comparables`, `resolve_location` and
+  `lookup_market_rents` run unchanged.
+- Search goes through `FakeSearchBackend`, and the checkpoint, demographic and
+  regulatory-evidence stores are in-memory.
+
+Agents choose their search tool when `agents` is imported, so this module
+selects the fake search backend through WEB_SEARCH_BACKEND before importing
+anything from `agents`; import it first. `install()` returns root_agent with
+the scripted models in place:
+
+    from benchmarks.offline_harness import OfflineConfig, install, make_loans
+    root_agent = install(OfflineConfig(model_latency=0.05, sql_latency=0.02))
+"""
+
+import asyncio
+import json
+import os
+import random
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Tuple
+
+os.environ.setdefault("WEB_SEARCH_BACKEND", "fake")
+os.environ.setdefault("WEB_SEARCH_CACHE_PATH", "")
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from agents.intake import build_analysis_prompts, parse_structured_request
+from agents.model_routing import TIER_MODELS, model_for
+
+# Same names as the agents' prompt modules; importing those would import the agents too early.
+PROPERTY_TABLE = "ccibt-hack25ww7-710.uc1Loan.commercial_real_estate"
+SAFMR_TABLES = {
+    "fy2025": "ccibt-hack25ww7-710.uc1Loan.fy2025_safmrs_revised",
+    "fy2026": "ccibt-hack25ww7-710.uc1Loan.fy2026_safmrs",
+}
+BEDROOM_TYPES = ["0br", "1br", "2br", "3br", "4br"]
+CHARS_PER_TOKEN = 4
+STATE = "TX"
+
+
+@dataclass
+class OfflineConfig:
+    """Injected latencies (seconds) and sizes of the offline stand-ins."""
+
+    model_latency: float = 0.0
+    # Relative latency of each model tier.
+    tier_latency_factors: Dict[str, float] = field(default_factory=lambda: {"large": 1.0, "medium": 0.5, "small": 0.3})
+    sql_latency: float = 0.0
+    search_latency: float = 0.0
+    report_chars: int = 2000
+    comparables_per_city: int = 20
+
+
+# Message text -> parsed loan fields, for loans whose text the intake parser rejects (free text).
+LOAN_FIELDS: Dict[str, Dict[str, Any]] = {}
+
+
+def _city(index: int) -> str:
+    return f"Benchville {index}"
+
+
+def _zip(index: int) -> str:
+    return f"7{index % 10000:04d}"
+
+
+def make_loans(count: int, free_text: bool = False, start: int = 0,
+               decline_share: float = 0.0) -> List[Tuple[str, str]]:
+    """(loan_id, message) pairs, one city per loan so no store answers from an earlier loan.
+
+    Intake-form messages take the deterministic orchestrator path; with
+    free_text=True they are prose, so the orchestrator model runs. An evenly
+    spread `decline_share` of the loans ask for 98% LTV and fail the policy
+    gate (agents/policy_gate.py).
+    """
+    rng = random.Random(start)
+    loans = []
+    for i in range(start, start + count):
+        income = rng.randrange(600, 1600) * 1000
+        fields = {
+            "property_address": f"{100 + i} Market St, {_city(i)}, {STATE} {_zip(i)}",
+            "property_type": rng.choice(["Multifamily", "Office", "Retail", "Industrial"]),
+            "gross_rental_income": float(income),
+            "operating_expenses": float(round(income * rng.uniform(0.3, 0.45), -3)),
+            "purchase_price": float(income * 10),
+            "loan_amount": float(income * (9.8 if int((i + 1) * decline_share) > int(i * decline_share) else 7)),
+            "annual_debt_service": None,
+            "interest_rate": 6.5,
+            "amortization_years": 30,
+        }
+        if free_text:
+            message = (
+                f"We are looking at a {fields['property_type'].lower()} asset at {fields['property_address']}. "
+                f"The sponsor wants ${fields['loan_amount']:,.0f} against a ${fields['purchase_price']:,.0f} purchase; "
+                f"gross rents are ${fields['gross_rental_income']:,.0f} with ${fields['operating_expenses']:,.0f} "
+                f"of expenses, 6.5% over 30 years. Please underwrite it."
+            )
+        else:
+            message = "\n".join([
+                f"Property Address: {fields['property_address']}",
+                f"Property Type: {fields['property_type']}",
+                f"Gross Rental Income: ${fields['gross_rental_income']:,.0f}",
+                f"Operating Expenses: ${fields['operating_expenses']:,.0f}",
+                f"Purchase Price: ${fields['purchase_price']:,.0f}",
+                f"Loan Amount: ${fields['loan_amount']:,.0f}",
+                "Interest Rate: 6.5%",
+                "Amortization: 30 years",
+            ])
+        LOAN_FIELDS[message] = fields
+        loans.append((f"loan-{i:05d}", message))
+    return loans
+
+
+def seed_warehouse(backend, cities: int, config: OfflineConfig) -> None:
+    """Synthetic property and SAFMR rows for the first `cities` loan cities."""
+    rng = random.Random(0)
+    properties = []
+    for i in range(cities):
+        properties.append({"title": f"{100 + i} Market St", "address": f"{100 + i} Market St, {_city(i)}, {STATE} {_zip(i)}",
+                           "price": rng.randrange(2, 20) * 1_000_000, "area": rng.randrange(800, 9000)})
+        for j in range(config.comparables_per_city - 1):
+            properties.append({"title": f"Comparable {j} {_city(i)}", "address": f"{j + 1} Oak Ave, {_city(i)}, {STATE}",
+                               "price": rng.randrange(1, 20) * 1_000_000, "area": rng.randrange(500, 9000) or None})
+    backend.load_table(PROPERTY_TABLE, properties)
+    for year, table in SAFMR_TABLES.items():
+        growth = 1.0 if year == "fy2025" else 1.04
+        rows = []
+        for i in range(cities):
+            row = {"zip_code": _zip(i), "hud_area_code": f"METRO{i:05d}M{i:05d}",
+                   "hud_fair_market_rent_area_name": f"{_city(i)}, {STATE} HUD Metro FMR Area"}
+            for k, br in enumerate(BEDROOM_TYPES):
+                base = (900 + 250 * k) * growth
+                row[f"safmr_{br}"] = round(base)
+                row[f"safmr_{br}_payment_standard_90"] = round(base * 0.9)
+                row[f"safmr_{br}_payment_standard_110"] = round(base * 1.1)
+            rows.append(row)
+        backend.load_table(table, rows)
+
+
+# --- Scripts -----------------------------------------------------------------
+
+Call = Tuple[str, Callable[[Dict[str, Any]], Dict[str, Any]]]
+
+
+def _city_of(fields: Dict[str, Any]) -> str:
+    parts = [p.strip() for p in fields["property_address"].split(",")]
+    return f"{parts[1]}, {STATE}" if len(parts) > 1 else parts[0]
+
+
+def _zip_of(fields: Dict[str, Any]) -> str:
+    return fields["property_address"].rsplit(" ", 1)[-1]
+
+
+def _loan_args(fields: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "gross_rental_income": fields["gross_rental_income"],
+        "operating_expenses": fields["operating_expenses"],
+        "loan_amount": fields["loan_amount"],
+        "interest_rate_pct": fields["interest_rate"],
+        "amortization_years": fields["amortization_years"],
+    }
+
+
+def _search(query: Callable[[Dict[str, Any]], str]) -> Call:
+    return ("web_search", lambda f: {"query": query(f)})
+
+
+# Agent name -> tool-call turns. Tools an agent does not have are skipped.
+SCRIPTS: Dict[str, List[List[Call]]] = {
+    "property_agent": [
+        [("resolve_location", lambda f: {"query": f["property_address"]})],
+        [("analyze_comparables", lambda f: {"location": _city_of(f).split(",")[0]}),
+         ("bigquery_query", lambda f: {"query": f"SELECT * FROM `{PROPERTY_TABLE}` "
+                                                f"WHERE address = '{f['property_address']}'"})],
+        [_search(lambda f: f"{_city_of(f)} commercial price per square meter")],
+    ],
+    "MarketAnalysisAgent": [
+        [("lookup_market_rents", lambda f: {"location": _zip_of(f)})],
+        [("bigquery_query", lambda f: {"query": f"SELECT * FROM `{SAFMR_TABLES['fy2026']}` "
+                                                f"WHERE zip_code = '{_zip_of(f)}'"})],
+        [_search(lambda f: f"{_city_of(f)} {f['property_type']} market trends 2025")],
+    ],
+    "property_regulatory_analyst_agent": [
+        [("load_regulatory_evidence", lambda f: {"property_address": f["property_address"]})],
+        [("search_regulatory_sources", lambda f: {
+            "property_address": f["property_address"],
+            "focus_areas": ["zoning", "permits_violations", "title_liens", "assessor_tax"]})],
+        [("record_regulatory_evidence", lambda f: {"property_address": f["property_address"], "evidence": [
+            {"focus_area": area, "query": f"{f['property_address']} {area}", "url": f"https://example.gov/{area}",
+             "title": area, "source": "example.gov", "date_published": "2025-01-01", "snippet": "..."}
+            for area in ("zoning", "permits_violations", "title_liens", "assessor_tax")
+        ]})],
+    ],
+    "financial_metrics_agent": [
+        [("compute_underwriting_metrics", lambda f: {
+            "gross_rental_income": f["gross_rental_income"], "operating_expenses": f["operating_expenses"],
+            "loan_amount": f["loan_amount"], "purchase_price": f["purchase_price"],
+            "annual_debt_service": f["annual_debt_service"] or f["loan_amount"] * 0.076})],
+    ],
+    "demographic_details_agent": [
+        [_search(lambda f: f"{_city_of(f)} population growth rate"),
+         _search(lambda f: f"{_city_of(f)} median household income"),
+         _search(lambda f: f"{_city_of(f)} unemployment rate"),
+         _search(lambda f: f"{_city_of(f)} major employers")],
+    ],
+    "risk_analysis_agent": [
+        [("run_stress_test", lambda f: {**_loan_args(f), "purchase_price": f["purchase_price"]}),
+         ("simulate_credit_risk", lambda f: {**_loan_args(f), "location": _zip_of(f)})],
+    ],
+}
+
+
+def _final_text(agent_name: str, fields: Dict[str, Any], config: OfflineConfig) -> str:
+    if agent_name == "PromptOrchestratorAgent":
+        return json.dumps(build_analysis_prompts(fields))
+    if agent_name == "demographic_details_agent":
+        source = "https://example.gov/census"
+        return json.dumps({"demographic_data": {
+            "jurisdiction": _city_of(fields),
+            "population": {"value": 250000, "source": source},
+            "population_growth_rate": {"value": 1.4, "source": source},
+            "median_household_income": {"value": 68000, "source": source},
+            "unemployment_rate": {"value": 3.9, "source": source},
+            "major_employers": {"value": ["Benchville Health", "Benchville ISD"], "source": source},
+        }})
+    header = f"{agent_name} report for {fields['property_address']}.\n"
+    filler = "Offline benchmark narrative sentence. "
+    return header + filler * max(0, (config.report_chars - len(header)) // len(filler))
+
+
+def _loan_fields(llm_request) -> Dict[str, Any]:
+    for content in llm_request.contents:
+        if content.role != "user":
+            continue
+        for part in content.parts or []:
+            if part.text and part.text in LOAN_FIELDS:
+                return LOAN_FIELDS[part.text]
+            if part.text:
+                fields = parse_structured_request(part.text)
+                if fields:
+                    return fields
+    raise ValueError("ScriptedModel: no loan request in the conversation")
+
+
+def _request_chars(llm_request) -> int:
+    chars = len(str(llm_request.config.system_instruction or "")) if llm_request.config else 0
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            elif part.function_response:
+                chars += len(json.dumps(part.function_response.response, default=str))
+            elif part.function_call:
+                chars += len(json.dumps(part.function_call.args, default=str))
+    return chars
+
+
+class ScriptedModel(BaseLlm):
+    """Deterministic model: follows SCRIPTS[agent_name], then returns the agent's report.
+
+    `model` is the agent's routed model name, so tier routing and tracing see real names.
+    """
+
+    model: str = "scripted"
+    agent_name: str
+    config: OfflineConfig
+
+    async def generate_content_async(self, llm_request, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        if self.config.model_latency:
+            tier = next((t for t, name in TIER_MODELS.items() if name == llm_request.model), "large")
+            await asyncio.sleep(self.config.model_latency * self.config.tier_latency_factors.get(tier, 1.0))
+        fields = _loan_fields(llm_request)
+        # Each earlier turn of this agent left one model content with function calls.
+        turn = sum(1 for c in llm_request.contents if c.role == "model" and any(p.function_call for p in c.parts or []))
+        available = set(llm_request.tools_dict)
+        script = SCRIPTS.get(self.agent_name, [])
+        parts = []
+        while turn < len(script) and not parts:
+            parts = [
+                types.Part(function_call=types.FunctionCall(name=name, args=build(fields)))
+                for name, build in script[turn] if name in available
+            ]
+            turn += 1
+        if not parts:
+            parts = [types.Part(text=_final_text(self.agent_name, fields, self.config))]
+        output_chars = sum(len(p.text) if p.text else len(json.dumps(p.function_call.args, default=str)) for p in parts)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=parts),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=_request_chars(llm_request) // CHARS_PER_TOKEN,
+                candidates_token_count=output_chars // CHARS_PER_TOKEN,
+            ),
+        )
+
+
+def _llm_agents(agent) -> List[Any]:
+    found = [agent] if hasattr(agent, "model") else []
+    for sub_agent in getattr(agent, "sub_agents", []) or []:
+        found.extend(_llm_agents(sub_agent))
+    return found
+
+
+def _install_backends(config: OfflineConfig, cities: int) -> None:
+    from agents.checkpoints import CheckpointStore, set_checkpoint_store
+    from agents.subagents.demographic_details_agent.store import DemographicStore, set_demographic_store
+    from agents.subagents.market_agent.market_index import set_market_index
+    from agents.subagents.regulatory_agent.evidence_store import EvidenceStore, set_evidence_store
+    from agents.tools.bigquery_executor import SQLiteBackend, set_backend
+    from agents.tools.location_index import set_location_index
+    from agents.tools.web_search import FakeSearchBackend, set_search_backend
+
+    backend = SQLiteBackend(latency_seconds=config.sql_latency)
+    seed_warehouse(backend, cities, config)
+    # No result caches: every call pays the injected latency.
+    set_backend(backend, cache=None)
+    set_location_index(None)
+    set_market_index(None)
+    set_search_backend(FakeSearchBackend(latency_seconds=config.search_latency), cache=None)
+    set_checkpoint_store(CheckpointStore(":memory:"))
+    set_demographic_store(DemographicStore(":memory:"))
+    set_evidence_store(EvidenceStore(":memory:"))
+
+
+def install(config: Optional[OfflineConfig] = None, cities: int = 1000):
+    """Swaps in the offline warehouse, search, stores and models; returns root_agent."""
+    config = config or OfflineConfig()
+    _install_backends(config, cities)
+
+    from agents.agent import root_agent
+
+    for agent in _llm_agents(root_agent):
+        agent.model = ScriptedModel(model=model_for(agent.name), agent_name=agent.name, config=config)
+    return root_agent
+
+
+def reset(root_agent, config: OfflineConfig, cities: int = 1000) -> None:
+    """Fresh backends and stores with new injected latencies, for the next measurement."""
+    _install_backends(config, cities)
+    for agent in _llm_agents(root_agent):
+        agent.model = ScriptedModel(model=model_for(agent.name), agent_name=agent.name, config=config)
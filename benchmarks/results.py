@@ -0,0 +1,31 @@
+"""Recording benchmark results so they can be compared across commits."""
+
+import json
+import subprocess
+import time
+from typing import Any, Dict, Optional
+
+
+def git_commit() -> Optional[str]:
+    """Short hash of HEAD, or None outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def make_record(benchmark: str, config: Dict[str, Any], results: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "benchmark": benchmark,
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "config": config,
+        "results": results,
+    }
+
+
+def append_record(path: str, record: Dict[str, Any]) -> None:
+    """Appends one JSON line to `path`."""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")